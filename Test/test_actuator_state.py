@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the MotorController actuator state cache
+Runs against the simulated GPIO: checks that unchanged pins are not
+rewritten, paddle ramping, and saving/replaying the actuator timeline
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from motor_controller import MotorController, load_timeline
+
+
+def test_write_cache(motors):
+    """A 50 Hz loop of unchanged setpoints writes nothing"""
+    print("1. Write cache")
+    motors.move_forward(40)
+    writes = motors.gpio_writes
+    start = time.perf_counter()
+    for i in range(500):
+        motors.set_paddle_speed(40, 40 if i % 100 else 41)
+    elapsed = time.perf_counter() - start
+    assert motors.gpio_writes - writes == 10, motors.gpio_writes - writes  # 5 x (41, back to 40)
+    assert GPIO.duty_cycle(config.MOTOR2_ENB) == 40
+    print(f"   ✓ 500 setpoints, {motors.gpio_writes - writes} writes, "
+          f"{elapsed / 500 * 1e6:.0f} µs per call")
+    motors.print_actuator_stats()
+    motors.stop()
+
+
+def test_ramp():
+    """With a ramp rate, speed changes are spread over time"""
+    print("2. Ramping")
+    config.PADDLE_RAMP_RATE = 200  # %/s
+    motors = MotorController()
+    try:
+        motors.set_paddle_speed(60, -60)
+        time.sleep(0.1)
+        assert 0 < motors.motor1_speed < 60 and -60 < motors.motor2_speed < 0, \
+            (motors.motor1_speed, motors.motor2_speed)
+        time.sleep(0.35)
+        assert (motors.motor1_speed, motors.motor2_speed) == (60, -60)
+        print("   ✓ 0 -> 60% in ~0.3 s")
+        
+        motors.stop()
+        assert motors.motor1_speed == 0 and GPIO.duty_cycle(config.MOTOR1_ENA) == 0
+        print("   ✓ stop() skips the ramp")
+    finally:
+        motors.cleanup()
+        config.PADDLE_RAMP_RATE = None
+
+
+def test_timeline_replay(motors, directory):
+    """A saved timeline replays to the same pin states"""
+    print("3. Timeline replay")
+    motors.timeline.clear()
+    motors.move_forward(30)
+    time.sleep(0.05)
+    motors.turn_left(45)
+    time.sleep(0.05)
+    motors.move_backward(20)
+    
+    path = os.path.join(directory, 'timeline.csv')
+    motors.save_timeline(path)
+    timeline = load_timeline(path)
+    expected = (motors.motor1_speed, motors.motor2_speed)
+    motors.stop()
+    
+    start = time.monotonic()
+    motors.replay_timeline(timeline)
+    elapsed = time.monotonic() - start
+    assert (motors.motor1_speed, motors.motor2_speed) == expected
+    assert GPIO.level(config.MOTOR1_IN2) == GPIO.HIGH
+    assert 0.08 < elapsed < 0.3, elapsed
+    print(f"   ✓ {len(timeline)} changes replayed in {elapsed:.2f} s")
+    
+    # Replaying the in-memory timeline (moves, then the stop) does not grow it
+    recorded = list(motors.timeline)
+    writes = motors.gpio_writes
+    motors.replay_timeline(motors.timeline, speed=10.0)
+    assert motors.gpio_writes > writes, "moves should have been replayed"
+    assert (motors.motor1_speed, motors.motor2_speed) == (0, 0)
+    assert list(motors.timeline) == recorded, "replayed changes must not be recorded"
+    print("   ✓ In-memory timeline replayed, left unchanged")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Actuator State Test ===\n")
+    simulation.reset_world(time_scale=0.0)
+    GPIO.setmode(GPIO.BCM)
+    motors = MotorController()
+    try:
+        test_write_cache(motors)
+        test_ramp()
+        test_timeline_replay(motors, tempfile.mkdtemp(prefix='amlac_actuators_'))
+        print("\n=== Actuator State Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
+    finally:
+        motors.cleanup()
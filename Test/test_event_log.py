@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the structured event log
+Checks that events go to their own JSON lines stream with level, code and
+sensor snapshot, and never into the detection table
+"""
+
+import os
+import sys
+import tempfile
+from data_logger import DataLogger
+from event_log import read_events, count_by_level
+
+
+def test_event_stream(directory):
+    """Events are written, filtered and kept out of the detections"""
+    print("1. Event stream")
+    logger = DataLogger(log_file_path=os.path.join(directory, 'collection_log.csv'))
+    logger.log_event('INFO', 'Robot started', code='ROBOT_START')
+    logger.log_detection(True, 0.9, 14.5995, 120.9842, 1.0, 1, 30.0, {'pitch': 1.0, 'roll': 0.0})
+    logger.log_event('WARNING', 'Collection bin full', code='BIN_FULL',
+                     sensor_data={'weight': 9.8, 'orientation': {'pitch': 1.0, 'roll': 0.0}})
+    logger.log_event('ERROR', 'Sensor timeout, "quoted", multi\nline')
+    stats = logger.get_statistics(flush=True)
+    logger.close()
+    
+    assert stats['total_rows'] == 1 and stats['total_events'] == 0
+    
+    events = list(read_events(logger.event_log_path))
+    assert [e['code'] for e in events] == ['ROBOT_START', 'BIN_FULL', None]
+    assert events[1]['sensors']['weight'] == 9.8
+    assert events[2]['message'] == 'Sensor timeout, "quoted", multi\nline'
+    assert all(a['monotonic'] <= b['monotonic'] for a, b in zip(events, events[1:]))
+    print(f"   ✓ {len(events)} events, detection table has {stats['total_rows']} row")
+    
+    assert [e['level'] for e in read_events(logger.event_log_path, level='WARNING')] == ['WARNING', 'ERROR']
+    assert len(list(read_events(logger.event_log_path, code='BIN_FULL'))) == 1
+    assert not list(read_events(logger.event_log_path, since='2999-01-01'))
+    print("   ✓ Level, code and time filters")
+    
+    with open(logger.event_log_path, 'a') as f:
+        f.write('{"time": "2024-01-01 00:00:00", "lev')  # Power cut mid-line
+    assert count_by_level(logger.event_log_path) == {'INFO': 1, 'WARNING': 1, 'ERROR': 1}
+    print("   ✓ Truncated last line skipped")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Event Log Test ===\n")
+    try:
+        test_event_stream(tempfile.mkdtemp(prefix='amlac_events_'))
+        print("\n=== Event Log Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the frame change gate
+Uses synthetic frames, so no camera or model is needed
+"""
+
+import sys
+import threading
+import time
+import numpy as np
+from frame_gate import FrameChangeGate
+
+
+def make_scene(seed, height=480, width=640):
+    """Smooth synthetic scene (gradient plus blobs) like a water surface"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    scene = np.stack([xx * 200 / width, yy * 200 / height, np.full_like(xx, 90)], axis=-1)
+    for _ in range(5):
+        cy, cx = rng.integers(0, height), rng.integers(0, width)
+        scene[(yy - cy) ** 2 + (xx - cx) ** 2 < 60 ** 2] = rng.integers(0, 255, 3)
+    return scene.astype(np.float32)
+
+
+def with_noise(scene, seed, sigma=3.0):
+    """Add sensor noise to a scene"""
+    rng = np.random.default_rng(seed)
+    return np.clip(scene + rng.normal(0, sigma, scene.shape), 0, 255).astype(np.uint8)
+
+
+def test_frame_gate():
+    """Check skip/run decisions and counters"""
+    calls = []
+    
+    def detect(frame):
+        calls.append(frame)
+        return (False, 0.1 * len(calls))
+    
+    gate = FrameChangeGate(luma_threshold=6.0, hist_threshold=0.15, refresh_interval=0.5)
+    scene = make_scene(1)
+    
+    print("1. First frame always runs inference")
+    assert gate.detect(with_noise(scene, 0), detect) == (False, 0.1)
+    assert len(calls) == 1
+    
+    print("2. Same scene with sensor noise reuses the result")
+    for seed in range(1, 6):
+        assert gate.detect(with_noise(scene, seed), detect) == (False, 0.1)
+    assert len(calls) == 1, len(calls)
+    print(f"   luma diff {gate.last_luma_diff:.2f}, hist diff {gate.last_hist_diff:.3f}")
+    
+    print("3. New scene runs inference")
+    gate.detect(with_noise(make_scene(2), 10), detect)
+    assert len(calls) == 2
+    
+    print("4. Refresh interval forces inference")
+    time.sleep(0.6)
+    gate.detect(with_noise(make_scene(2), 11), detect)
+    assert len(calls) == 3
+    
+    print("5. Reset forces inference")
+    gate.reset()
+    gate.detect(with_noise(make_scene(2), 12), detect)
+    assert len(calls) == 4
+    
+    stats = gate.get_stats()
+    assert stats['executed'] == 4 and stats['skipped'] == 5, stats
+    gate.print_stats()
+
+
+def test_small_patch():
+    """A 60x60 patch changing in one corner is a new scene"""
+    print("6. Small patch change runs inference")
+    calls = []
+    
+    def detect(frame):
+        calls.append(frame)
+        return (False, 0.0)
+    
+    gate = FrameChangeGate(luma_threshold=6.0, hist_threshold=0.15, refresh_interval=30)
+    scene = make_scene(3)
+    gate.detect(with_noise(scene, 0), detect)
+    
+    for y, x in ((0, 0), (200, 300), (420, 580)):
+        patch = scene.copy()
+        patch[y:y + 60, x:x + 60] = np.clip(patch[y:y + 60, x:x + 60] + 100, 0, 255)
+        gate.reset()
+        gate.detect(with_noise(scene, 1), detect)
+        before = len(calls)
+        gate.detect(with_noise(patch, 2), detect)
+        assert len(calls) == before + 1, (y, x, gate.last_luma_diff)
+        print(f"   patch at ({x}, {y}): cell diff {gate.last_luma_diff:.1f}, "
+              f"hist diff {gate.last_hist_diff:.3f}")
+    
+    # Noise alone stays below the threshold in every cell
+    before = len(calls)
+    gate.detect(with_noise(patch, 3), detect)
+    assert len(calls) == before, gate.last_luma_diff
+
+
+def test_reset_during_detect():
+    """A result computed across a reset() is not cached"""
+    print("7. Reset while inference runs")
+    gate = FrameChangeGate(refresh_interval=30)
+    frame = with_noise(make_scene(4), 0)
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow_detect(frame):
+        started.set()
+        release.wait()
+        return (True, 0.9)
+    
+    worker = threading.Thread(target=gate.detect, args=(frame, slow_detect))
+    worker.start()
+    started.wait()
+    gate.reset()  # Main thread discards stale scans
+    release.set()
+    worker.join()
+    
+    assert gate.detect(frame, lambda frame: (False, 0.2)) == (False, 0.2)
+    assert gate.executed == 2, gate.executed
+    print("   ✓ Pre-reset result dropped")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Frame Gate Test ===\n")
+    try:
+        test_frame_gate()
+        test_small_patch()
+        test_reset_during_detect()
+        print("\n=== Frame Gate Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
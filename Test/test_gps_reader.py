@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the background GPS reader
+Feeds recorded NMEA sentences through an in-memory stream and a
+pseudo-terminal, so no GPS module or /dev/serial0 is needed
+"""
+
+import io
+import os
+import sys
+import time
+from gps_reader import GPSReader
+
+# Recorded NEO-6M output (one second of sentences, fix quality 1)
+SAMPLE_NMEA = [
+    "$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A",
+    "$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48",
+    "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47",
+    "$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39",
+    "garbage line from a noisy UART",
+]
+
+# Next second: the receiver reports the fix as lost (quality 0)
+LOST_FIX_GGA = "$GPGGA,123520,4807.038,N,01131.000,E,0,03,,,M,,M,,*5B"
+
+
+def check_fix(fix):
+    """Check the parsed fix against the recorded sentences"""
+    assert fix is not None, "No fix published"
+    assert abs(fix['lat'] - 48.1173) < 1e-6, fix['lat']
+    assert abs(fix['lon'] - 11.516667) < 1e-6, fix['lon']
+    assert fix['altitude'] == 545.4
+    assert fix['fix_quality'] == 1
+    assert fix['num_satellites'] == 8
+    assert fix['speed_kmh'] == 10.2  # VTG arrived after RMC
+    assert fix['heading'] == 54.7
+    assert fix['age'] >= 0.0
+
+
+def test_in_memory_stream():
+    """Replay NMEA from an io.BytesIO"""
+    print("1. In-memory stream")
+    stream = io.BytesIO(("\r\n".join(SAMPLE_NMEA) + "\r\n").encode('ascii'))
+    
+    reader = GPSReader(stream)
+    reader.start()
+    time.sleep(0.2)
+    reader.stop()
+    
+    fix = reader.get_fix()
+    check_fix(fix)
+    print(f"   ✓ Fix: {fix['lat']:.6f}, {fix['lon']:.6f} "
+          f"({reader.sentences_parsed} sentences, {reader.parse_errors} errors)")
+
+
+def test_pseudo_terminal():
+    """Replay NMEA through a pseudo-terminal opened with pyserial"""
+    print("2. Pseudo-terminal")
+    try:
+        import serial
+    except ImportError:
+        print("   Skipped (pyserial not installed)")
+        return
+    
+    master_fd, slave_fd = os.openpty()
+    port = serial.Serial(os.ttyname(slave_fd), timeout=0.1)
+    
+    reader = GPSReader(port)
+    reader.start()
+    
+    for line in SAMPLE_NMEA:
+        os.write(master_fd, (line + "\r\n").encode('ascii'))
+    
+    # read_gps must return instantly from the cache
+    deadline = time.time() + 2.0
+    fix = None
+    while fix is None and time.time() < deadline:
+        start = time.perf_counter()
+        fix = reader.get_fix()
+        assert time.perf_counter() - start < 0.01
+        time.sleep(0.05)
+    time.sleep(0.1)
+    fix = reader.get_fix()
+    
+    reader.stop()
+    port.close()
+    os.close(master_fd)
+    os.close(slave_fd)
+    
+    check_fix(fix)
+    print(f"   ✓ Fix: {fix['lat']:.6f}, {fix['lon']:.6f}")
+
+
+def test_stale_fix():
+    """Fixes older than the maximum age are rejected"""
+    print("3. Stale fix")
+    reader = GPSReader(io.BytesIO())
+    reader.process_line(SAMPLE_NMEA[2])
+    assert reader.get_fix(max_age=10.0) is not None
+    time.sleep(0.05)
+    assert reader.get_fix(max_age=0.01) is None
+    print("   ✓ Stale fix rejected")
+
+
+def test_lost_fix():
+    """A GGA with fix quality 0 withdraws the cached position"""
+    print("4. Lost fix")
+    reader = GPSReader(io.BytesIO())
+    reader.process_line(SAMPLE_NMEA[2])
+    assert reader.get_fix() is not None
+    reader.process_line(LOST_FIX_GGA)
+    assert reader.get_fix() is None, reader.get_fix()
+    assert reader.get_fix(max_age=float('inf')) is None
+    reader.process_line(SAMPLE_NMEA[2])
+    assert reader.get_fix() is not None, "fix should come back with the next valid GGA"
+    print("   ✓ No position served after fix loss")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC GPS Reader Test ===\n")
+    try:
+        test_in_memory_stream()
+        test_pseudo_terminal()
+        test_stale_fix()
+        test_lost_fix()
+        print("\n=== GPS Reader Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared I2C bus arbiter
+Checks serialization, priority order and batching, then runs the IMU stream
+and LCD updates together on the simulated bus and prints the utilization
+"""
+
+import os
+import sys
+import threading
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from i2c_bus import I2CBusArbiter, get_arbiter
+
+PRIORITIES = {'mpu6050': 2, 'tcs34725': 1, 'lcd': 0}
+
+
+def test_serialized():
+    """Only one thread holds the bus at a time"""
+    print("1. Serialized transactions")
+    arbiter = I2CBusArbiter(PRIORITIES)
+    state = {'holders': 0, 'overlaps': 0}
+    
+    def worker(device):
+        for _ in range(50):
+            with arbiter.transaction(device):
+                state['holders'] += 1
+                if state['holders'] > 1:
+                    state['overlaps'] += 1
+                time.sleep(0.0002)
+                state['holders'] -= 1
+    
+    threads = [threading.Thread(target=worker, args=(device,)) for device in PRIORITIES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert state['overlaps'] == 0, state
+    assert all(arbiter.devices[device].transactions == 50 for device in PRIORITIES)
+    assert 0 < arbiter.utilization() <= 1
+    print(f"   ✓ 150 transactions, no overlap, {arbiter.utilization() * 100:.0f}% busy")
+
+
+def test_priority():
+    """Waiting IMU traffic goes before waiting LCD traffic"""
+    print("2. Priority and batching")
+    arbiter = I2CBusArbiter(PRIORITIES)
+    order = []
+    
+    def worker(device):
+        with arbiter.transaction(device):
+            order.append(device)
+    
+    arbiter.acquire('tcs34725')
+    threads = []
+    for device in ('lcd', 'lcd', 'mpu6050', 'tcs34725'):
+        thread = threading.Thread(target=worker, args=(device,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)  # Arrive in this order
+    arbiter.release()
+    for thread in threads:
+        thread.join()
+    assert order == ['mpu6050', 'tcs34725', 'lcd', 'lcd'], order
+    print(f"   ✓ Granted in order {order}")
+    
+    # Nested transactions (a batch) count as one bus grant
+    with arbiter.transaction('mpu6050'):
+        with arbiter.transaction('mpu6050'):
+            pass
+    assert arbiter.devices['mpu6050'].transactions == 2
+    print("   ✓ Batch holds the bus once")
+
+
+def test_lcd_init_arbitrated():
+    """The LCD init sequence and color reads already go through the arbiter"""
+    print("3. LCD init and color sensor reads")
+    simulation.reset_world(time_scale=0)
+    from lcd_display import ArbitratedCharLCD
+    from sensor_manager import SensorManager
+    GPIO.setmode(GPIO.BCM)
+    arbiter = get_arbiter()
+    arbiter.reset_stats()
+    
+    lcd = ArbitratedCharLCD(i2c_expander='PCF8574', address=config.LCD_I2C_ADDRESS,
+                            port=1, cols=16, rows=2)
+    # 4 commands + clear + entry mode, four writes per byte
+    assert arbiter.devices['lcd'].transactions == 6 * 4, arbiter.devices['lcd'].transactions
+    lcd.close()
+    print(f"   ✓ {arbiter.devices['lcd'].transactions} init writes arbitrated")
+    
+    sensors = SensorManager()
+    try:
+        arbiter.reset_stats()
+        assert sensors.read_color_sensor()[0] is not None
+        assert arbiter.devices['tcs34725'].transactions == 1
+        print("   ✓ Color read holds the bus once")
+    finally:
+        sensors.cleanup()
+
+
+def test_imu_with_lcd():
+    """IMU samples keep flowing while the LCD is redrawn"""
+    print("4. IMU stream next to LCD updates")
+    simulation.reset_world(time_scale=1.0)
+    from sensor_manager import SensorManager
+    from lcd_display import LCDDisplay
+    GPIO.setmode(GPIO.BCM)
+    config.IMU_CALIBRATION_SAMPLES = 0
+    config.IMU_RATE_HZ = 200
+    
+    sensors = SensorManager()
+    lcd = LCDDisplay()
+    arbiter = get_arbiter()
+    sensors.start_imu_stream()
+    try:
+        arbiter.reset_stats()
+        start = time.monotonic()
+        samples = sensors.imu_stream.samples
+        redraws = 0
+        while time.monotonic() - start < 1.0:
+            lcd.write_line("Scanning...", f"Collected: {redraws}")
+            redraws += 1
+        rate = (sensors.imu_stream.samples - samples) / (time.monotonic() - start)
+        arbiter.print_report()
+        
+        imu_wait = arbiter.devices['mpu6050'].wait
+        lcd_wait = arbiter.devices['lcd'].wait
+        assert rate > 150, rate
+        assert arbiter.devices['lcd'].transactions > 1000
+        assert imu_wait.mean < 0.002, imu_wait.mean  # At most one LCD write ahead of it
+        print(f"   ✓ IMU at {rate:.0f} Hz during {redraws} LCD redraws, IMU wait mean "
+              f"{imu_wait.mean * 1000:.2f} ms (LCD max {lcd_wait.max * 1000:.2f} ms)")
+    finally:
+        sensors.cleanup()
+        lcd.cleanup()
+
+
+if __name__ == "__main__":
+    print("=== AMLAC I2C Bus Test ===\n")
+    try:
+        test_serialized()
+        test_priority()
+        test_lcd_init_arbitrated()
+        test_imu_with_lcd()
+        print("\n=== I2C Bus Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for MPU6050 burst reads and orientation fusion
+Checks burst decoding, the complementary filter on synthetic data, and
+polled and FIFO streaming against the simulated MPU6050
+"""
+
+import os
+import struct
+import sys
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from imu import ComplementaryFilter, IMUStream, decode_burst
+
+TRACE = """time,pitch,roll,gyro_z
+0,5,-10,30
+"""
+
+
+def test_decode():
+    """Big-endian signed words are scaled to g, °C and °/s"""
+    print("1. Burst decoding")
+    data = list(struct.pack('>7h', 16384, -8192, 0, 0, 131, -262, 32767))
+    accel, temperature, gyro = decode_burst(data)
+    assert accel == (1.0, -0.5, 0.0), accel
+    assert abs(temperature - 36.53) < 1e-9, temperature
+    assert gyro[:2] == (1.0, -2.0) and abs(gyro[2] - 250.1) < 0.1, gyro
+    print("   ✓ accel, temperature and gyro decoded")
+
+
+def test_filter():
+    """Gyro bias is pulled back toward the accelerometer tilt"""
+    print("2. Complementary filter")
+    fusion = ComplementaryFilter(alpha=0.98)
+    level = (0.0, 0.0, 1.0)
+    fusion.update(level, (0.0, 0.0, 0.0), 0.01)
+    
+    # 2 °/s gyro drift on pitch for 10 s: pure integration would reach 20°
+    for _ in range(1000):
+        pitch, roll, yaw = fusion.update(level, (2.0, 0.0, 10.0), 0.01)
+    assert abs(pitch) < 1.5, pitch
+    assert abs(roll) < 1e-9
+    assert abs(yaw - 100.0) < 1e-6, yaw
+    
+    # Yaw wraps to ±180
+    for _ in range(1000):
+        _, _, yaw = fusion.update(level, (0.0, 0.0, 10.0), 0.01)
+    assert abs(yaw + 160.0) < 1e-6, yaw
+    print(f"   ✓ Pitch held at {pitch:.2f}° against gyro drift, yaw wraps")
+
+
+def run_stream(use_fifo, seconds=1.0):
+    """Stream from the simulated MPU6050, return (stream, orientation query time)"""
+    from sensor_manager import SensorManager
+    GPIO.setmode(GPIO.BCM)
+    sensors = SensorManager()
+    stream = IMUStream(sensors.mpu_bus, rate_hz=100, use_fifo=use_fifo)
+    stream.start()
+    try:
+        time.sleep(seconds)
+        start = time.perf_counter()
+        for _ in range(1000):
+            orientation = stream.orientation()
+        elapsed = (time.perf_counter() - start) / 1000
+    finally:
+        stream.stop()
+        sensors.cleanup()
+    return stream, orientation, elapsed
+
+
+def test_streaming(directory):
+    """Polled and FIFO streams both converge on the simulated tilt"""
+    print("3. Streaming (polled and FIFO)")
+    trace_path = os.path.join(directory, 'trace.csv')
+    with open(trace_path, 'w') as f:
+        f.write(TRACE)
+    simulation.reset_world(trace_file=trace_path, time_scale=1.0)
+    
+    for use_fifo in (False, True):
+        stream, orientation, elapsed = run_stream(use_fifo)
+        mode = 'FIFO' if use_fifo else 'polled'
+        assert stream.samples >= 80, (mode, stream.samples)
+        assert abs(orientation['pitch'] - 5) < 1, orientation
+        assert abs(orientation['roll'] + 10) < 1, orientation
+        assert 20 < orientation['yaw'] < 40, orientation  # ~30°/s for ~1 s
+        assert stream.fifo_overflows == 0
+        print(f"   ✓ {mode}: {stream.samples} samples, pitch {orientation['pitch']:.1f}°, "
+              f"roll {orientation['roll']:.1f}°, yaw {orientation['yaw']:.1f}°, "
+              f"query {elapsed * 1e6:.1f} µs")
+        stream.print_stats()
+
+
+def test_sensor_manager():
+    """Single burst read keeps the read_mpu6050 format; stream serves yaw rate"""
+    print("4. SensorManager")
+    from sensor_manager import SensorManager
+    sensors = SensorManager()
+    try:
+        data = sensors.read_mpu6050()
+        assert set(data) == {'accel', 'gyro', 'temperature'}, data
+        assert abs(data['temperature'] - 25) < 0.1, data['temperature']
+        
+        config.IMU_CALIBRATION_SAMPLES = 0
+        sensors.start_imu_stream()
+        time.sleep(0.2)
+        assert abs(sensors.read_yaw_rate() - 30) < 2, sensors.read_yaw_rate()
+        assert set(sensors.get_orientation()) == {'pitch', 'roll', 'yaw'}
+        print("   ✓ Burst read format, streamed yaw rate and fused orientation")
+    finally:
+        sensors.cleanup()
+
+
+if __name__ == "__main__":
+    import tempfile
+    print("=== AMLAC IMU Test ===\n")
+    try:
+        test_decode()
+        test_filter()
+        test_streaming(tempfile.mkdtemp(prefix='amlac_imu_'))
+        test_sensor_manager()
+        print("\n=== IMU Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
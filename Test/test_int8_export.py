@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for the full-integer INT8 export
+Builds a small dataset and a small Keras model, then checks the representative
+dataset, the uint8 conversion, the metadata sidecar and the robot's uint8
+input path (needs TensorFlow; the robot path also needs a TFLite interpreter)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+from PIL import Image
+import config
+
+IMAGES_PER_CLASS = 12
+COLORS = {'algae': (40, 140, 60), 'no_algae': (150, 150, 150)}
+
+
+def make_dataset(directory):
+    """dataset/train with a green 'algae' and a grey 'no_algae' class"""
+    rng = np.random.default_rng(0)
+    train_dir = os.path.join(directory, 'dataset', 'train')
+    for class_name, color in COLORS.items():
+        os.makedirs(os.path.join(train_dir, class_name))
+        for i in range(IMAGES_PER_CLASS):
+            noise = rng.integers(-30, 30, (240, 320, 3))
+            pixels = np.clip(np.array(color) + noise, 0, 255).astype(np.uint8)
+            # Shadow and glare, so calibration sees the full pixel range like real photos
+            pixels[:16, :16] = 0
+            pixels[-16:, -16:] = 255
+            Image.fromarray(pixels).save(os.path.join(train_dir, class_name, f'{i:03d}.png'))
+    return train_dir
+
+
+def load_training_images(train_dir):
+    """All training images and labels (flow_from_directory order)"""
+    images, labels = [], []
+    for label, class_name in enumerate(train_model.get_class_names(train_dir)):
+        for path in train_model.get_image_files(os.path.join(train_dir, class_name)):
+            images.append(train_model.load_image_for_model(path))
+            labels.append(label)
+    return np.array(images), np.array(labels, dtype=np.float32)
+
+
+def make_model(images, labels):
+    """Tiny sigmoid classifier on mean color, trained to separate the classes"""
+    from tensorflow import keras
+    from tensorflow.keras import layers
+    
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.Input(shape=(train_model.IMAGE_SIZE, train_model.IMAGE_SIZE, 3)),
+        layers.Conv2D(4, 3, strides=4, activation='relu'),
+        layers.GlobalAveragePooling2D(),
+        layers.Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer=keras.optimizers.Adam(0.05), loss='binary_crossentropy')
+    model.fit(images, labels, epochs=40, batch_size=len(images), verbose=0)
+    return model
+
+
+def test_representative_dataset(train_dir):
+    """Calibration samples come from every class, shaped like model input"""
+    print("1. Representative dataset")
+    samples = list(train_model.representative_dataset())
+    assert len(samples) == 2 * IMAGES_PER_CLASS, len(samples)
+    
+    greens = 0
+    for sample in samples:
+        assert isinstance(sample, list) and len(sample) == 1
+        x = sample[0]
+        assert x.shape == (1, train_model.IMAGE_SIZE, train_model.IMAGE_SIZE, 3), x.shape
+        assert x.dtype == np.float32 and 0.0 <= x.min() and x.max() <= 1.0
+        mean = x[0].mean(axis=(0, 1))
+        greens += int(mean[1] > mean[0] + 0.2)
+    assert greens == IMAGES_PER_CLASS, greens
+    print(f"   ✓ {len(samples)} samples in [0, 1], both classes")
+    
+    limit = train_model.REPRESENTATIVE_SAMPLES
+    train_model.REPRESENTATIVE_SAMPLES = 5
+    try:
+        assert len(list(train_model.representative_dataset())) == 5
+    finally:
+        train_model.REPRESENTATIVE_SAMPLES = limit
+    print("   ✓ Capped at REPRESENTATIVE_SAMPLES")
+
+
+def test_int8_conversion(directory, model, images):
+    """Full-integer model with uint8 input/output that tracks the float model"""
+    print("2. INT8 conversion")
+    import tensorflow as tf
+    
+    int8_path = os.path.join(directory, 'model_int8.tflite')
+    train_model.convert_to_tflite_int8(model, int8_path)
+    
+    interpreter = tf.lite.Interpreter(model_path=int8_path)
+    interpreter.allocate_tensors()
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    assert input_details['dtype'] == np.uint8 and output_details['dtype'] == np.uint8
+    scale, zero_point = input_details['quantization']
+    assert abs(scale - 1.0 / 255.0) < 1e-6 and zero_point == 0, (scale, zero_point)
+    print("   ✓ uint8 input/output, input quantized as pixels (scale 1/255, zero point 0)")
+    
+    float_path = os.path.join(directory, 'model.tflite')
+    train_model.convert_to_tflite_direct(model, float_path)
+    report = train_model.compare_tflite_models(float_path, int8_path, train_model.TRAIN_DIR)
+    assert report['float_accuracy'] == 1.0, report
+    assert report['int8_accuracy'] == 1.0, report
+    print("   ✓ Same accuracy as the float model on the calibration set")
+    
+    expected = model.predict(images, verbose=0)[:, 0]
+    out_scale, out_zero_point = output_details['quantization']
+    errors = []
+    for x, y in zip(images, expected):
+        pixels = np.round(x * 255.0).astype(np.uint8)
+        interpreter.set_tensor(input_details['index'], pixels[np.newaxis])
+        interpreter.invoke()
+        q = interpreter.get_tensor(output_details['index'])[0][0]
+        errors.append(abs((float(q) - out_zero_point) * out_scale - y))
+    assert max(errors) < 0.05, max(errors)
+    print(f"   ✓ Max difference from Keras {max(errors):.4f}")
+    return int8_path
+
+
+def test_robot_uint8_path(int8_path, model, images):
+    """MLInference feeds camera pixels to the uint8 model using the sidecar"""
+    print("3. Robot uint8 input path")
+    train_model.write_model_metadata(int8_path, {'algae': 0, 'no_algae': 1})
+    try:
+        from ml_inference import MLInference
+    except ImportError as e:
+        print(f"   Skipped: no TFLite interpreter ({e})")
+        return
+    
+    autotune = config.ML_AUTOTUNE_ON_STARTUP
+    config.ML_AUTOTUNE_ON_STARTUP = False
+    try:
+        ml_model = MLInference(model_path=int8_path)
+    finally:
+        config.ML_AUTOTUNE_ON_STARTUP = autotune
+    assert ml_model.model_loaded
+    assert ml_model.input_dtype == np.uint8, ml_model.input_dtype
+    assert ml_model.preprocess_mode == 'nearest', ml_model.preprocess_mode
+    assert ml_model.class_names == ['algae', 'no_algae']
+    assert (ml_model._pixel_scale, ml_model._pixel_offset) == (1.0, 0.0), "pixels not fed as-is"
+    
+    expected = model.predict(images, verbose=0)[:, 0]
+    for x, p_no_algae in zip(images[::4], expected[::4]):
+        frame = np.round(x * 255.0).astype(np.uint8)
+        _, confidence = ml_model.detect(frame)
+        assert abs(confidence - (1.0 - p_no_algae)) < 0.05, (confidence, p_no_algae)
+    print("   ✓ Sidecar read, algae confidence within 0.05 of the Keras model")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC INT8 Export Test ===\n")
+    try:
+        import train_model
+    except ImportError as e:
+        print(f"Skipped: TensorFlow not installed ({e})")
+        sys.exit(0)
+    
+    directory = tempfile.mkdtemp(prefix='amlac_int8_')
+    try:
+        train_model.TRAIN_DIR = make_dataset(directory)
+        images, labels = load_training_images(train_model.TRAIN_DIR)
+        model = make_model(images, labels)
+        
+        test_representative_dataset(train_model.TRAIN_DIR)
+        int8_path = test_int8_conversion(directory, model, images)
+        test_robot_uint8_path(int8_path, model, images)
+        print("\n=== INT8 Export Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for continuous HX711 sampling
+Checks the median/EMA filter, the stable flag and motion gating on
+synthetic wave data, and the background sampler against the simulated HX711
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO, HX711
+from load_cell import LoadCellSampler, WeightFilter
+
+TRACE = """time,weight
+0,1.5
+"""
+
+
+def test_filter():
+    """Spikes are rejected and the stable flag follows the spread"""
+    print("1. Median/EMA filter")
+    weights = WeightFilter(window=5, alpha=0.5, stable_band=20)
+    for grams in (1000, 1002, 998, 1001):
+        weights.update(grams)
+    assert not weights.stable, "window not full yet"
+    value = weights.update(5000)  # Knock on the bin
+    assert abs(value - 1000) < 5, value
+    assert not weights.stable, "spike is inside the window"
+    
+    for _ in range(5):
+        value = weights.update(1000)
+    assert weights.stable and abs(value - 1000) < 5, value
+    
+    for _ in range(20):
+        value = weights.update(1500)
+    assert abs(value - 1500) < 1 and weights.stable, value
+    print(f"   ✓ Spike rejected, settled at {value:.1f} g after a step")
+
+
+class FakeHX711:
+    """Load cell on a rocking hull: 1 kg plus a wave term in phase with the IMU"""
+    
+    def __init__(self):
+        self.t = 0.0
+    
+    def accel(self):
+        return 1.0 + 0.3 * math.sin(2 * math.pi * 0.5 * self.t)
+    
+    def get_weight_mean(self, readings=30):
+        self.t += 0.1
+        return 1000.0 * self.accel()
+    
+    def zero(self, readings=30):
+        return False
+
+
+def test_motion_gating():
+    """Samples taken while the hull accelerates are dropped"""
+    print("2. Wave rejection")
+    hx711 = FakeHX711()
+    gated = LoadCellSampler(hx711, motion_source=hx711.accel)
+    for _ in range(100):
+        gated.sample()
+    assert gated.motion_rejected > 30, gated.motion_rejected
+    assert abs(gated.weight() - 1.0) < 0.1, gated.weight()
+    
+    ungated = LoadCellSampler(FakeHX711())
+    spread = []
+    for _ in range(100):
+        ungated.sample()
+        spread.append(ungated.weight())
+    assert not ungated.stable
+    print(f"   ✓ {gated.motion_rejected}/100 samples rejected, weight {gated.weight()} kg "
+          f"(ungated swings {min(spread[20:]):.2f}-{max(spread[20:]):.2f} kg)")
+
+
+class SlowHX711(FakeHX711):
+    """Load cell that reads 1 kg before the tare and 0 after it"""
+    
+    def __init__(self):
+        super().__init__()
+        self.offset = 1000.0
+        self.reading = threading.Event()
+    
+    def get_weight_mean(self, readings=30):
+        self.reading.set()
+        grams = self.offset
+        time.sleep(0.05)
+        return grams
+    
+    def zero(self, readings=30):
+        self.offset = 0.0
+        return False
+
+
+def test_tare_during_sample():
+    """A tare while a conversion is in flight never lets the old weight in"""
+    print("3. Tare during a sample")
+    hx711 = SlowHX711()
+    
+    def motion():
+        time.sleep(0.05)  # Let the tare run between the read and the filter update
+        return None
+    
+    sampler = LoadCellSampler(hx711, motion_source=motion)
+    worker = threading.Thread(target=sampler.sample)
+    worker.start()
+    hx711.reading.wait()
+    assert sampler.tare()
+    worker.join()
+    sampler.sample()
+    assert sampler.weight() == 0.0, sampler.weight()
+    print("   ✓ Pre-tare sample did not reach the reset filter")
+
+
+def test_sensor_manager(directory):
+    """read_weight returns the background weight without blocking"""
+    print("4. SensorManager")
+    trace_path = os.path.join(directory, 'trace.csv')
+    with open(trace_path, 'w') as f:
+        f.write(TRACE)
+    simulation.reset_world(trace_file=trace_path, time_scale=1.0)
+    
+    hx711 = HX711(dout_pin=config.HX711_DT, pd_sck_pin=config.HX711_SCK)
+    start = time.perf_counter()
+    hx711.get_weight_mean(5)
+    blocking = time.perf_counter() - start
+    
+    from sensor_manager import SensorManager
+    GPIO.setmode(GPIO.BCM)
+    sensors = SensorManager()
+    try:
+        time.sleep(1.5)
+        start = time.perf_counter()
+        weight = sensors.read_weight()
+        elapsed = time.perf_counter() - start
+        assert abs(weight - 1.5) < 0.02, weight
+        assert sensors.weight_stable()
+        assert sensors.load_cell.samples >= 10, sensors.load_cell.samples
+        assert elapsed < 0.001, elapsed
+        print(f"   ✓ {weight} kg (stable) in {elapsed * 1e6:.1f} µs "
+              f"(get_weight_mean(5): {blocking * 1000:.0f} ms)")
+        
+        assert sensors.tare_scale()
+        time.sleep(0.5)
+        assert abs(sensors.read_weight()) < 0.02, sensors.read_weight()
+        print("   ✓ Tare restarts the filter")
+        sensors.load_cell.print_stats()
+    finally:
+        sensors.cleanup()
+
+
+if __name__ == "__main__":
+    import tempfile
+    print("=== AMLAC Load Cell Test ===\n")
+    try:
+        test_filter()
+        test_motion_gating()
+        test_tare_during_sample()
+        test_sensor_manager(tempfile.mkdtemp(prefix='amlac_load_cell_'))
+        print("\n=== Load Cell Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for log rotation and the compressed archive
+Checks size-based rotation, the manifest, time-range queries, statistics
+rebuilt from the manifest, recovery of a segment left by a crash and that
+async-mode rotation never blocks the control loop
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import config
+from data_logger import DataLogger
+from log_archive import LogArchive
+from log_writers import AsyncLogWriter
+
+
+def log_rows(logger, count):
+    """Log detections, flushing and polling like the main loop"""
+    for i in range(count):
+        logger.log_detection(
+            algae_detected=(i % 2 == 0), confidence=0.8,
+            gps_lat=14.5995, gps_lon=120.9842, weight_kg=1.0,
+            collection_count=i, distance_cm=30.0, orientation=None
+        )
+        if i % 10 == 9:
+            logger.flush()
+            logger.poll()
+
+
+def test_size_rotation(directory, log_format):
+    """Rotated segments are compressed and listed in the manifest"""
+    print(f"1. Size rotation ({log_format})")
+    path = os.path.join(directory, 'collection_log.csv')
+    logger = DataLogger(log_file_path=path, log_format=log_format)
+    log_rows(logger, 200)
+    logger.log_event('INFO', 'Mission complete')
+    stats = logger.get_statistics(flush=True)
+    logger.close()
+    
+    archive = logger.archive
+    assert len(archive.segments) >= 2, "expected several segments"
+    assert all(s['file'].endswith('.gz') for s in archive.segments)
+    assert not [n for n in os.listdir(archive.archive_dir) if n.endswith(('.csv', '.rec'))]
+    archived_rows = sum(len(archive.read_segment(s)) for s in archive.segments)
+    assert archived_rows == sum(s['rows'] for s in archive.segments)
+    print(f"   ✓ {len(archive.segments)} segments, {archived_rows} archived rows")
+    
+    today = stats['first_timestamp'][:10]
+    assert len(archive.segments_between(today, today)) == len(archive.segments)
+    assert archive.segments_between('2000-01-01', '2000-01-02') == []
+    print("   ✓ Time-range query skips unrelated segments")
+    
+    os.remove(logger.stats.checkpoint_path)
+    logger = DataLogger(log_file_path=path, log_format=log_format)
+    rebuilt = logger.get_statistics(flush=True)
+    logger.close()
+    assert rebuilt['total_rows'] == stats['total_rows'] == 200
+    assert rebuilt['total_detections'] == stats['total_detections']
+    print("   ✓ Statistics rebuilt from manifest + active log")
+
+
+def test_crash_recovery(directory):
+    """An uncompressed segment left by a crash is archived on start"""
+    print("2. Crash recovery")
+    path = os.path.join(directory, 'collection_log.csv')
+    logger = DataLogger(log_file_path=path, log_format='csv')
+    log_rows(logger, 20)
+    logger.close()
+    
+    archive = LogArchive(path)
+    before = len(archive.segments)
+    shutil.copy(path, os.path.join(archive.archive_dir, 'collection_log_20000101_000000.csv'))
+    assert LogArchive(path).recover() == 1
+    assert len(LogArchive(path).segments) == before + 1
+    print("   ✓ Left-over segment compressed and added to the manifest")
+
+
+def test_rotation_off_control_loop(directory):
+    """poll() queues the rotation instead of waiting for a stalled SD card"""
+    print("3. Rotation on the writer thread")
+    path = os.path.join(directory, 'collection_log.csv')
+    logger = DataLogger(log_file_path=path, log_format='csv')
+    assert isinstance(logger.writer, AsyncLogWriter)
+    
+    inner = logger.writer.writer
+    close = inner.close
+    
+    def stalled_close():
+        time.sleep(1.0)  # SD card stall while the old segment is closed
+        close()
+    
+    inner.close = stalled_close
+    for i in range(100):
+        logger.log_detection(True, 0.8, 14.5995, 120.9842, 1.0, i, 30.0, None)
+    logger.flush()
+    assert logger.stats.offset >= config.LOG_ROTATE_MAX_BYTES
+    
+    start = time.perf_counter()
+    logger.poll()
+    logger.poll()
+    logger.log_detection(True, 0.9, None, None, 1.0, 100, 30.0, None)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.1, elapsed
+    assert logger.writer.writer is inner, "rotation ran on the caller"
+    
+    stats = logger.get_statistics(flush=True)
+    logger.close()
+    assert logger.writer.writer is not inner
+    assert len(logger.archive.segments) == 1, logger.archive.segments
+    assert stats['total_rows'] == 101, stats['total_rows']
+    print(f"   ✓ poll() returned in {elapsed * 1000:.1f} ms during a 1 s stall, "
+          f"no rows lost")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Log Archive Test ===\n")
+    config.LOG_ROTATE_MAX_BYTES = 4000
+    try:
+        for log_format in ('csv', 'binary'):
+            test_size_rotation(tempfile.mkdtemp(prefix='amlac_archive_'), log_format)
+        test_crash_recovery(tempfile.mkdtemp(prefix='amlac_archive_'))
+        test_rotation_off_control_loop(tempfile.mkdtemp(prefix='amlac_archive_'))
+        print("\n=== Log Archive Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the running log statistics
+Checks that incremental statistics match a full rescan of the CSV and that
+the checkpoint survives restarts, appended rows and replaced log files
+"""
+
+import os
+import sys
+import tempfile
+import time
+from data_logger import DataLogger
+from log_statistics import LogStatistics
+
+
+def log_rows(logger, count):
+    """Log alternating detections plus one event (event log only)"""
+    for i in range(count):
+        logger.log_detection(
+            algae_detected=(i % 2 == 0),
+            confidence=0.6 + (i % 4) * 0.1,
+            gps_lat=14.5995, gps_lon=120.9842,
+            weight_kg=1.5, collection_count=i,
+            distance_cm=30.0, orientation={'pitch': 0.0, 'roll': 0.0}
+        )
+    logger.log_event('INFO', 'Batch done')
+
+
+def rescan(path):
+    """Statistics computed from scratch"""
+    stats = LogStatistics(path)
+    stats.rebuild()
+    return stats.summary()
+
+
+def test_incremental_matches_rescan(path):
+    """Running statistics equal a full rebuild"""
+    print("1. Incremental vs rescan")
+    logger = DataLogger(log_file_path=path)
+    log_rows(logger, 10)
+    stats = logger.get_statistics(flush=True)
+    assert stats == rescan(path), "incremental statistics differ from rescan"
+    assert stats['total_rows'] == 10 and stats['total_detections'] == 5
+    assert stats['total_events'] == 0, "events belong in the event log"
+    assert abs(stats['min_confidence'] - 0.6) < 1e-6 and abs(stats['max_confidence'] - 0.8) < 1e-6
+    logger.close()
+    print(f"   ✓ {stats['total_rows']} rows, {len(stats['per_hour'])} hour bucket(s)")
+
+
+def test_restart_uses_checkpoint(path):
+    """A restart loads the checkpoint instead of rescanning"""
+    print("2. Restart")
+    stats = LogStatistics(path)
+    assert stats.load() == 'checkpoint'
+    assert stats.total_rows == 10
+    print("   ✓ Loaded from checkpoint")
+
+
+def test_rows_after_checkpoint(path):
+    """Rows written after the last checkpoint (e.g. a crash) are picked up"""
+    print("3. Rows after the checkpoint")
+    with open(path, 'a') as f:
+        f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')},Yes,0.9000,N/A,N/A,0.00,1,N/A,\n")
+    stats = LogStatistics(path)
+    assert stats.load() == 'checkpoint+tail'
+    assert stats.summary() == rescan(path)
+    assert stats.total_rows == 11
+    print("   ✓ Tail read, totals match rescan")
+
+
+def test_replaced_log_rebuilds(path):
+    """A replaced CSV invalidates the checkpoint"""
+    print("4. Replaced log file")
+    os.remove(path)
+    logger = DataLogger(log_file_path=path)
+    log_rows(logger, 20)
+    logger.close()
+    stats = LogStatistics(path)
+    assert stats.load() == 'checkpoint'
+    assert stats.total_rows == 20
+    
+    os.remove(path)
+    logger = DataLogger(log_file_path=path)
+    log_rows(logger, 2)
+    assert logger.get_statistics(flush=True)['total_rows'] == 2
+    logger.close()
+    print("   ✓ Statistics rebuilt for the new file")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Log Statistics Test ===\n")
+    path = os.path.join(tempfile.mkdtemp(prefix='amlac_stats_'), 'collection_log.csv')
+    try:
+        test_incremental_matches_rescan(path)
+        test_restart_uses_checkpoint(path)
+        test_rows_after_checkpoint(path)
+        test_replaced_log_rebuilds(path)
+        print("\n=== Log Statistics Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
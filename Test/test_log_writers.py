@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for the log writers
+Checks buffered flushing, fsync scheduling and output identical to the
+direct writer, and that a stalling SD card never blocks the caller of the
+asynchronous writer
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from log_writers import DirectCSVWriter, BufferedCSVWriter, AsyncLogWriter, benchmark
+
+ROW = ['2024-01-01 12:00:00', 'Yes', '0.8765', '14.599500', '120.984200',
+       '1.50', 3, '25.50', 'P:2.5 R:-1.2']
+
+
+class StallingWriter:
+    """Inner writer that stalls like a slow SD card every few rows"""
+    
+    def __init__(self, path, stall_every=10, stall_seconds=0.3):
+        self.path = path
+        self.rows = []
+        self.stall_every = stall_every
+        self.stall_seconds = stall_seconds
+        self.closed = False
+    
+    def write_row(self, row):
+        if len(self.rows) % self.stall_every == self.stall_every - 1:
+            time.sleep(self.stall_seconds)
+        self.rows.append(row)
+    
+    def poll(self):
+        pass
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+
+
+def count_lines(path):
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def test_buffered_writer(directory):
+    """Rows are batched and flushed by size, age and close"""
+    print("1. Buffered writer")
+    path = os.path.join(directory, 'buffered.csv')
+    writer = BufferedCSVWriter(path, buffer_rows=5, flush_interval=0.2, fsync_interval=None)
+    
+    for _ in range(4):
+        writer.write_row(ROW)
+    assert count_lines(path) == 0 and writer.pending_rows == 4
+    
+    writer.write_row(ROW)
+    assert count_lines(path) == 5, "size flush"
+    
+    writer.write_row(ROW)
+    time.sleep(0.25)
+    writer.poll()
+    assert count_lines(path) == 6, "age flush"
+    
+    writer.write_row(ROW)
+    writer.close()
+    assert count_lines(path) == 7, "close flush"
+    print(f"   ✓ {writer.flushes} flushes, {writer.fsyncs} fsyncs")
+
+
+def test_buffered_fsync(directory):
+    """fsync runs on every flush with interval 0, never with None, and on close"""
+    print("2. Buffered writer fsync")
+    every = BufferedCSVWriter(os.path.join(directory, 'fsync_every.csv'),
+                              buffer_rows=2, fsync_interval=0)
+    never = BufferedCSVWriter(os.path.join(directory, 'fsync_never.csv'),
+                              buffer_rows=2, fsync_interval=None)
+    for _ in range(6):
+        every.write_row(ROW)
+        never.write_row(ROW)
+    assert every.flushes == 3 and every.fsyncs == 3, (every.flushes, every.fsyncs)
+    assert never.flushes == 3 and never.fsyncs == 0, (never.flushes, never.fsyncs)
+    
+    never.close()
+    assert never.fsyncs == 1, "close always fsyncs"
+    every.close()
+    print(f"   ✓ interval 0: {every.fsyncs} fsyncs, None: {never.fsyncs} (on close)")
+
+
+def test_buffered_matches_direct(directory):
+    """Buffered output equals the direct writer's, and on_write sees every row"""
+    print("3. Buffered vs direct output")
+    rows = [ROW[:6] + [i] + ROW[7:] for i in range(23)]
+    written = []
+    
+    direct = DirectCSVWriter(os.path.join(directory, 'direct.csv'))
+    buffered = BufferedCSVWriter(os.path.join(directory, 'batched.csv'), buffer_rows=10,
+                                 fsync_interval=None,
+                                 on_write=lambda batch, size: written.append((len(batch), size)))
+    for row in rows:
+        direct.write_row(row)
+        buffered.write_row(row)
+    buffered.close()
+    
+    with open(direct.path, 'rb') as a, open(buffered.path, 'rb') as b:
+        assert a.read() == b.read(), "buffered file differs from direct file"
+    assert [n for n, _ in written] == [10, 10, 3], written
+    assert written[-1][1] == os.path.getsize(buffered.path)
+    
+    # A power cut can only cut the last line short
+    with open(buffered.path, 'rb+') as f:
+        f.truncate(os.path.getsize(buffered.path) - 10)
+    with open(buffered.path, newline='') as f:
+        recovered = list(csv.reader(f))
+    assert len(recovered) == 23 and recovered[:22] == [[str(v) for v in r] for r in rows[:22]]
+    print(f"   ✓ {len(rows)} identical rows in {len(written)} flushes, truncated tail readable")
+
+
+def test_async_writer_stall(directory):
+    """SD stalls stay on the worker thread; close drains the queue"""
+    print("4. Async writer with stalling SD card")
+    inner = StallingWriter(os.path.join(directory, 'stall.csv'))
+    writer = AsyncLogWriter(inner, queue_size=100, policy='drop')
+    
+    worst = 0.0
+    for _ in range(30):
+        start = time.perf_counter()
+        assert writer.write_row(ROW)
+        worst = max(worst, time.perf_counter() - start)
+    assert worst < 0.01, f"caller waited {worst * 1000:.1f} ms"
+    
+    assert writer.close(timeout=5.0)
+    assert len(inner.rows) == 30 and inner.closed
+    print(f"   ✓ worst enqueue {worst * 1000:.2f} ms, all 30 rows drained")
+
+
+def test_async_writer_drop(directory):
+    """A full queue drops rows instead of blocking"""
+    print("5. Async writer drop policy")
+    inner = StallingWriter(os.path.join(directory, 'drop.csv'), stall_every=1, stall_seconds=0.05)
+    writer = AsyncLogWriter(inner, queue_size=5, policy='drop')
+    
+    start = time.perf_counter()
+    accepted = sum(writer.write_row(ROW) for _ in range(50))
+    assert time.perf_counter() - start < 0.05
+    assert writer.dropped == 50 - accepted and writer.dropped > 0
+    assert writer.max_depth <= 5
+    
+    writer.close(timeout=5.0)
+    assert len(inner.rows) == accepted
+    writer.print_stats()
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Log Writer Test ===\n")
+    directory = tempfile.mkdtemp(prefix='amlac_log_')
+    try:
+        test_buffered_writer(directory)
+        test_buffered_fsync(directory)
+        test_buffered_matches_direct(directory)
+        test_async_writer_stall(directory)
+        test_async_writer_drop(directory)
+        print("\n6. Throughput")
+        benchmark(num_rows=2000, directory=directory)
+        print("\n=== Log Writer Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the model metadata sidecar
+Checks saving/loading, rejection of stale sidecars, class-order handling,
+and that a model without a sidecar is read the way train_model.py wrote it
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+import config
+from model_metadata import (save_model_metadata, load_model_metadata, metadata_path_for,
+                            default_metadata, positive_class_score_fn, class_scores)
+
+REPO_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'models', 'model.tflite')
+
+METADATA = {
+    'class_names': ['algae', 'no_algae'],
+    'positive_class': 'algae',
+    'output_activation': 'sigmoid',
+    'output_units': 1,
+    'normalization': {'scale': 1.0 / 255.0, 'offset': 0.0, 'range': [0.0, 1.0]},
+    'confidence_threshold': 0.7
+}
+
+
+def test_sidecar(directory):
+    """A sidecar loads only for the model file it was written for"""
+    print("1. Sidecar loading")
+    model_path = os.path.join(directory, 'model.tflite')
+    with open(model_path, 'wb') as f:
+        f.write(b'model-v1')
+    
+    path = save_model_metadata(model_path, METADATA)
+    assert path == os.path.join(directory, 'model.meta.json')
+    loaded = load_model_metadata(model_path)
+    assert loaded['class_names'] == METADATA['class_names']
+    assert loaded['confidence_threshold'] == 0.7
+    assert loaded['model_file'] == 'model.tflite'
+    print("   ✓ Round trip")
+    
+    with open(model_path, 'wb') as f:
+        f.write(b'model-v2')  # Retrained model copied over, old sidecar kept
+    assert load_model_metadata(model_path) is None
+    print("   ✓ Sidecar for another model file ignored (sha256 mismatch)")
+    
+    save_model_metadata(model_path, METADATA)
+    with open(path) as f:
+        stored = json.load(f)
+    stored['format_version'] = 99
+    with open(path, 'w') as f:
+        json.dump(stored, f)
+    assert load_model_metadata(model_path) is None
+    
+    with open(path, 'w') as f:
+        f.write('{not json')
+    assert load_model_metadata(model_path) is None
+    os.remove(path)
+    assert load_model_metadata(model_path) is None
+    print("   ✓ Unknown version, unreadable and missing sidecars ignored")
+
+
+def test_class_order():
+    """The positive-class score follows the class order and activation"""
+    print("2. Class order")
+    score = positive_class_score_fn(METADATA)
+    assert abs(score(np.array([0.2])) - 0.8) < 1e-6, "sigmoid unit is P(no_algae)"
+    
+    flipped = dict(METADATA, class_names=['no_algae', 'algae'])
+    assert abs(positive_class_score_fn(flipped)(np.array([0.2])) - 0.2) < 1e-6
+    
+    softmax = dict(METADATA, output_activation='softmax', output_units=2)
+    assert abs(positive_class_score_fn(softmax)(np.array([0.3, 0.7])) - 0.3) < 1e-6
+    
+    scores = class_scores(METADATA, np.array([0.2]))
+    assert abs(scores['algae'] - 0.8) < 1e-6 and abs(scores['no_algae'] - 0.2) < 1e-6
+    print("   ✓ sigmoid (both orders) and softmax")
+    
+    # Without a sidecar: train_model.py's sigmoid, or Teachable Machine's softmax
+    assert abs(positive_class_score_fn(default_metadata(1))(np.array([0.2])) - 0.8) < 1e-6
+    assert abs(positive_class_score_fn(default_metadata(2))(np.array([0.3, 0.7])) - 0.7) < 1e-6
+    print("   ✓ Defaults without a sidecar: 1 unit -> 1 - p, 2 units -> class 1")
+
+
+def test_shipped_model(directory):
+    """The shipped model without a sidecar scores algae as 1 - output"""
+    print("3. Shipped model without a sidecar")
+    try:
+        from ml_inference import MLInference
+    except ImportError as e:
+        print(f"   Skipped: no TFLite interpreter ({e})")
+        return
+    
+    model_path = os.path.join(directory, 'shipped.tflite')
+    shutil.copy(REPO_MODEL_PATH, model_path)
+    assert not os.path.exists(metadata_path_for(model_path))
+    
+    autotune = config.ML_AUTOTUNE_ON_STARTUP
+    config.ML_AUTOTUNE_ON_STARTUP = False
+    try:
+        ml_model = MLInference(model_path=model_path, zero_copy=False)
+    finally:
+        config.ML_AUTOTUNE_ON_STARTUP = autotune
+    assert ml_model.model_loaded
+    assert ml_model.class_names == ['algae', 'no_algae'], ml_model.class_names
+    
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    _, confidence = ml_model.detect(frame)
+    raw = float(ml_model.interpreter.get_tensor(ml_model.output_details[0]['index'])[0][0])
+    assert abs(confidence - (1.0 - raw)) < 1e-6, (confidence, raw)
+    scores = ml_model.get_detailed_predictions(frame)
+    assert abs(scores['algae'] - confidence) < 1e-6, scores
+    print(f"   ✓ raw output {raw:.4f} (P(no_algae)) -> algae confidence {confidence:.4f}")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Model Metadata Test ===\n")
+    directory = tempfile.mkdtemp(prefix='amlac_meta_')
+    try:
+        test_sidecar(directory)
+        test_class_order()
+        test_shipped_model(directory)
+        print("\n=== Model Metadata Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for persisted interpreter autotune results
+Checks that tuning files are keyed on the model hash and the machine, that
+stale files are ignored, and (if a TFLite interpreter is installed) that the
+shipped model is hashed once per load and only tuned when asked to
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import config
+import model_metadata
+import model_tuning
+from model_tuning import save_tuning, load_tuning, tuning_path_for, file_sha256
+
+REPO_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'models', 'model.tflite')
+
+BEST = {'num_threads': 2, 'use_xnnpack': False, 'mean_ms': 12.5}
+
+
+def test_keying(directory):
+    """A tuning file applies only to the same model on the same kind of machine"""
+    print("1. Tuning file keying")
+    model_path = os.path.join(directory, 'model.tflite')
+    with open(model_path, 'wb') as f:
+        f.write(b'model-v1')
+    
+    path = save_tuning(model_path, BEST, [BEST])
+    assert path == tuning_path_for(model_path) == os.path.join(directory, 'model.tuning.json')
+    tuning = load_tuning(model_path)
+    assert tuning['num_threads'] == 2 and tuning['use_xnnpack'] is False
+    assert tuning['machine'] == platform.machine() and tuning['cpu_count'] == os.cpu_count()
+    
+    # A precomputed hash gives the same answer without reading the model
+    sha = file_sha256(model_path)
+    assert load_tuning(model_path, sha)['num_threads'] == 2
+    assert load_tuning(model_path, 'other') is None
+    print("   ✓ Loaded for the same model (hash given or computed)")
+    
+    with open(model_path, 'wb') as f:
+        f.write(b'model-v2')
+    assert load_tuning(model_path) is None
+    print("   ✓ Ignored after the model file changed")
+    
+    save_tuning(model_path, BEST, [BEST])
+    with open(path) as f:
+        tuning = json.load(f)
+    tuning['cpu_count'] = (os.cpu_count() or 1) + 4
+    with open(path, 'w') as f:
+        json.dump(tuning, f)
+    assert load_tuning(model_path) is None
+    
+    with open(path, 'w') as f:
+        f.write('{broken')
+    assert load_tuning(model_path) is None
+    print("   ✓ Ignored when tuned on another machine or unreadable")
+
+
+class HashCounter:
+    """Counts file_sha256 calls made through every module that uses it"""
+    
+    def __init__(self, modules):
+        self.modules = modules
+        self.calls = 0
+    
+    def __enter__(self):
+        def counting(path, *args, **kwargs):
+            self.calls += 1
+            return file_sha256(path, *args, **kwargs)
+        for module in self.modules:
+            module.file_sha256 = counting
+        return self
+    
+    def __exit__(self, *exc):
+        for module in self.modules:
+            module.file_sha256 = file_sha256
+
+
+def test_model_load(directory):
+    """The model is hashed once and only autotuned when enabled"""
+    print("2. Model load")
+    try:
+        import ml_inference
+        from ml_inference import MLInference
+    except ImportError as e:
+        print(f"   Skipped: no TFLite interpreter ({e})")
+        return
+    
+    model_path = os.path.join(directory, 'shipped.tflite')
+    shutil.copy(REPO_MODEL_PATH, model_path)
+    
+    assert config.ML_AUTOTUNE_ON_STARTUP is False, "autotune must be opt-in"
+    with HashCounter((ml_inference, model_tuning, model_metadata)) as hashes:
+        ml_model = MLInference(model_path=model_path)
+    assert ml_model.model_loaded
+    assert hashes.calls == 1, f"model hashed {hashes.calls} times"
+    assert not os.path.exists(tuning_path_for(model_path)), "tuned without being asked"
+    print("   ✓ Hashed once, no autotune by default")
+    
+    with HashCounter((ml_inference, model_tuning, model_metadata)) as hashes:
+        best = ml_model.autotune(thread_counts=[1, 2], try_xnnpack=False, num_runs=2)
+    assert best and hashes.calls == 0, hashes.calls
+    tuning = load_tuning(model_path)
+    assert tuning['num_threads'] == best['num_threads']
+    assert len(tuning['results']) == 2
+    
+    tuned = MLInference(model_path=model_path)
+    assert tuned.num_threads == best['num_threads']
+    print(f"   ✓ --autotune result used on the next load (threads={tuned.num_threads})")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Model Tuning Test ===\n")
+    directory = tempfile.mkdtemp(prefix='amlac_tuning_')
+    try:
+        test_keying(directory)
+        test_model_load(directory)
+        print("\n=== Model Tuning Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
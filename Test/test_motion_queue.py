@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the MotorController motion queue
+Runs against the simulated GPIO: checks that maneuvers run in the
+background, turns stop on the measured angle, and that stop_all and
+higher-priority commands preempt a running maneuver
+"""
+
+import os
+import sys
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from motor_controller import MotorController, PRIORITY_HIGH
+
+
+def test_background_drive(motors):
+    """Queued commands return at once and run in order"""
+    print("1. Background drive")
+    start = time.monotonic()
+    first = motors.forward_for(0.2, speed=40)
+    second = motors.ramp_to(20, 60, 0.2)
+    assert time.monotonic() - start < 0.05, "queueing blocked"
+    
+    time.sleep(0.1)
+    assert GPIO.duty_cycle(config.MOTOR1_ENA) == 40 and motors.motion_busy
+    assert motors.wait_motion(2)
+    assert first.status == second.status == 'done'
+    assert (motors.motor1_speed, motors.motor2_speed) == (20, 60)
+    print(f"   ✓ forward + ramp in {time.monotonic() - start:.2f} s, ended at 20/60")
+    motors.stop()
+
+
+def test_turn_by_angle(motors):
+    """Gyro-measured turn stops once the angle is reached"""
+    print("2. Turn by angle")
+    motors.yaw_rate_source = lambda: -180.0  # Clockwise, degrees/s
+    start = time.monotonic()
+    turn = motors.turn_by(90, speed=30)
+    time.sleep(0.1)
+    assert (motors.motor1_speed, motors.motor2_speed) == (30, -30)
+    assert turn.wait(2) and turn.status == 'done'
+    elapsed = time.monotonic() - start
+    assert 0.45 < elapsed < 0.7, f"90° at 180°/s took {elapsed:.2f} s"
+    assert motors.motor1_speed == motors.motor2_speed == 0
+    print(f"   ✓ 90° at 180°/s in {elapsed:.2f} s")
+    
+    motors.yaw_rate_source = None
+    start = time.monotonic()
+    motors.turn_by(-30, speed=config.TURN_SPEED).wait(3)
+    elapsed = time.monotonic() - start
+    expected = 30 / config.TURN_RATE_DEG_S
+    assert abs(elapsed - expected) < 0.15, f"timed turn {elapsed:.2f} s vs {expected:.2f} s"
+    print(f"   ✓ Timed turn without gyro: {elapsed:.2f} s")
+
+
+def test_preemption(motors):
+    """stop_all and higher-priority commands preempt a maneuver"""
+    print("3. Preemption")
+    long_turn = motors.turn_by(3600)
+    queued = motors.forward_for(5)
+    time.sleep(0.1)
+    start = time.monotonic()
+    motors.stop_all()
+    assert long_turn.wait(0.5) and long_turn.status == 'preempted'
+    elapsed = time.monotonic() - start
+    assert queued.status == 'preempted' and not motors.motion_busy
+    time.sleep(0.1)
+    assert GPIO.duty_cycle(config.MOTOR1_ENA) == 0
+    print(f"   ✓ stop_all preempted the turn in {elapsed * 1000:.0f} ms")
+    
+    slow = motors.forward_for(5, speed=30)
+    time.sleep(0.1)
+    urgent = motors.backward_for(0.1, speed=50, priority=PRIORITY_HIGH)
+    assert urgent.wait(1) and urgent.status == 'done'
+    assert slow.status == 'preempted'
+    print("   ✓ High-priority command preempted the running one")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Motion Queue Test ===\n")
+    simulation.reset_world(time_scale=0.0)
+    GPIO.setmode(GPIO.BCM)
+    motors = MotorController()
+    try:
+        test_background_drive(motors)
+        test_turn_by_angle(motors)
+        test_preemption(motors)
+        print("\n=== Motion Queue Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
+    finally:
+        motors.cleanup()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for vectorized image preprocessing
+Checks the NumPy resize modes against PIL on synthetic frames, benchmarks
+them, and checks that model predictions stay within tolerance of the PIL
+path (using config.MODEL_PATH, or the model shipped in models/)
+"""
+
+import os
+import sys
+import numpy as np
+from PIL import Image
+import config
+import preprocessing
+from preprocessing import FramePreprocessor, pil_preprocess
+
+REPO_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'models', 'model.tflite')
+
+
+def make_scene(seed, height=480, width=640, noise=4.0):
+    """Synthetic camera frame: smooth gradient, colored blobs and sensor noise"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    scene = np.stack([xx * 200 / width, yy * 200 / height, np.full_like(xx, 90)],
+                     axis=-1).astype(np.float64)
+    for _ in range(6):
+        cy, cx = rng.integers(0, height), rng.integers(0, width)
+        radius = rng.integers(20, 90)
+        scene[(yy - cy) ** 2 + (xx - cx) ** 2 < radius ** 2] = rng.integers(0, 255, 3)
+    return np.clip(scene + rng.normal(0, noise, scene.shape), 0, 255).astype(np.uint8)
+
+
+def load_sample_frames(sample_dir='/home/pi/amlac_robot/test_images/', count=5):
+    """Load sample images resized to the camera resolution, or synthetic frames"""
+    frames = []
+    
+    if os.path.exists(sample_dir):
+        for img_file in sorted(os.listdir(sample_dir)):
+            if img_file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                image = Image.open(os.path.join(sample_dir, img_file)).convert('RGB')
+                frames.append(np.array(image.resize((640, 480))))
+            if len(frames) >= count:
+                break
+    
+    while len(frames) < count:
+        frames.append(make_scene(len(frames)))
+    
+    return frames
+
+
+def test_against_pil():
+    """Vectorized modes reproduce the PIL LANCZOS reference"""
+    print("1. Vectorized modes vs PIL")
+    frames = {'smooth': make_scene(0, noise=0.0), 'noisy': make_scene(1, noise=20.0)}
+    
+    for name, frame in frames.items():
+        reference = pil_preprocess(frame, 224, 224)
+        # Bilinear samples two source pixels per output pixel, so it aliases
+        # on noise; it is only held to the reference on the smooth frame
+        modes = ('bilinear', 'area') if name == 'smooth' else ('area',)
+        for mode in modes:
+            output = FramePreprocessor(480, 640, 224, 224, mode=mode)(frame)
+            assert output.shape == reference.shape and output.dtype == np.float32
+            diff = np.abs(output - reference)
+            print(f"   {name:<6} {mode:<8} max diff {diff.max():.4f}, mean {diff.mean():.4f}")
+            
+            # Blob edges differ by resampling kernel only; on average the
+            # frames must agree to within a few grey levels
+            assert diff.mean() < 3.0 / 255, (name, mode, diff.mean())
+            if mode == 'area':
+                assert diff.max() < 0.1, (name, mode, diff.max())
+    
+    # Quantized input: the same area pixels, rounded into uint8
+    frame = frames['smooth']
+    quantized = FramePreprocessor(480, 640, 224, 224, mode='area', scale=1.0,
+                                  out_dtype=np.uint8)(frame)
+    area = FramePreprocessor(480, 640, 224, 224, mode='area')(frame)
+    assert quantized.dtype == np.uint8
+    assert np.abs(quantized - area * 255).max() <= 0.5 + 1e-3
+    print("   ✓ area/bilinear match PIL (float and uint8 output)")
+
+
+def test_benchmark():
+    """Time every mode against PIL"""
+    print("\n2. Preprocessing speed (no model needed)")
+    results = preprocessing.benchmark()
+    assert results['area']['max_abs_diff'] < 0.1, results['area']
+    print("   ✓ Area mode matches PIL output closely")
+
+
+def test_prediction_tolerance():
+    """Predictions with the area/bilinear modes stay within tolerance of PIL"""
+    print("\n3. Prediction tolerance")
+    try:
+        from ml_inference import MLInference
+    except ImportError as e:
+        print(f"   Skipped: no TFLite interpreter ({e})")
+        return
+    
+    model_path = config.MODEL_PATH
+    if not os.path.isfile(model_path):
+        model_path = os.path.normpath(REPO_MODEL_PATH)
+    
+    autotune = config.ML_AUTOTUNE_ON_STARTUP
+    config.ML_AUTOTUNE_ON_STARTUP = False
+    try:
+        ml_model = MLInference(model_path=model_path)
+    finally:
+        config.ML_AUTOTUNE_ON_STARTUP = autotune
+    assert ml_model.model_loaded, f"model did not load from {model_path}"
+    
+    comparison = ml_model.compare_preprocessing(load_sample_frames())
+    for mode in ('bilinear', 'area'):
+        assert comparison[mode]['within_tolerance'], (mode, comparison[mode])
+    print(f"   ✓ area/bilinear within ±{config.PREPROCESS_TOLERANCE} of PIL predictions")
+    if not comparison['nearest']['within_tolerance']:
+        print("   ⚠ nearest exceeds the tolerance - only use it with models trained on it")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Preprocessing Test ===\n")
+    try:
+        test_against_pil()
+        test_benchmark()
+        test_prediction_tolerance()
+        print("\n=== Preprocessing Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the binary record log
+Checks CSV <-> record round trips, the record writer and recovery from a
+partial record left by a power cut
+"""
+
+import os
+import sys
+import tempfile
+import config
+import record_log
+from log_writers import RecordLogWriter
+
+ROWS = [
+    ['2024-01-01 12:00:00', 'Yes', '0.8765', '14.599500', '120.984200', '1.50', 3, '25.50', 'P:2.5 R:-1.2'],
+    ['2024-01-01 12:00:02', 'No', '0.1200', 'N/A', 'N/A', '1.50', 3, 'N/A', ''],
+    ['2024-01-01 12:00:04', 'WARNING', 'Low battery, returning', '14.599500', 'N/A', 'N/A', 'N/A', '30.00', 'N/A'],
+    ['2024-01-01 12:00:06', 'Yes', '0.9100', '14.599600', '120.984300', '1.80', 4, '22.00', 'P:0.0 R:0.0'],
+]
+
+
+def test_round_trip(directory):
+    """CSV -> records -> CSV gives back the same rows"""
+    print("1. CSV round trip")
+    csv_path = os.path.join(directory, 'log.csv')
+    with open(csv_path, 'w') as f:
+        f.write(','.join(config.LOG_HEADERS) + '\n')
+        for row in ROWS:
+            f.write(','.join(f'"{v}"' if ',' in str(v) else str(v) for v in row) + '\n')
+    
+    rec_path = record_log.csv_to_records(csv_path)
+    back_path = record_log.records_to_csv(rec_path, os.path.join(directory, 'back.csv'))
+    with open(csv_path) as a, open(back_path) as b:
+        assert a.read() == b.read(), "round trip changed the CSV"
+    
+    records = record_log.load_records(rec_path)
+    assert len(records) == 4
+    assert (records['kind'] == record_log.KIND_DETECTION).sum() == 2
+    print(f"   ✓ {len(records)} rows, {os.path.getsize(rec_path)} vs {os.path.getsize(csv_path)} bytes")
+
+
+def test_writer_and_repair(directory):
+    """Writer appends records and recovers from a partial last record"""
+    print("2. Record writer and partial record")
+    path = os.path.join(directory, 'writer.rec')
+    writer = RecordLogWriter(path, buffer_rows=2, fsync_interval=None)
+    for row in ROWS[:3]:
+        writer.write_row(row)
+    writer.close()
+    assert record_log.record_count(path) == 3
+    
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 10)  # Power cut mid-record
+    assert len(record_log.load_records(path)) == 3
+    
+    writer = RecordLogWriter(path, fsync_interval=None)
+    writer.write_row(ROWS[3])
+    writer.close()
+    rows, _ = record_log.read_rows(path)
+    assert [r[0] for r in rows] == [r[0] for r in ROWS]
+    assert rows[2][1:3] == ['WARNING', 'Low battery, returning']
+    print("   ✓ Partial record truncated, event text restored")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Record Log Test ===\n")
+    directory = tempfile.mkdtemp(prefix='amlac_rec_')
+    try:
+        test_round_trip(directory)
+        test_writer_and_repair(directory)
+        print("\n=== Record Log Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the scan pipeline
+Uses counting stage functions, so no camera, model or sensors are needed
+"""
+
+import sys
+import threading
+import time
+from scan_pipeline import LatestSlot, ScanPipeline
+
+
+class Stages:
+    """Capture/detect/sensor functions that number their outputs"""
+    
+    def __init__(self, capture_time=0.02, detect_time=0.05, sensor_time=0.03):
+        self.capture_time = capture_time
+        self.detect_time = detect_time
+        self.sensor_time = sensor_time
+        self.frames = 0
+        self.readings = 0
+        self.detecting = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+    
+    def capture(self):
+        time.sleep(self.capture_time)
+        self.frames += 1
+        return self.frames
+    
+    def detect(self, frame):
+        self.detecting.set()
+        self.release.wait()
+        time.sleep(self.detect_time)
+        return (True, frame)
+    
+    def read_sensors(self):
+        time.sleep(self.sensor_time)
+        self.readings += 1
+        return {'reading': self.readings}
+
+
+def test_latest_slot():
+    """put() replaces, take() empties"""
+    print("1. Latest slot")
+    slot = LatestSlot()
+    slot.put(1)
+    slot.put(2)
+    assert slot.take(0.1) == 2
+    assert slot.take(0.05) is None
+    print("   ✓ Only the newest item is kept")
+
+
+def test_ordering_and_freshness():
+    """Each scan gets its own frame and snapshot, taken after the request"""
+    print("2. One fresh frame and snapshot per scan")
+    stages = Stages()
+    pipeline = ScanPipeline(stages.capture, stages.detect, stages.read_sensors)
+    pipeline.start()
+    try:
+        for scan in range(1, 6):
+            start = time.perf_counter()
+            detected, frame, sensor_data = pipeline.next_scan(timeout=2.0)
+            elapsed = time.perf_counter() - start
+            assert detected and frame == scan, (scan, frame)
+            assert sensor_data['reading'] == scan, (scan, sensor_data)
+            # Sensors overlap capture + inference
+            assert elapsed < 0.07 + 0.03, elapsed
+            time.sleep(0.5)  # Slow control loop
+        
+        # Nothing is captured or read ahead of the control loop
+        assert stages.frames == 5 and stages.readings == 5, (stages.frames, stages.readings)
+        report = pipeline.get_report()
+        assert report['frame_age']['max_ms'] < 150, report['frame_age']
+        assert report['sensor_age']['max_ms'] < 150, report['sensor_age']
+        print(f"   ✓ Frame age max {report['frame_age']['max_ms']:.0f} ms, "
+              f"sensor age max {report['sensor_age']['max_ms']:.0f} ms "
+              f"with a 500 ms loop")
+    finally:
+        pipeline.stop()
+
+
+def test_flush():
+    """A frame in inference during flush() is not returned afterwards"""
+    print("3. Flush drops work in progress")
+    stages = Stages()
+    pipeline = ScanPipeline(stages.capture, stages.detect, stages.read_sensors)
+    pipeline.start()
+    try:
+        stages.release.clear()
+        stages.detecting.clear()
+        
+        def stalled_scan():
+            try:
+                pipeline.next_scan(timeout=0.5)
+            except RuntimeError:
+                pass
+        
+        waiter = threading.Thread(target=stalled_scan)
+        waiter.start()
+        stages.detecting.wait()
+        waiter.join()
+        pipeline.flush()  # e.g. after a collection cycle
+        stages.release.set()
+        
+        _, frame, sensor_data = pipeline.next_scan(timeout=2.0)
+        assert frame == 2, frame
+        assert sensor_data['reading'] == 2, sensor_data
+        print("   ✓ Next scan uses a frame captured after the flush")
+    finally:
+        pipeline.stop()
+
+
+def test_stall():
+    """A stage that never produces raises instead of hanging"""
+    print("4. Stalled stage")
+    stages = Stages()
+    
+    def broken_sensors():
+        raise IOError("bus error")
+    
+    pipeline = ScanPipeline(stages.capture, stages.detect, broken_sensors)
+    pipeline.start()
+    try:
+        pipeline.next_scan(timeout=0.3)
+        assert False, "next_scan returned without sensor data"
+    except RuntimeError as e:
+        assert 'no sensor data' in str(e), e
+        print(f"   ✓ {e}")
+    finally:
+        pipeline.stop()
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Scan Pipeline Test ===\n")
+    try:
+        test_latest_slot()
+        test_ordering_and_freshness()
+        test_flush()
+        test_stall()
+        print("\n=== Scan Pipeline Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for per-sensor background sampling
+Checks that a slow sensor does not hold back the others, staleness and
+latency histograms, and SensorManager snapshots against simulated devices
+"""
+
+import os
+import sys
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from latency_stats import LatencyHistogram
+from sensor_sampler import SensorSamplers
+
+
+def test_independent_rates():
+    """Fast sensors keep their rate next to a slow one"""
+    print("1. Independent sampling rates")
+    counts = {'fast': 0, 'slow': 0}
+    
+    def fast():
+        counts['fast'] += 1
+        return {'fast_value': counts['fast']}
+    
+    def slow():
+        time.sleep(0.3)
+        counts['slow'] += 1
+        return {'slow_value': counts['slow']}
+    
+    samplers = SensorSamplers()
+    samplers.add('fast', fast, 0.01)
+    samplers.add('slow', slow, 0.05)
+    samplers.start()
+    time.sleep(0.6)
+    
+    start = time.perf_counter()
+    snapshot = samplers.store.snapshot()
+    elapsed = time.perf_counter() - start
+    samplers.stop()
+    
+    assert counts['fast'] > 30, counts
+    assert snapshot['fast_value'] > 30 and snapshot['slow_value'] >= 1, snapshot
+    assert samplers.samplers['slow'].overruns > 0
+    assert samplers.samplers['slow'].latency.percentile(0.5) == 500
+    print(f"   ✓ fast: {counts['fast']} samples, slow: {counts['slow']} "
+          f"(snapshot in {elapsed * 1e6:.1f} µs)")
+    
+    time.sleep(0.6)
+    assert samplers.stale_sensors() == ['fast', 'slow'], samplers.stale_sensors()
+    print("   ✓ Stopped sensors reported stale")
+    samplers.print_report(histograms=True)
+
+
+def test_histogram():
+    """Percentiles come from the bucket bounds"""
+    print("2. Latency histogram")
+    histogram = LatencyHistogram('test')
+    for ms in [0.3] * 90 + [15] * 9 + [2000]:
+        histogram.record(ms / 1000)
+    assert histogram.percentile(0.5) == 0.5
+    assert histogram.percentile(0.95) == 20
+    assert histogram.percentile(1.0) == float('inf')
+    assert sum(histogram.buckets) == histogram.count == 100
+    print("   ✓ p50 <= 0.5 ms, p95 <= 20 ms, max in the open bucket")
+
+
+def test_sensor_manager_snapshot():
+    """get_all_sensor_data returns the background snapshot"""
+    print("3. SensorManager snapshot")
+    simulation.reset_world(time_scale=1.0)
+    from sensor_manager import SensorManager
+    GPIO.setmode(GPIO.BCM)
+    sensors = SensorManager()
+    start = time.perf_counter()
+    sequential = sensors.get_all_sensor_data()
+    sequential_time = time.perf_counter() - start
+    
+    sensors.start_sampling()
+    try:
+        time.sleep(0.5)
+        start = time.perf_counter()
+        for _ in range(1000):
+            data = sensors.get_all_sensor_data()
+        elapsed = (time.perf_counter() - start) / 1000
+        
+        assert set(data) == set(sequential), set(data) ^ set(sequential)
+        assert data['distance'] is not None and data['orientation'] is not None
+        assert data['stale_sensors'] == [], data['stale_sensors']
+        print(f"   ✓ Snapshot in {elapsed * 1e6:.1f} µs "
+              f"(sequential read of all sensors: {sequential_time * 1000:.0f} ms)")
+        sensors.print_sampling_report()
+    finally:
+        sensors.cleanup()
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Sensor Sampler Test ===\n")
+    try:
+        test_independent_rates()
+        test_histogram()
+        test_sensor_manager_snapshot()
+        print("\n=== Sensor Sampler Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
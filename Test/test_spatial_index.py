@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the detection spatial index
+Compares grid queries with a brute-force scan and checks that the index
+built by DataLogger follows newly logged rows
+"""
+
+import os
+import random
+import sys
+import tempfile
+from data_logger import DataLogger
+from spatial_index import SpatialIndex, distance_m
+
+CENTER = (14.5995, 120.9842)
+
+
+def random_points(count, seed=1):
+    """Scan positions with a dense algae patch at CENTER"""
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        dense = i % 3 == 0
+        spread = 0.00005 if dense else 0.0005
+        points.append((CENTER[0] + rng.gauss(0, spread), CENTER[1] + rng.gauss(0, spread),
+                       dense or rng.random() < 0.1))
+    return points
+
+
+def test_queries_match_brute_force():
+    """bbox and radius return exactly the brute-force detections"""
+    print("1. Queries vs brute force")
+    points = random_points(3000)
+    index = SpatialIndex(cell_size_m=10)
+    for lat, lon, detected in points:
+        index.add(lat, lon, detected, 0.9 if detected else 0.1)
+    
+    box = (14.5990, 120.9838, 14.5998, 120.9846)
+    expected = sorted((lat, lon) for lat, lon, d in points
+                      if d and box[0] <= lat <= box[2] and box[1] <= lon <= box[3])
+    assert sorted(p[:2] for p in index.bbox(*box)) == expected, "bbox mismatch"
+    
+    for radius in (5, 20, 80):
+        expected = sum(1 for lat, lon, d in points if d and distance_m(*CENTER, lat, lon) <= radius)
+        found = index.radius(*CENTER, radius)
+        assert len(found) == expected, f"radius {radius}: {len(found)} vs {expected}"
+        assert found == sorted(found)
+    print(f"   ✓ {len(index.cells)} cells, bbox and radius match")
+    
+    top = index.densest(1)[0]
+    assert distance_m(*CENTER, top['lat'], top['lon']) < 15, top
+    assert sum(b['detections'] for b in index.heatmap(50)) == index.total_points
+    print(f"   ✓ Densest cell {distance_m(*CENTER, top['lat'], top['lon']):.1f} m from the patch")
+
+
+def test_logger_index_updates(directory):
+    """Rows logged after the index is built are added to it"""
+    print("2. Incremental updates through DataLogger")
+    logger = DataLogger(log_file_path=os.path.join(directory, 'collection_log.csv'))
+    for lat, lon, detected in random_points(200):
+        logger.log_detection(detected, 0.9, lat, lon, 1.0, 0, 30.0, None)
+    
+    index = logger.get_spatial_index()
+    before = index.total_points
+    
+    target = (14.6020, 120.9870)  # ~370 m north-east
+    for _ in range(10):
+        logger.log_detection(True, 0.95, target[0], target[1], 1.0, 0, 30.0, None)
+    logger.log_detection(True, 0.95, None, None, 1.0, 0, 30.0, None)  # No GPS fix
+    logger.flush()
+    assert index.total_points == before + 10
+    
+    dense = index.nearest_dense(14.6025, 120.9875, min_detections=10)
+    assert dense and distance_m(*target, dense['lat'], dense['lon']) < 10, dense
+    logger.close()
+    print(f"   ✓ Nearest dense cell {dense['distance_m']:.0f} m away")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Spatial Index Test ===\n")
+    try:
+        test_queries_match_brute_force()
+        test_logger_index_updates(tempfile.mkdtemp(prefix='amlac_spatial_'))
+        print("\n=== Spatial Index Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the background stepper driver
+Runs against the simulated GPIO: checks the ramp profile, that a conveyor
+cycle runs while the caller keeps going, cancellation and step timing
+"""
+
+import os
+import sys
+import time
+
+os.environ['AMLAC_SIMULATION'] = '1'
+
+import config
+import simulation
+from hardware import GPIO
+from stepper_driver import StepperDriver, step_schedule
+
+
+def test_schedule():
+    """Trapezoidal profile: ramps at both ends, cruise speed in the middle"""
+    print("1. Step schedule")
+    offsets = step_schedule(2000, 1000, start_speed=200, acceleration=4000)
+    gaps = offsets[1:] - offsets[:-1]
+    assert abs(gaps[0] - 1 / 200) < 1e-9 and abs(gaps[-1] - gaps[0]) < 1e-3
+    assert abs(gaps[1000] - 1 / 1000) < 1e-9
+    assert (gaps[:100] >= gaps[1:101]).all(), "ramp up should only shorten gaps"
+    
+    flat = step_schedule(1000, 1000, acceleration=0)
+    assert abs(flat[-1] - 0.999) < 1e-9
+    print(f"   ✓ 2000 steps in {offsets[-1]:.2f} s (flat: {flat[-1]:.2f} s)")
+
+
+def test_background_move():
+    """start() returns at once; wait() sees every pulse"""
+    print("2. Background move")
+    driver = StepperDriver()
+    before = GPIO.pulse_count(config.STEPPER_PUL)
+    
+    start = time.perf_counter()
+    driver.start(400, 'backward', speed=2000)
+    returned = time.perf_counter() - start
+    assert returned < 0.05, f"start() blocked for {returned:.3f} s"
+    assert driver.busy and GPIO.level(config.STEPPER_DIR) == GPIO.LOW
+    
+    assert driver.wait(5)
+    elapsed = time.perf_counter() - start
+    planned = step_schedule(400, 2000)[-1]
+    assert GPIO.pulse_count(config.STEPPER_PUL) - before == 400
+    assert driver.completed and driver.progress == 1.0
+    assert elapsed < planned + 0.1, f"{elapsed:.3f} s for a {planned:.3f} s move"
+    print(f"   ✓ start() took {returned * 1000:.1f} ms, move {elapsed:.3f} s "
+          f"(planned {planned:.3f} s)")
+    driver.print_stats()
+
+
+def test_cancel_and_conveyor():
+    """A running conveyor cycle can be cancelled part-way"""
+    print("3. Conveyor cycle and cancel")
+    from motor_controller import MotorController
+    motors = MotorController()
+    
+    motors.start_conveyor(steps=3000, speed=1000)
+    time.sleep(0.3)
+    assert motors.conveyor_busy and motors.stepper_enabled
+    assert 0.0 < motors.stepper.progress < 1.0
+    
+    motors.stop_conveyor()
+    assert not motors.conveyor_busy and not motors.stepper_enabled
+    assert not motors.stepper.completed
+    sent = motors.stepper.steps_done
+    time.sleep(0.05)
+    assert motors.stepper.steps_done == sent, "pulses after cancel"
+    print(f"   ✓ Cancelled after {sent} of 3000 steps")
+    
+    motors.start_conveyor(steps=100, hold=0.1)
+    assert motors.stepper.wait(5)
+    assert not motors.stepper_enabled, "stepper left enabled after the cycle"
+    print("   ✓ Stepper disabled when the cycle completes")
+    motors.cleanup()
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Stepper Driver Test ===\n")
+    simulation.reset_world(time_scale=0.0)
+    GPIO.setmode(GPIO.BCM)
+    try:
+        test_schedule()
+        test_background_move()
+        test_cancel_and_conveyor()
+        print("\n=== Stepper Driver Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
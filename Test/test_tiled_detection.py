@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for tiled detection
+Checks the tile grid geometry and that the heatmap holds each tile's own
+detect() confidence (needs a TFLite interpreter for the shipped model)
+"""
+
+import os
+import sys
+import numpy as np
+import config
+
+REPO_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'models', 'model.tflite')
+
+
+def load_model():
+    """Load the shipped model without autotuning"""
+    from ml_inference import MLInference
+    autotune = config.ML_AUTOTUNE_ON_STARTUP
+    config.ML_AUTOTUNE_ON_STARTUP = False
+    try:
+        ml_model = MLInference(model_path=REPO_MODEL_PATH)
+    finally:
+        config.ML_AUTOTUNE_ON_STARTUP = autotune
+    assert ml_model.model_loaded
+    return ml_model
+
+
+def check_grid(ml_model, frame_height, frame_width, tile_size, overlap):
+    """Tiles cover the frame edge to edge with at least the requested overlap"""
+    rows, cols, tile_height, tile_width = ml_model.tile_grid(
+        frame_height, frame_width, tile_size, overlap
+    )
+    for starts, length, tile in ((rows, frame_height, tile_height),
+                                 (cols, frame_width, tile_width)):
+        assert starts[0] == 0 and starts[-1] + tile == length, (starts, length, tile)
+        steps = np.diff(starts)
+        assert np.all(steps > 0), starts
+        if len(starts) > 1:
+            assert steps.max() <= tile * (1.0 - overlap), (steps, tile, overlap)
+    return rows, cols, tile_height, tile_width
+
+
+def test_tile_grid(ml_model):
+    """Grid size and coverage for the camera frame and odd sizes"""
+    print("1. Tile grid")
+    rows, cols, tile_height, tile_width = check_grid(ml_model, 480, 640, None, 0.25)
+    assert (tile_height, tile_width) == (224, 224)
+    assert (len(rows), len(cols)) == (3, 4), (rows, cols)
+    print(f"   ✓ 640x480 at 224: {len(rows)}x{len(cols)} grid, rows {rows}, cols {cols}")
+    
+    for shape, tile_size, overlap in (((480, 640), 160, 0.5), ((481, 997), 224, 0.1),
+                                      ((224, 224), None, 0.25), ((100, 300), None, 0.25)):
+        rows, cols, tile_height, tile_width = check_grid(ml_model, shape[0], shape[1],
+                                                         tile_size, overlap)
+    # Frames smaller than a tile use one tile clipped to the frame
+    assert (rows, cols, tile_height, tile_width) == ([0], [0, 76], 100, 224)
+    print("   ✓ Edges covered and overlap kept for other sizes and overlaps")
+
+
+def test_heatmap(ml_model):
+    """Each heatmap cell is detect() on that tile"""
+    print("2. Heatmap")
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    frame[300:380, 500:600] = (40, 140, 60)  # Green patch in one corner
+    
+    detected, max_confidence, heatmap = ml_model.detect_tiled(frame)
+    rows, cols, tile_height, tile_width = ml_model.tile_grid(480, 640)
+    assert heatmap.shape == (len(rows), len(cols)), heatmap.shape
+    
+    for i, y in enumerate(rows):
+        for j, x in enumerate(cols):
+            _, confidence = ml_model.detect(frame[y:y + tile_height, x:x + tile_width])
+            assert abs(heatmap[i, j] - confidence) < 1e-5, (i, j, heatmap[i, j], confidence)
+    assert max_confidence == float(heatmap.max())
+    assert detected == (max_confidence > ml_model.confidence_threshold)
+    print(f"   ✓ {heatmap.shape[0]}x{heatmap.shape[1]} heatmap matches per-tile detect(), "
+          f"max {max_confidence:.3f}")
+    
+    # RGBA frames are cut to RGB like detect() does
+    rgba = np.dstack([frame, np.full(frame.shape[:2], 255, dtype=np.uint8)])
+    assert np.allclose(ml_model.detect_tiled(rgba)[2], heatmap, atol=1e-5)
+    print("   ✓ RGBA frame gives the same heatmap")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Tiled Detection Test ===\n")
+    try:
+        ml_model = load_model()
+    except ImportError as e:
+        print(f"Skipped: no TFLite interpreter ({e})")
+        sys.exit(0)
+    try:
+        test_tile_grid(ml_model)
+        test_heatmap(ml_model)
+        print("\n=== Tiled Detection Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
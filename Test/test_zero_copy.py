@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for zero-copy interpreter tensors
+Runs the shipped model with zero_copy on and off and checks that detect(),
+get_detailed_predictions() and detect_tiled() give the same results
+"""
+
+import os
+import sys
+import numpy as np
+import config
+
+REPO_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'models', 'model.tflite')
+
+MODES = ('area', 'bilinear', 'nearest', 'pil')
+
+
+def load_models(mode):
+    """Load the shipped model twice: copy path and zero-copy path"""
+    from ml_inference import MLInference
+    autotune = config.ML_AUTOTUNE_ON_STARTUP
+    config.ML_AUTOTUNE_ON_STARTUP = False
+    try:
+        copy_model = MLInference(model_path=REPO_MODEL_PATH, preprocess_mode=mode,
+                                 zero_copy=False)
+        zero_copy_model = MLInference(model_path=REPO_MODEL_PATH, preprocess_mode=mode,
+                                      zero_copy=True)
+    finally:
+        config.ML_AUTOTUNE_ON_STARTUP = autotune
+    assert copy_model.model_loaded and zero_copy_model.model_loaded
+    return copy_model, zero_copy_model
+
+
+def make_frames():
+    """Camera-size, model-size and RGBA frames"""
+    rng = np.random.default_rng(0)
+    camera = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    camera[200:400, 100:350] = (40, 140, 60)
+    model_size = rng.integers(0, 255, (224, 224, 3), dtype=np.uint8)
+    rgba = np.dstack([camera[::-1], np.full((480, 640), 255, dtype=np.uint8)])
+    return {'640x480': camera, '224x224': model_size, 'RGBA': rgba}
+
+
+def test_detect_matches():
+    """Same confidences from both paths for every preprocessing mode"""
+    print("1. detect() and class scores")
+    frames = make_frames()
+    for mode in MODES:
+        copy_model, zero_copy_model = load_models(mode)
+        for name, frame in frames.items():
+            expected = copy_model.detect(frame)
+            result = zero_copy_model.detect(frame)
+            assert result[0] == expected[0], (mode, name, result, expected)
+            assert abs(result[1] - expected[1]) < 1e-6, (mode, name, result, expected)
+            
+            expected_scores = copy_model.get_detailed_predictions(frame)
+            scores = zero_copy_model.get_detailed_predictions(frame)
+            assert scores.keys() == expected_scores.keys()
+            for label in scores:
+                assert abs(scores[label] - expected_scores[label]) < 1e-6, (mode, name, label)
+        print(f"   ✓ {mode}: {', '.join(frames)} match")
+
+
+def test_results_not_overwritten():
+    """A returned confidence is not changed by the next inference"""
+    print("2. Results survive the next inference")
+    copy_model, zero_copy_model = load_models('area')
+    frames = list(make_frames().values())
+    results = [zero_copy_model.detect(frame)[1] for frame in frames]
+    expected = [copy_model.detect(frame)[1] for frame in frames]
+    assert np.allclose(results, expected, atol=1e-6), (results, expected)
+    assert len(set(results)) == len(results), results
+    
+    _, _, heatmap = zero_copy_model.detect_tiled(frames[0])
+    _, _, expected_heatmap = copy_model.detect_tiled(frames[0])
+    assert np.allclose(heatmap, expected_heatmap, atol=1e-6)
+    print(f"   ✓ {len(results)} confidences and a {heatmap.shape[0]}x{heatmap.shape[1]} "
+          f"tiled heatmap match the copy path")
+
+
+if __name__ == "__main__":
+    print("=== AMLAC Zero-Copy Tensor Test ===\n")
+    try:
+        import ml_inference
+    except ImportError as e:
+        print(f"Skipped: no TFLite interpreter ({e})")
+        sys.exit(0)
+    try:
+        test_detect_matches()
+        test_results_not_overwritten()
+        print("\n=== Zero-Copy Tensor Test Complete ===")
+    except AssertionError as e:
+        print(f"\n⚠ Test failed: {e}")
+        sys.exit(1)
@@ -51,6 +51,12 @@ SIM800C_BAUD = 115200
 LCD_I2C_ADDRESS = 0x27
 TCS34725_I2C_ADDRESS = 0x29
 MPU6050_I2C_ADDRESS = 0x68
+I2C_ARBITER_ENABLED = True  # Serialize all I2C traffic through one priority arbiter
+I2C_PRIORITIES = {  # Higher goes first when several threads wait for the bus
+    'mpu6050': 2,
+    'tcs34725': 1,
+    'lcd': 0
+}
 
 # ===========================
 # ML Model Configuration
@@ -58,6 +64,19 @@ MPU6050_I2C_ADDRESS = 0x68
 MODEL_PATH = '/home/pi/amlac_robot/models/model.tflite'
 MODEL_INPUT_SIZE = 224  # Teachable Machine standard size
 CONFIDENCE_THRESHOLD = 0.7  # Minimum confidence for algae detection
+PREPROCESS_MODE = 'auto'  # 'pil' (LANCZOS), 'nearest', 'bilinear', 'area' or
+                         # 'auto' (model metadata recommendation, else 'area')
+PREPROCESS_TOLERANCE = 0.05  # Max confidence difference vs PIL path
+ML_ZERO_COPY = True  # Write input/read output via interpreter tensor views
+ML_NUM_THREADS = 4  # Interpreter threads when no autotune result exists
+ML_USE_XNNPACK = True  # XNNPACK delegate when no autotune result exists
+ML_AUTOTUNE_ON_STARTUP = False  # Autotune at boot if not yet tuned (else: python3 ml_inference.py --autotune)
+ML_AUTOTUNE_THREADS = [1, 2, 3, 4]  # Thread counts tried by the autotuner
+ML_AUTOTUNE_XNNPACK = True  # Also try with XNNPACK disabled
+ML_AUTOTUNE_RUNS = 20  # Benchmark runs per autotune setting
+ML_TILED_DETECTION = False  # Detect on overlapping full-resolution tiles
+ML_TILE_SIZE = None  # Tile size in camera pixels (None = model input size)
+ML_TILE_OVERLAP = 0.25  # Minimum overlap between neighbouring tiles (0-1)
 
 # ===========================
 # System Timing
@@ -68,24 +87,102 @@ LCD_ROTATION_INTERVAL = 5  # Seconds between LCD display changes
 ULTRASONIC_TIMEOUT = 1.0  # Seconds
 GPS_TIMEOUT = 2.0  # Seconds
 
+# ===========================
+# Scan Pipeline
+# ===========================
+PIPELINE_ENABLED = True  # Read sensors while each frame is captured and inferred
+PIPELINE_STAGE_TIMEOUT = 10.0  # Seconds before a stalled stage raises an error
+PIPELINE_REPORT_INTERVAL = 30  # Loops between latency reports
+
+# ===========================
+# Frame Change Gate
+# ===========================
+FRAME_GATE_ENABLED = True  # Reuse the last detection when the scene is unchanged
+FRAME_GATE_LUMA_THRESHOLD = 6.0  # Mean absolute luminance change in any grid cell (0-255)
+FRAME_GATE_HIST_THRESHOLD = 0.15  # Luminance histogram L1 distance (0-2)
+FRAME_GATE_REFRESH_INTERVAL = 30.0  # Seconds before inference is forced anyway
+FRAME_GATE_STRIDE = 8  # Sample every Nth pixel (640x480 -> 80x60)
+FRAME_GATE_GRID = 8  # Luminance difference per cell of an 8x8 grid, max over cells
+
 # ===========================
 # Motor Configuration
 # ===========================
 PWM_FREQUENCY = 1000  # Hz for motor PWM
 DEFAULT_SPEED = 50  # Default motor speed (0-100)
 TURN_SPEED = 40  # Speed for turning maneuvers
+STEPPER_SPEED = 1000  # Stepper cruise speed (steps per second)
+STEPPER_START_SPEED = 200  # Steps per second at the start and end of a ramp
+STEPPER_ACCELERATION = 4000  # Steps/s² (0 = start at full speed)
+STEPPER_PULSE_WIDTH = 0.00001  # Seconds PUL is held HIGH (TB6600 needs >= 2.5 µs)
+CONVEYOR_STEPS = 2000  # Stepper steps per collection cycle
+MOTION_TICK = 0.02  # Seconds between motion executor updates (50 Hz)
+TURN_RATE_DEG_S = 60  # Estimated turn rate at TURN_SPEED, used when no gyro is available
+MOTION_TURN_TIMEOUT = 4.0  # Max seconds for a gyro-measured turn
+OBSTACLE_TURN_ANGLE = 90  # Degrees to turn away from an obstacle
+OBSTACLE_TURN_SPEED = 30  # Paddle speed while turning away from an obstacle
+PADDLE_RAMP_RATE = None  # Max paddle speed change in %/s (None = jump; e.g. 200)
+ACTUATOR_TIMELINE_SIZE = 5000  # Actuator changes kept for save/replay
 
 # ===========================
 # Sensor Configuration
 # ===========================
 HX711_CALIBRATION_FACTOR = 2280  # Adjust based on your load cell
+WEIGHT_SAMPLING = True  # Read the HX711 continuously on a background thread
+WEIGHT_SAMPLE_INTERVAL = 0.1  # Minimum seconds between conversions (HX711 at 10 SPS)
+WEIGHT_MEDIAN_WINDOW = 9  # Samples in the running median (~1 s, longer than a ripple)
+WEIGHT_EMA_ALPHA = 0.2  # EMA weight of each new median
+WEIGHT_STABLE_BAND_G = 20  # Weight is stable when the median window spans at most this (grams)
+WEIGHT_MOTION_LIMIT_G = 0.15  # Drop samples while |accel| differs from 1 g by more (needs IMU_STREAMING)
 ULTRASONIC_MAX_DISTANCE = 400  # cm
+ULTRASONIC_MODE = 'edge'  # 'edge' (GPIO edge callbacks) or 'poll' (busy-wait on the echo pin)
+ULTRASONIC_SAMPLES = 3  # Pings per reading in edge mode (median)
+ULTRASONIC_PING_INTERVAL = 0.06  # Seconds between pings (JSN-SR04T measuring cycle)
+ULTRASONIC_ECHO_TIMEOUT = 0.05  # Seconds to wait for an echo in edge mode
+ULTRASONIC_OUTLIER_CM = 10  # Pings further than this (or 10%) from the median are dropped
 GPS_VALID_FIX_QUALITY = 1  # Minimum GPS fix quality
+GPS_BACKGROUND_READER = True  # Read NMEA in a background thread, serve cached fix
+GPS_MAX_FIX_AGE = 5.0  # Seconds before a cached GPS fix is considered lost
+SENSOR_SAMPLING_ENABLED = True  # Sample each sensor on its own thread (main.py)
+SENSOR_SAMPLE_INTERVALS = {  # Seconds between background samples per sensor
+    'gps': 0.2,
+    'color': 0.5,
+    'ultrasonic': 0.2,
+    'imu': 0.05,
+    'weight': 0.5,
+    'float_switch': 0.1
+}
+SENSOR_STALE_FACTOR = 5  # A sensor is stale after this many missed intervals
+IMU_STREAMING = True  # Sample the IMU on its own thread and fuse orientation (main.py)
+IMU_RATE_HZ = 100  # IMU sample rate when streaming
+IMU_USE_FIFO = False  # Drain the MPU6050 FIFO instead of polling the data registers
+IMU_FIFO_POLL_INTERVAL = 0.02  # FIFO mode: seconds between FIFO drains
+IMU_FILTER_ALPHA = 0.98  # Complementary filter gyro weight (rest corrects toward accel tilt)
+IMU_CALIBRATION_SAMPLES = 100  # Samples averaged for the gyro bias at startup (robot still)
 
 # ===========================
 # Data Logging
 # ===========================
 LOG_FILE_PATH = '/home/pi/amlac_robot/collection_log.csv'
+LOG_WRITE_MODE = 'buffered'  # 'direct' (open/append/close per row) or 'buffered'
+LOG_FORMAT = 'csv'  # 'csv' or 'binary' (NumPy records in a .rec file, see record_log.py)
+LOG_BUFFER_ROWS = 20  # Buffered mode: flush after this many rows
+LOG_FLUSH_INTERVAL = 5.0  # Buffered mode: flush rows older than this (seconds)
+LOG_FSYNC_INTERVAL = 30.0  # Buffered mode: seconds between fsyncs (0 = every flush, None = never)
+LOG_ASYNC = True  # Write log rows on a background thread
+LOG_QUEUE_SIZE = 1000  # Async mode: max rows waiting to be written
+LOG_QUEUE_POLICY = 'drop'  # Async mode when full: 'drop' the row or 'block' (up to timeout)
+LOG_QUEUE_BLOCK_TIMEOUT = 0.05  # Async 'block' policy: max seconds the caller waits
+LOG_DRAIN_TIMEOUT = 5.0  # Seconds to wait for queued rows at shutdown
+LOG_STATS_CHECKPOINT_INTERVAL = 60.0  # Seconds between saves of the running statistics checkpoint
+LOG_ROTATION_ENABLED = True  # Move full/old logs into compressed archive segments
+LOG_ROTATE_MAX_BYTES = 10 * 1024 * 1024  # Rotate when the active log reaches this size (None = never)
+LOG_ROTATE_DAILY = True  # Rotate when the date changes
+LOG_ROTATE_ON_START = False  # Start a new segment for every mission (robot start)
+LOG_ARCHIVE_DIR = None  # Archive folder (None = 'archive' next to the log file)
+LOG_COMPRESSION = 'gzip'  # 'gzip', 'zstd' (needs zstandard) or 'none'
+LOG_ARCHIVE_MAX_BYTES = None  # Delete oldest segments beyond this compressed size (None = keep all)
+SPATIAL_CELL_SIZE_M = 10.0  # Grid cell size of the detection spatial index (metres)
+SPATIAL_DENSE_MIN_DETECTIONS = 5  # Detections for a cell to count as dense (route target)
 LOG_HEADERS = [
     'Timestamp',
     'Algae_Detected',
@@ -98,6 +195,18 @@ LOG_HEADERS = [
     'Orientation'
 ]
 
+# ===========================
+# Simulation (off-robot runs)
+# ===========================
+SIMULATION = False  # Use simulated hardware (or set AMLAC_SIMULATION=1)
+SIM_FRAMES_PATH = None  # Image directory or video file (None = synthetic water)
+SIM_NMEA_FILE = None  # Recorded NMEA log to replay (None = synthetic fix)
+SIM_TRACE_FILE = None  # CSV sensor trace (None = calm water defaults)
+SIM_TIME_SCALE = 1.0  # Multiplier for simulated device latencies (0 = none)
+SIM_GPS_PERIOD = 1.0  # Seconds between simulated GPS sentence bursts
+SIM_SEED = 0  # Seed for latency jitter and sensor noise
+SIM_RECORD_LIMIT = 10000  # GPIO/LCD events kept by the recording sinks
+
 # ===========================
 # Safety Limits
 # ===========================
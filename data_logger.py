@@ -1,30 +1,48 @@
 """
 Data Logger Module for AMLAC Robot
-Handles CSV logging of all detection events and sensor data
+Handles CSV (or binary record) logging of all detection events and sensor data
 """
 
 import csv
 import os
 from datetime import datetime
 import config
+import record_log
+from log_writers import create_writer, AsyncLogWriter
+from log_statistics import LogStatistics
+from log_archive import LogArchive
+from spatial_index import SpatialIndex
+from event_log import create_event_writer, event_log_path_for, make_event
 
 class DataLogger:
     """
     Logs all algae detection events and sensor data to CSV file
     """
     
-    def __init__(self, log_file_path=None):
+    def __init__(self, log_file_path=None, write_mode=None, log_format=None):
         """
         Initialize data logger
         
         Args:
             log_file_path (str): Path to CSV log file
+            write_mode (str): 'direct' or 'buffered' (default from config)
+            log_format (str): 'csv' or 'binary' (default from config); binary
+                              logs go to the same path with a .rec extension
         """
         if log_file_path is None:
             log_file_path = config.LOG_FILE_PATH
+        if write_mode is None:
+            write_mode = config.LOG_WRITE_MODE
+        if log_format is None:
+            log_format = config.LOG_FORMAT
+        
+        if log_format == 'binary':
+            log_file_path = record_log.record_path_for(log_file_path)
         
         self.log_file_path = log_file_path
         self.headers = config.LOG_HEADERS
+        self.write_mode = write_mode
+        self.log_format = log_format
         
         print(f"Initializing data logger...")
         print(f"Log file: {self.log_file_path}")
@@ -45,11 +63,47 @@ class DataLogger:
         else:
             print("✓ Using existing log file")
         
+        # Compressed segments of rotated logs
+        self.archive = None
+        if config.LOG_ROTATION_ENABLED:
+            self.archive = LogArchive(self.log_file_path)
+            self.archive.recover()
+            print(f"✓ Rotation: {len(self.archive.segments)} archived segments in "
+                  f"{self.archive.archive_dir}")
+        
+        # Running statistics, updated as rows reach the file
+        self.stats = LogStatistics(self.log_file_path,
+                                   archived=self.archive.statistics_states if self.archive else None)
+        source = self.stats.load()
+        print(f"✓ Statistics: {self.stats.total_rows} rows ({source})")
+        
+        self._spatial = None  # Built on first get_spatial_index()
+        self._rotation_pending = False  # Async mode: rotation queued on the writer thread
+        
+        # Events go to their own JSON lines stream, not the detection table
+        self.event_log_path = event_log_path_for(self.log_file_path)
+        self.event_writer = create_event_writer(self.event_log_path)
+        print(f"✓ Event log: {self.event_log_path}")
+        
+        self.writer = create_writer(self.log_file_path, self.write_mode,
+                                    on_write=self._rows_written, log_format=self.log_format)
+        self._start_segment()
+        print(f"✓ Write mode: {self.write_mode}, {self.log_format}"
+              f"{' (background thread)' if isinstance(self.writer, AsyncLogWriter) else ''}")
+        
+        if config.LOG_ROTATE_ON_START:
+            self.rotate('mission')
+        
         print()
     
     def _create_log_file(self):
-        """Create new CSV file with headers"""
+        """Create new CSV file with headers (or an empty record log)"""
         try:
+            if self.log_format == 'binary':
+                record_log.create_record_file(self.log_file_path)
+                self.file_exists = True
+                return
+            
             with open(self.log_file_path, 'w', newline='') as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(self.headers)
@@ -96,105 +150,223 @@ class DataLogger:
                 orientation_str
             ]
             
-            # Append to CSV file
-            with open(self.log_file_path, 'a', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(row)
-            
-            # Flush to ensure data is written immediately
-            # (This is automatic with 'with' statement, but being explicit)
+            # Append to CSV file (buffered writers batch rows, see log_writers.py)
+            self.writer.write_row(row)
             
             print(f"[LOG] {timestamp} - Algae: {algae_detected}, Confidence: {confidence:.2%}, Count: {collection_count}")
             
         except Exception as e:
             print(f"Error logging data: {e}")
     
-    def log_event(self, event_type, message, sensor_data=None):
+    def log_event(self, event_type, message, sensor_data=None, code=None):
         """
-        Log a general event (errors, warnings, status changes)
+        Log a general event (errors, warnings, status changes) to the
+        structured event log, see event_log.py
         
         Args:
-            event_type (str): Type of event (ERROR, WARNING, INFO)
+            event_type (str): Level of event (ERROR, WARNING, INFO)
             message (str): Event message
             sensor_data (dict): Optional sensor data to include
+            code (str): Optional machine-readable event code, e.g. 'BIN_FULL'
         """
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Create a special row for events
-            row = [
-                timestamp,
-                event_type,
-                message,
-                sensor_data.get('gps_lat', 'N/A') if sensor_data else 'N/A',
-                sensor_data.get('gps_lon', 'N/A') if sensor_data else 'N/A',
-                sensor_data.get('weight', 'N/A') if sensor_data else 'N/A',
-                'N/A',
-                sensor_data.get('distance', 'N/A') if sensor_data else 'N/A',
-                'N/A'
-            ]
+            event = make_event(event_type, message, code, sensor_data)
+            self.event_writer.write_row(event)
             
-            with open(self.log_file_path, 'a', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(row)
-            
-            print(f"[{event_type}] {timestamp} - {message}")
+            print(f"[{event['level']}] {event['time']} - {message}")
             
         except Exception as e:
             print(f"Error logging event: {e}")
     
-    def get_statistics(self):
+    def poll(self):
+        """
+        Flush buffered rows that exceeded the flush interval and rotate the
+        log when due (call from the main loop)
+        """
+        try:
+            self.writer.poll()
+            self.event_writer.poll()
+        except Exception as e:
+            print(f"Error flushing log: {e}")
+        
+        reason = None if self._rotation_pending else self._rotation_reason()
+        if reason:
+            self.rotate(reason)
+    
+    def _rows_written(self, rows, offset):
+        """Writer callback: rows reached the log file"""
+        self.stats.rows_written(rows, offset)
+        if self._spatial is not None:
+            self._spatial.add_rows(rows)
+    
+    def _read_active_rows(self):
+        """Read all rows of the active log file"""
+        if self.log_format == 'binary':
+            return record_log.read_rows(self.log_file_path)[0]
+        with open(self.log_file_path, 'r', newline='') as csvfile:
+            return list(csv.reader(csvfile))[1:]
+    
+    def get_spatial_index(self):
         """
-        Calculate statistics from log file
+        Get the spatial index of logged detections
+        Built from the archive and the active log on first use, then
+        updated as rows are written.
         
         Returns:
-            dict: Statistics including total detections, average confidence, etc.
+            SpatialIndex: See spatial_index.py for bbox/radius/heatmap queries
+        """
+        if self._spatial is None:
+            self.flush()
+            index = SpatialIndex()
+            if self.archive:
+                self.archive.wait()
+                for entry in self.archive.segments:
+                    index.add_rows(self.archive.read_segment(entry))
+            index.add_rows(self._read_active_rows())
+            self._spatial = index
+        return self._spatial
+    
+    def _start_segment(self):
+        """Remember the header size and date of the active log file"""
+        if self.log_format == 'binary':
+            self._empty_size = record_log.HEADER_SIZE
+        else:
+            with open(self.log_file_path, 'rb') as f:
+                self._empty_size = len(f.readline())
+        self._segment_date = datetime.fromtimestamp(os.path.getmtime(self.log_file_path)).date()
+    
+    def _rotation_reason(self):
+        """
+        Check whether the active log should be rotated
+        
+        Returns:
+            str: 'size' or 'day', or None
+        """
+        if self.archive is None or self.stats.offset <= self._empty_size:
+            return None  # Disabled or nothing written yet
+        if config.LOG_ROTATE_MAX_BYTES and self.stats.offset >= config.LOG_ROTATE_MAX_BYTES:
+            return 'size'
+        if config.LOG_ROTATE_DAILY and datetime.now().date() != self._segment_date:
+            return 'day'
+        return None
+    
+    def rotate(self, reason='manual'):
+        """
+        Close the active log, archive it (compressed in the background) and
+        start a new one. In async mode this is queued to the writer thread
+        behind the rows already logged and returns at once, so an SD card
+        stall never reaches the control loop.
+        
+        Args:
+            reason (str): Recorded in the archive manifest ('size', 'day', 'mission', ...)
+        
+        Returns:
+            str: Path of the rotated segment, or None (always None in async mode)
+        """
+        if self.archive is None:
+            print("⚠ Log rotation is disabled (LOG_ROTATION_ENABLED)")
+            return None
+        
+        if isinstance(self.writer, AsyncLogWriter):
+            self._rotation_pending = True
+            if not self.writer.reopen(lambda: self._next_segment(reason)[1]):
+                self._rotation_pending = False  # Queue full, retried on the next poll()
+            return None
+        
+        try:
+            self.writer.close()
+            segment_path, self.writer = self._next_segment(reason)
+            return segment_path
+        except Exception as e:
+            print(f"Error rotating log: {e}")
+            return None
+    
+    def _next_segment(self, reason):
+        """
+        Archive the closed active log and open a writer for a new one
+        (runs on the writer thread in async mode)
+        
+        Args:
+            reason (str): Rotation reason for the manifest
+        
+        Returns:
+            tuple: (rotated segment path or None, new unwrapped writer)
+        """
+        segment_path = None
+        try:
+            if self.stats.offset > self._empty_size:  # Else nothing logged yet, keep the file
+                segment_path = self.archive.rotate_file(reason)
+                self._create_log_file()
+                self.stats.start_segment(os.path.getsize(self.log_file_path))
+                print(f"[LOG] Rotated log ({reason}): {os.path.basename(segment_path)}")
+        except Exception as e:
+            print(f"Error rotating log: {e}")
+        
+        try:
+            writer = create_writer(self.log_file_path, self.write_mode, use_async=False,
+                                   on_write=self._rows_written, log_format=self.log_format)
+            self._start_segment()
+        finally:
+            self._rotation_pending = False
+        return segment_path, writer
+    
+    def flush(self):
+        """Write all buffered rows and events to the log files"""
+        try:
+            self.writer.flush()
+            self.event_writer.flush()
+        except Exception as e:
+            print(f"Error flushing log: {e}")
+    
+    def close(self):
+        """Drain queued rows, flush, fsync and close the log file (call on shutdown)"""
+        try:
+            self.writer.close()
+            self.event_writer.close()
+        except Exception as e:
+            print(f"Error closing log: {e}")
+        self.stats.save_checkpoint()
+        if self.archive:
+            self.archive.wait()
+        self.print_queue_stats()
+    
+    def print_queue_stats(self):
+        """Print background writer queue metrics (async mode only)"""
+        if isinstance(self.writer, AsyncLogWriter):
+            self.writer.print_stats()
+    
+    def get_statistics(self, flush=False):
+        """
+        Get running statistics of the detection stream (kept up to date as
+        rows are written, the CSV is not re-read; events are not involved)
+        
+        Args:
+            flush (bool): Write queued and buffered rows first so they are
+                          counted. Waits up to LOG_DRAIN_TIMEOUT in async mode,
+                          so leave it off in the control loop.
+        
+        Returns:
+            dict: Statistics including total detections, average confidence,
+                  min/max confidence and per-day/per-hour buckets
         """
         if not self.file_exists:
             return {}
         
+        if flush:
+            try:
+                self.writer.flush()
+            except Exception as e:
+                print(f"Error flushing log: {e}")
+        
         try:
-            total_rows = 0
-            total_detections = 0
-            confidence_sum = 0.0
-            confidence_count = 0
-            
-            with open(self.log_file_path, 'r') as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                for row in reader:
-                    total_rows += 1
-                    
-                    # Count detections
-                    if row['Algae_Detected'] == 'Yes':
-                        total_detections += 1
-                        
-                        # Sum confidence values
-                        try:
-                            conf = float(row['Confidence'])
-                            confidence_sum += conf
-                            confidence_count += 1
-                        except:
-                            pass
-            
-            # Calculate averages
-            avg_confidence = confidence_sum / confidence_count if confidence_count > 0 else 0.0
-            detection_rate = total_detections / total_rows if total_rows > 0 else 0.0
-            
-            return {
-                'total_rows': total_rows,
-                'total_detections': total_detections,
-                'average_confidence': avg_confidence,
-                'detection_rate': detection_rate
-            }
-            
+            return self.stats.summary()
         except Exception as e:
             print(f"Error calculating statistics: {e}")
             return {}
     
     def print_statistics(self):
-        """Print statistics to console"""
-        stats = self.get_statistics()
+        """Print statistics to console (waits for queued rows)"""
+        stats = self.get_statistics(flush=True)
         
         if not stats:
             print("No statistics available")
@@ -205,6 +377,13 @@ class DataLogger:
         print(f"Total detections: {stats['total_detections']}")
         print(f"Average confidence: {stats['average_confidence']:.2%}")
         print(f"Detection rate: {stats['detection_rate']:.2%}")
+        if stats['min_confidence'] is not None:
+            print(f"Confidence range: {stats['min_confidence']:.2%} - {stats['max_confidence']:.2%}")
+        if stats['first_timestamp']:
+            print(f"Logged: {stats['first_timestamp']} to {stats['last_timestamp']} "
+                  f"({len(stats['per_day'])} days)")
+        if self.archive:
+            self.archive.print_summary()
         print("=" * 30 + "\n")
     
     def export_summary(self, output_file=None):
@@ -215,10 +394,10 @@ class DataLogger:
             output_file (str): Path to output summary file
         """
         if output_file is None:
-            output_file = self.log_file_path.replace('.csv', '_summary.txt')
+            output_file = os.path.splitext(self.log_file_path)[0] + '_summary.txt'
         
         try:
-            stats = self.get_statistics()
+            stats = self.get_statistics(flush=True)
             
             with open(output_file, 'w') as f:
                 f.write("AMLAC Robot - Data Collection Summary\n")
@@ -231,6 +410,16 @@ class DataLogger:
                 f.write(f"  Total detections: {stats.get('total_detections', 0)}\n")
                 f.write(f"  Average confidence: {stats.get('average_confidence', 0):.2%}\n")
                 f.write(f"  Detection rate: {stats.get('detection_rate', 0):.2%}\n")
+                if stats.get('min_confidence') is not None:
+                    f.write(f"  Confidence range: {stats['min_confidence']:.2%} - "
+                            f"{stats['max_confidence']:.2%}\n")
+                
+                if stats.get('per_day'):
+                    f.write("\nPer day:\n")
+                    f.write(f"  {'Date':<12}{'Entries':>9}{'Detections':>12}{'Avg conf':>10}\n")
+                    for day, bucket in stats['per_day'].items():
+                        f.write(f"  {day:<12}{bucket['rows']:>9}{bucket['detections']:>12}"
+                                f"{bucket['average_confidence']:>10.2%}\n")
             
             print(f"Summary exported to: {output_file}")
             
@@ -243,13 +432,24 @@ class DataLogger:
             print("No log file to backup")
             return
         
+        self.flush()
+        
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = self.log_file_path.replace('.csv', f'_backup_{timestamp}.csv')
+            base, ext = os.path.splitext(self.log_file_path)
+            backup_path = f"{base}_backup_{timestamp}{ext}"
             
             import shutil
             shutil.copy2(self.log_file_path, backup_path)
             
+            # Event messages of binary logs live in a sidecar
+            events_path = record_log.events_path_for(self.log_file_path)
+            if self.log_format == 'binary' and os.path.exists(events_path):
+                shutil.copy2(events_path, record_log.events_path_for(backup_path))
+            
+            if os.path.exists(self.event_log_path):
+                shutil.copy2(self.event_log_path, event_log_path_for(backup_path))
+            
             print(f"Log backed up to: {backup_path}")
             return backup_path
             
@@ -268,7 +468,16 @@ class DataLogger:
             self.backup_log()
         
         try:
+            self.close()
             self._create_log_file()
+            self.stats.rebuild()  # Archived segments only
+            self.stats.save_checkpoint()
+            self._spatial = None
+            self.writer = create_writer(self.log_file_path, self.write_mode,
+                                        on_write=self._rows_written,
+                                        log_format=self.log_format)
+            self.event_writer = create_event_writer(self.event_log_path)
+            self._start_segment()
             print("Log file cleared")
         except Exception as e:
             print(f"Error clearing log: {e}")
@@ -324,6 +533,13 @@ if __name__ == "__main__":
         print("5. Creating backup")
         backup_path = logger.backup_log()
         
+        logger.close()
+        
+        # Test 6: Write throughput
+        print("\n6. Benchmarking log writers")
+        from log_writers import benchmark
+        benchmark(num_rows=1000, directory=os.path.dirname(test_log_path))
+        
         print("\n✓ Data logger test complete!")
         print(f"Test log file: {test_log_path}")
         
@@ -343,6 +559,10 @@ if __name__ == "__main__":
             os.remove(summary_file)
             print(f"Removed: {summary_file}")
         
+        if os.path.exists(logger.stats.checkpoint_path):
+            os.remove(logger.stats.checkpoint_path)
+            print(f"Removed: {logger.stats.checkpoint_path}")
+    
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -0,0 +1,158 @@
+"""
+Event Log Module for AMLAC Robot
+Structured event stream kept apart from the detection table, one JSON
+object per line:
+
+    {"time": "2024-01-01 12:00:00", "monotonic": 1234.567, "level": "WARNING",
+     "code": "BIN_FULL", "message": "Collection bin full", "sensors": {...}}
+
+'time' is wall-clock time (matches the detection log); 'monotonic' orders
+events within a run even when the clock jumps (GPS/NTP sync). Events are
+written through the same buffered/background writers as detections, and a
+line cut short by a power loss is skipped when reading.
+
+Usage:
+    python event_log.py --level WARNING --since 2024-01-05
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+import config
+from log_writers import EventLogWriter, AsyncLogWriter
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+def event_log_path_for(log_file_path):
+    """
+    Get the event log path for a detection log
+    
+    Args:
+        log_file_path (str): Detection log path
+    
+    Returns:
+        str: e.g. collection_log.csv -> collection_log.events.jsonl
+    """
+    return os.path.splitext(log_file_path)[0] + '.events.jsonl'
+
+
+def create_event_writer(path, use_async=None):
+    """
+    Create the event writer (buffered, on a background thread if LOG_ASYNC)
+    
+    Args:
+        path (str): Event log path
+        use_async (bool): Wrap in an AsyncLogWriter (default from config)
+    
+    Returns:
+        EventLogWriter or AsyncLogWriter
+    """
+    if use_async is None:
+        use_async = config.LOG_ASYNC
+    
+    writer = EventLogWriter(path)
+    if use_async:
+        return AsyncLogWriter(writer)
+    return writer
+
+
+def make_event(level, message, code=None, sensor_data=None):
+    """
+    Build an event record
+    
+    Args:
+        level (str): One of LEVELS (unknown levels are kept as given)
+        message (str): Human-readable message
+        code (str): Machine-readable event code, e.g. 'BIN_FULL'
+        sensor_data (dict): Optional sensor snapshot
+    
+    Returns:
+        dict: Event record
+    """
+    return {
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'monotonic': round(time.monotonic(), 3),
+        'level': str(level).upper(),
+        'code': code,
+        'message': message,
+        'sensors': sensor_data or None
+    }
+
+
+def read_events(path, level=None, code=None, since=None, until=None):
+    """
+    Read events, optionally filtered
+    
+    Args:
+        path (str): Event log path
+        level (str): Minimum level (e.g. 'WARNING' also returns ERROR)
+        code (str): Only events with this code
+        since (str): 'YYYY-MM-DD[ HH:MM:SS]', inclusive
+        until (str): Same format as since, inclusive
+    
+    Returns:
+        generator: Event dicts in logged order
+    """
+    min_rank = LEVELS.index(level.upper()) if level else None
+    
+    if not os.path.isfile(path):
+        return
+    
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Truncated last line
+            
+            if min_rank is not None:
+                rank = LEVELS.index(event['level']) if event['level'] in LEVELS else len(LEVELS)
+                if rank < min_rank:
+                    continue
+            if code is not None and event.get('code') != code:
+                continue
+            if since is not None and event['time'] < since:
+                continue
+            if until is not None and event['time'][:len(until)] > until:
+                continue
+            yield event
+
+
+def count_by_level(path):
+    """
+    Count events per level
+    
+    Args:
+        path (str): Event log path
+    
+    Returns:
+        dict: level -> count
+    """
+    counts = {}
+    for event in read_events(path):
+        counts[event['level']] = counts.get(event['level'], 0) + 1
+    return counts
+
+
+if __name__ == "__main__":
+    """Print events from the robot's event log"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AMLAC event log')
+    parser.add_argument('--log', default=None,
+                        help='Event log (default: next to config.LOG_FILE_PATH)')
+    parser.add_argument('--level', default=None, choices=LEVELS, help='Minimum level')
+    parser.add_argument('--code', default=None, help='Only this event code')
+    parser.add_argument('--since', default=None, help='YYYY-MM-DD[ HH:MM:SS]')
+    parser.add_argument('--until', default=None, help='YYYY-MM-DD[ HH:MM:SS]')
+    args = parser.parse_args()
+    
+    path = args.log or event_log_path_for(config.LOG_FILE_PATH)
+    count = 0
+    for event in read_events(path, args.level, args.code, args.since, args.until):
+        code = f" {event['code']}" if event.get('code') else ''
+        print(f"{event['time']} [{event['level']}]{code} {event['message']}")
+        count += 1
+    print(f"\n{count} events")
@@ -0,0 +1,211 @@
+"""
+Frame Change Gate Module for AMLAC Robot
+Cheap scene-change detector in front of ML inference. When the boat is
+stationary or drifting slowly, consecutive frames are nearly identical, so
+the previous detection result is reused instead of running the model again.
+"""
+
+import threading
+import time
+import numpy as np
+import config
+
+# Rec. 601 luma weights
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class FrameChangeGate:
+    """
+    Decides whether a frame differs enough from the last inferred frame
+    
+    Each frame is reduced to a small luminance thumbnail (strided sampling,
+    no resize) and a normalized histogram. The thumbnail difference is
+    averaged per cell of a grid and the largest cell mean is used, so a
+    small patch (e.g. a clump of algae drifting in at the edge) counts in
+    full instead of being averaged over the whole frame. Inference runs when
+    that cell difference or the histogram distance to the last inferred frame
+    exceeds its threshold, or when the cached result is older than the
+    refresh interval.
+    """
+    
+    def __init__(self, luma_threshold=None, hist_threshold=None,
+                 refresh_interval=None, stride=None, hist_bins=32, grid=None):
+        """
+        Initialize frame gate
+        
+        Args:
+            luma_threshold (float): Mean absolute luminance change (0-255) within
+                                    any grid cell that counts as a new scene
+                                    (default from config)
+            hist_threshold (float): Histogram L1 distance (0-2) that counts as a
+                                    new scene (default from config)
+            refresh_interval (float): Seconds after which inference always runs
+                                      (default from config)
+            stride (int): Sample every Nth pixel in both directions (default from config)
+            hist_bins (int): Luminance histogram bins
+            grid (int): Cells per side for the luminance difference (default from config)
+        """
+        self.luma_threshold = config.FRAME_GATE_LUMA_THRESHOLD if luma_threshold is None else luma_threshold
+        self.hist_threshold = config.FRAME_GATE_HIST_THRESHOLD if hist_threshold is None else hist_threshold
+        self.refresh_interval = config.FRAME_GATE_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.stride = config.FRAME_GATE_STRIDE if stride is None else stride
+        self.hist_bins = hist_bins
+        self.grid = config.FRAME_GATE_GRID if grid is None else grid
+        
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by reset(); detect() drops stale results
+        self.reset()
+        self.executed = 0
+        self.skipped = 0
+    
+    def reset(self):
+        """Forget the reference frame so the next frame is always inferred"""
+        with self._lock:
+            self._generation += 1
+            self._reference_luma = None
+            self._reference_hist = None
+            self._cached_result = None
+            self._cached_time = 0.0
+            self.last_luma_diff = None
+            self.last_hist_diff = None
+    
+    def _signature(self, frame):
+        """
+        Reduce a frame to a luminance thumbnail and histogram
+        
+        Args:
+            frame (numpy.ndarray): RGB(A) image
+        
+        Returns:
+            tuple: (luma thumbnail float32, normalized histogram float32)
+        """
+        thumbnail = frame[::self.stride, ::self.stride, :3]
+        luma = np.dot(thumbnail, LUMA_WEIGHTS)
+        hist = np.bincount(
+            (luma * (self.hist_bins / 256.0)).astype(np.intp).ravel(),
+            minlength=self.hist_bins
+        ).astype(np.float32)
+        hist /= max(luma.size, 1)
+        return luma, hist
+    
+    def _cell_diff(self, luma):
+        """
+        Largest per-cell mean absolute difference to the reference thumbnail
+        
+        Args:
+            luma (numpy.ndarray): Luminance thumbnail
+        
+        Returns:
+            float: Max over grid cells of the mean absolute difference (0-255)
+        """
+        diff = np.abs(luma - self._reference_luma)
+        row_edges = np.linspace(0, diff.shape[0], min(self.grid, diff.shape[0]) + 1).astype(np.intp)
+        col_edges = np.linspace(0, diff.shape[1], min(self.grid, diff.shape[1]) + 1).astype(np.intp)
+        sums = np.add.reduceat(np.add.reduceat(diff, row_edges[:-1], axis=0),
+                               col_edges[:-1], axis=1)
+        counts = np.outer(np.diff(row_edges), np.diff(col_edges))
+        return float(np.max(sums / counts))
+    
+    def changed(self, frame):
+        """
+        Check whether a frame needs a fresh inference
+        
+        Args:
+            frame (numpy.ndarray): Camera frame
+        
+        Returns:
+            bool: True if inference should run
+        """
+        return self._changed(*self._signature(frame))
+    
+    def _changed(self, luma, hist):
+        """Compare a frame signature against the reference (see changed())"""
+        with self._lock:
+            if self._reference_luma is None or self._reference_luma.shape != luma.shape:
+                return True
+            
+            if time.time() - self._cached_time >= self.refresh_interval:
+                return True
+            
+            self.last_luma_diff = self._cell_diff(luma)
+            self.last_hist_diff = float(np.sum(np.abs(hist - self._reference_hist)))
+            
+            return (self.last_luma_diff > self.luma_threshold
+                    or self.last_hist_diff > self.hist_threshold)
+    
+    def detect(self, frame, detect_fn):
+        """
+        Run detect_fn on the frame only if the scene changed
+        
+        Args:
+            frame (numpy.ndarray): Camera frame
+            detect_fn (callable): frame -> detection result
+        
+        Returns:
+            Result of detect_fn (fresh or reused from the last inferred frame)
+        """
+        luma, hist = self._signature(frame)
+        with self._lock:
+            generation = self._generation
+        
+        if not self._changed(luma, hist):
+            with self._lock:
+                if self._cached_result is not None:
+                    self.skipped += 1
+                    return self._cached_result
+        
+        result = detect_fn(frame)
+        
+        with self._lock:
+            self.executed += 1
+            if generation != self._generation:
+                # reset() ran during detect_fn (e.g. the robot moved off):
+                # this frame predates it and must not become the reference
+                return result
+            self._reference_luma = luma
+            self._reference_hist = hist
+            self._cached_result = result
+            self._cached_time = time.time()
+        
+        return result
+    
+    @property
+    def skip_ratio(self):
+        """Fraction of frames that reused the previous result"""
+        total = self.executed + self.skipped
+        return self.skipped / total if total else 0.0
+    
+    def get_stats(self):
+        """
+        Get gate counters
+        
+        Returns:
+            dict: executed, skipped, skip_ratio and the last measured differences
+        """
+        return {
+            'executed': self.executed,
+            'skipped': self.skipped,
+            'skip_ratio': self.skip_ratio,
+            'last_luma_diff': self.last_luma_diff,
+            'last_hist_diff': self.last_hist_diff
+        }
+    
+    def print_stats(self):
+        """Print gate counters"""
+        print(f"Frame gate: {self.executed} inferences, {self.skipped} skipped "
+              f"({self.skip_ratio:.0%} reused)")
+
+
+if __name__ == "__main__":
+    """Benchmark the gate signature on a camera-sized frame"""
+    print("=== AMLAC Frame Gate Benchmark ===\n")
+    
+    gate = FrameChangeGate()
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    
+    num_runs = 100
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        gate.changed(frame)
+    print(f"Change check: {(time.perf_counter() - start) / num_runs * 1000:.2f} ms/frame "
+          f"(stride {gate.stride})")
@@ -0,0 +1,242 @@
+"""
+GPS Reader Module for AMLAC Robot
+Background NMEA reader that keeps the latest GPS fix cached, so the control
+loop never waits on the UART
+"""
+
+import threading
+import time
+import pynmea2
+import config
+
+
+class GPSReader:
+    """
+    Continuously consumes an NMEA stream in a background thread
+    Parses GGA (position/fix), RMC and VTG (speed/heading) sentences and
+    publishes the latest fix with a timestamp.
+    
+    The stream can be any object with a readline() method returning bytes or
+    str: the GPS serial port, a pseudo-terminal, an open NMEA log file or an
+    io.BytesIO. This allows testing with recorded NMEA data off-robot.
+    """
+    
+    def __init__(self, stream, name='gps-reader'):
+        """
+        Initialize GPS reader
+        
+        Args:
+            stream: Object with readline() (serial.Serial, file, io.BytesIO, ...)
+            name (str): Name of the background thread
+        """
+        self.stream = stream
+        self.name = name
+        
+        self._lock = threading.Lock()
+        self._fix = {
+            'lat': None,
+            'lon': None,
+            'altitude': None,
+            'fix_quality': 0,
+            'num_satellites': None,
+            'speed_knots': None,
+            'speed_kmh': None,
+            'heading': None,
+            'timestamp': None,       # time.time() of last valid GGA fix
+            'motion_timestamp': None  # time.time() of last RMC/VTG update
+        }
+        
+        # Reader statistics
+        self.lines_read = 0
+        self.sentences_parsed = 0
+        self.parse_errors = 0
+        
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the background reader thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._read_loop, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop the background reader thread
+        
+        Args:
+            timeout (float): Seconds to wait for the thread (default GPS_TIMEOUT + 1)
+        """
+        if timeout is None:
+            timeout = config.GPS_TIMEOUT + 1
+        
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def running(self):
+        """True while the reader thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _read_loop(self):
+        """Read and parse NMEA lines until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                line = self.stream.readline()
+            except Exception as e:
+                print(f"Error reading GPS stream: {e}")
+                self._stop_event.wait(1.0)
+                continue
+            
+            if not line:
+                # Serial timeout or end of a recorded file
+                self._stop_event.wait(0.05)
+                continue
+            
+            self.process_line(line)
+    
+    def process_line(self, line):
+        """
+        Parse one NMEA line and update the cached fix
+        
+        Args:
+            line (bytes or str): Raw NMEA sentence
+        
+        Returns:
+            bool: True if the line updated the cached fix
+        """
+        if isinstance(line, bytes):
+            line = line.decode('ascii', errors='ignore')
+        line = line.strip()
+        
+        self.lines_read += 1
+        
+        if not line.startswith('$'):
+            return False
+        
+        try:
+            msg = pynmea2.parse(line)
+        except pynmea2.ParseError:
+            self.parse_errors += 1
+            return False
+        
+        sentence_type = getattr(msg, 'sentence_type', None)
+        
+        try:
+            if sentence_type == 'GGA':
+                updated = self._handle_gga(msg)
+            elif sentence_type == 'RMC':
+                updated = self._handle_rmc(msg)
+            elif sentence_type == 'VTG':
+                updated = self._handle_vtg(msg)
+            else:
+                return False
+        except (ValueError, TypeError):
+            self.parse_errors += 1
+            return False
+        
+        self.sentences_parsed += 1
+        return updated
+    
+    def _handle_gga(self, msg):
+        """Update position and fix quality from a GGA sentence"""
+        fix_quality = msg.gps_qual or 0
+        
+        with self._lock:
+            self._fix['fix_quality'] = fix_quality
+            self._fix['num_satellites'] = int(msg.num_sats) if msg.num_sats else None
+            
+            if fix_quality < config.GPS_VALID_FIX_QUALITY:
+                # Fix lost: stop serving the last position
+                self._fix['timestamp'] = None
+                return False
+            
+            self._fix['lat'] = msg.latitude
+            self._fix['lon'] = msg.longitude
+            self._fix['altitude'] = msg.altitude
+            self._fix['timestamp'] = time.time()
+        
+        return True
+    
+    def _handle_rmc(self, msg):
+        """Update speed and heading from an RMC sentence"""
+        if msg.status != 'A':  # 'V' = receiver warning, data not valid
+            return False
+        
+        with self._lock:
+            if msg.spd_over_grnd is not None:
+                self._fix['speed_knots'] = float(msg.spd_over_grnd)
+                self._fix['speed_kmh'] = float(msg.spd_over_grnd) * 1.852
+            if msg.true_course is not None:
+                self._fix['heading'] = float(msg.true_course)
+            self._fix['motion_timestamp'] = time.time()
+        
+        return True
+    
+    def _handle_vtg(self, msg):
+        """Update speed and heading from a VTG sentence"""
+        with self._lock:
+            if msg.spd_over_grnd_kts is not None:
+                self._fix['speed_knots'] = float(msg.spd_over_grnd_kts)
+            if msg.spd_over_grnd_kmph is not None:
+                self._fix['speed_kmh'] = float(msg.spd_over_grnd_kmph)
+            if msg.true_track is not None:
+                self._fix['heading'] = float(msg.true_track)
+            self._fix['motion_timestamp'] = time.time()
+        
+        return True
+    
+    def get_fix(self, max_age=None):
+        """
+        Get the latest cached GPS fix (returns immediately)
+        
+        Args:
+            max_age (float): Reject fixes older than this many seconds
+                             (default GPS_MAX_FIX_AGE, None in config = no limit)
+        
+        Returns:
+            dict: Fix with 'lat', 'lon', 'altitude', 'fix_quality',
+                  'num_satellites', 'speed_knots', 'speed_kmh', 'heading',
+                  'timestamp' and 'age' (seconds), or None if no valid fix
+        """
+        if max_age is None:
+            max_age = config.GPS_MAX_FIX_AGE
+        
+        with self._lock:
+            fix = dict(self._fix)
+        
+        if fix['timestamp'] is None:
+            return None
+        
+        fix['age'] = time.time() - fix['timestamp']
+        if max_age is not None and fix['age'] > max_age:
+            return None
+        
+        return fix
+
+
+if __name__ == "__main__":
+    """Replay a recorded NMEA file through the reader"""
+    import sys
+    
+    if len(sys.argv) < 2:
+        print("Usage: python gps_reader.py <nmea_log_file>")
+        sys.exit(1)
+    
+    print("=== AMLAC GPS Reader Test ===\n")
+    
+    with open(sys.argv[1], 'rb') as nmea_file:
+        reader = GPSReader(nmea_file)
+        reader.start()
+        time.sleep(1.0)
+        reader.stop()
+    
+    print(f"Lines read: {reader.lines_read}")
+    print(f"Sentences parsed: {reader.sentences_parsed}")
+    print(f"Parse errors: {reader.parse_errors}")
+    print(f"Latest fix: {reader.get_fix(max_age=float('inf'))}")
@@ -0,0 +1,31 @@
+"""
+Hardware Abstraction Module for AMLAC Robot
+Single place where the Raspberry Pi hardware libraries are imported.
+
+With simulation enabled (config.SIMULATION = True or AMLAC_SIMULATION=1 in
+the environment) the fakes from simulation.py are used instead, so the
+control loop runs and can be profiled on any Linux machine.
+
+Usage:
+    from hardware import GPIO, Picamera2
+"""
+
+import os
+import config
+
+SIMULATION = (os.environ.get('AMLAC_SIMULATION', '').lower() in ('1', 'true', 'yes')
+              or config.SIMULATION)
+
+if SIMULATION:
+    from simulation import (GPIO, Picamera2, SMBus, board, busio,
+                            adafruit_tcs34725, HX711, CharLCD, serial)
+else:
+    import RPi.GPIO as GPIO
+    from picamera2 import Picamera2
+    from smbus2 import SMBus
+    import board
+    import busio
+    import adafruit_tcs34725
+    from hx711 import HX711
+    from RPLCD.i2c import CharLCD
+    import serial
@@ -0,0 +1,291 @@
+"""
+I2C Bus Module for AMLAC Robot
+Arbiter for the I2C bus shared by the LCD, TCS34725 and MPU6050.
+
+The three devices are driven through three libraries (RPLCD, busio and
+smbus2), each with its own handle on /dev/i2c-1. Every handle is wrapped so
+that each transaction first takes the bus from one I2CBusArbiter:
+  - Transactions are serialized, so a multi-step exchange (an IMU FIFO
+    drain, a TCS34725 register read) is never interleaved with another
+    device's traffic
+  - When several threads wait, the device with the highest I2C_PRIORITIES
+    entry goes first (IMU before color sensor before LCD). LCD text is
+    written one transaction at a time, so IMU reads cut in between characters
+  - batch() holds the bus for several reads of one device
+  - Busy time and wait time are recorded per device for the utilization
+    report
+"""
+
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+import config
+from latency_stats import LatencyStats
+
+
+class BusDeviceStats:
+    """
+    Bus usage of one device
+    """
+    
+    def __init__(self, name):
+        """
+        Initialize statistics
+        
+        Args:
+            name (str): Device name
+        """
+        self.name = name
+        self.transactions = 0
+        self.busy = 0.0  # Seconds holding the bus
+        self.wait = LatencyStats(f'{name} wait')  # Time spent waiting for the bus
+
+
+class I2CBusArbiter:
+    """
+    Priority lock around the shared I2C bus
+    Reentrant: a thread holding the bus may start nested transactions.
+    """
+    
+    def __init__(self, priorities=None):
+        """
+        Initialize arbiter
+        
+        Args:
+            priorities (dict): device -> priority, higher goes first
+                               (default I2C_PRIORITIES, unknown devices get 0)
+        """
+        self.priorities = dict(config.I2C_PRIORITIES if priorities is None else priorities)
+        
+        self._cond = threading.Condition()
+        self._owner = None  # Thread ident holding the bus
+        self._depth = 0
+        self._waiting = []  # Heap of (-priority, arrival order)
+        self._arrivals = itertools.count()
+        
+        self.devices = {}
+        self._held_since = None
+        self._held_by = None
+        self._start = time.monotonic()
+    
+    def _stats(self, device):
+        """Statistics for a device (created on first use)"""
+        stats = self.devices.get(device)
+        if stats is None:
+            stats = self.devices.setdefault(device, BusDeviceStats(device))
+        return stats
+    
+    def acquire(self, device):
+        """
+        Wait for the bus
+        
+        Args:
+            device (str): Device name (selects the priority)
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+            
+            requested = time.monotonic()
+            ticket = (-self.priorities.get(device, 0), next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            while self._owner is not None or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            
+            self._owner = me
+            self._depth = 1
+            self._held_since = time.monotonic()
+            self._held_by = device
+        self._stats(device).wait.record(self._held_since - requested)
+    
+    def release(self):
+        """Give the bus back (the outermost release hands it to the next waiter)"""
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("I2C bus released by a thread that does not hold it")
+            self._depth -= 1
+            if self._depth:
+                return
+            
+            stats = self._stats(self._held_by)
+            stats.transactions += 1
+            stats.busy += time.monotonic() - self._held_since
+            self._owner = None
+            self._cond.notify_all()
+    
+    @contextlib.contextmanager
+    def transaction(self, device):
+        """
+        Hold the bus for the enclosed block
+        
+        Args:
+            device (str): Device name
+        """
+        self.acquire(device)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def utilization(self):
+        """
+        Fraction of time the bus has been held since the last reset
+        
+        Returns:
+            float: 0-1
+        """
+        elapsed = time.monotonic() - self._start
+        busy = sum(stats.busy for stats in self.devices.values())
+        return busy / elapsed if elapsed > 0 else 0.0
+    
+    def reset_stats(self):
+        """Start a new utilization window"""
+        with self._cond:
+            self.devices = {}
+            self._start = time.monotonic()
+    
+    def print_report(self):
+        """Print bus utilization and per-device wait times"""
+        elapsed = time.monotonic() - self._start
+        print("\n" + "-" * 50)
+        print(f"I2C bus: {self.utilization() * 100:.1f}% busy over {elapsed:.1f} s")
+        print("-" * 50)
+        for name, stats in sorted(self.devices.items(),
+                                  key=lambda item: -self.priorities.get(item[0], 0)):
+            share = stats.busy / elapsed * 100 if elapsed > 0 else 0.0
+            print(f"{name:<10} prio={self.priorities.get(name, 0)}  "
+                  f"n={stats.transactions:<6} busy={share:5.1f}%  "
+                  f"wait mean={stats.wait.mean * 1000:.2f} ms max="
+                  f"{(stats.wait.max or 0.0) * 1000:.2f} ms")
+        print("-" * 50 + "\n")
+
+
+class ArbitratedSMBus:
+    """
+    smbus2.SMBus whose calls each take the bus from the arbiter
+    """
+    
+    def __init__(self, bus, arbiter, device):
+        """
+        Wrap a bus handle
+        
+        Args:
+            bus: smbus2.SMBus (or RPLCD's handle)
+            arbiter (I2CBusArbiter): Shared arbiter
+            device (str): Device name for priority and statistics
+        """
+        self.bus = bus
+        self.arbiter = arbiter
+        self.device = device
+    
+    def __getattr__(self, name):
+        attr = getattr(self.bus, name)
+        if not callable(attr) or name == 'close':
+            return attr
+        
+        def arbitrated(*args, **kwargs):
+            with self.arbiter.transaction(self.device):
+                return attr(*args, **kwargs)
+        
+        # Cache the wrapper so later calls skip __getattr__
+        setattr(self, name, arbitrated)
+        return arbitrated
+    
+    def batch(self):
+        """
+        Hold the bus across several calls (e.g. FIFO count + data)
+        
+        Returns:
+            Context manager
+        """
+        return self.arbiter.transaction(self.device)
+
+
+class ArbitratedI2C:
+    """
+    busio.I2C whose lock (taken by adafruit_bus_device around each
+    transaction) is granted by the arbiter
+    """
+    
+    def __init__(self, i2c, arbiter, device):
+        """
+        Wrap a busio bus
+        
+        Args:
+            i2c: busio.I2C
+            arbiter (I2CBusArbiter): Shared arbiter
+            device (str): Device name for priority and statistics
+        """
+        self.i2c = i2c
+        self.arbiter = arbiter
+        self.device = device
+    
+    def __getattr__(self, name):
+        return getattr(self.i2c, name)
+    
+    def try_lock(self):
+        """Wait for the bus, then lock busio (always succeeds)"""
+        self.arbiter.acquire(self.device)
+        if not self.i2c.try_lock():
+            self.arbiter.release()
+            return False
+        return True
+    
+    def unlock(self):
+        """Unlock busio and give the bus back"""
+        self.i2c.unlock()
+        self.arbiter.release()
+    
+    def batch(self):
+        """Hold the bus across several transactions"""
+        return self.arbiter.transaction(self.device)
+
+
+_arbiter = None
+_arbiter_lock = threading.Lock()
+
+
+def get_arbiter():
+    """Get the arbiter shared by all I2C users (created on first use)"""
+    global _arbiter
+    with _arbiter_lock:
+        if _arbiter is None:
+            _arbiter = I2CBusArbiter()
+        return _arbiter
+
+
+def arbitrated(bus, device):
+    """
+    Route a bus handle through the shared arbiter (if I2C_ARBITER_ENABLED)
+    
+    Args:
+        bus: smbus2.SMBus or busio.I2C
+        device (str): Device name ('mpu6050', 'tcs34725', 'lcd')
+    
+    Returns:
+        Wrapped bus, or the bus itself with the arbiter disabled
+    """
+    if not config.I2C_ARBITER_ENABLED:
+        return bus
+    if hasattr(bus, 'try_lock'):
+        return ArbitratedI2C(bus, get_arbiter(), device)
+    return ArbitratedSMBus(bus, get_arbiter(), device)
+
+
+def batch(bus):
+    """
+    Hold the bus for several calls on one device
+    
+    Args:
+        bus: Handle returned by arbitrated()
+    
+    Returns:
+        Context manager (does nothing for an unarbitrated bus)
+    """
+    hold = getattr(bus, 'batch', None)
+    return hold() if hold is not None else contextlib.nullcontext()
@@ -0,0 +1,350 @@
+"""
+IMU Module for AMLAC Robot
+MPU6050 burst reads and orientation fusion.
+
+All 14 data bytes (accel, temperature, gyro) are read in one I2C transaction
+and decoded with struct. IMUStream samples the IMU on a background thread at
+IMU_RATE_HZ: it polls the data registers on an absolute schedule, or drains
+the MPU6050's own FIFO (IMU_USE_FIFO), which timestamps samples in hardware
+so none are lost while Python is busy. A complementary filter fuses gyro and
+accelerometer into pitch, roll and (gyro-only, drifting) yaw, and the latest
+orientation can be read instantly from the control loop.
+"""
+
+import math
+import struct
+import threading
+import time
+import numpy as np
+import config
+import i2c_bus
+from latency_stats import LatencyStats
+
+# MPU6050 registers
+SMPLRT_DIV = 0x19
+CONFIG = 0x1A
+FIFO_EN = 0x23
+ACCEL_XOUT_H = 0x3B
+GYRO_ZOUT_H = 0x47
+USER_CTRL = 0x6A
+FIFO_COUNT_H = 0x72
+FIFO_R_W = 0x74
+
+ACCEL_SCALE = 16384.0  # LSB/g for ±2g range
+GYRO_SCALE = 131.0     # LSB/(°/s) for ±250°/s range
+
+FIFO_SIZE = 1024
+FIFO_FRAME_SIZE = 12  # accel xyz + gyro xyz, 16-bit big-endian
+FIFO_READ_FRAMES = 2  # Frames per I2C block read (SMBus blocks are <= 32 bytes)
+
+_BURST = struct.Struct('>7h')
+_GYRO_Z = struct.Struct('>h')
+
+
+def decode_burst(data):
+    """
+    Decode the 14-byte block starting at ACCEL_XOUT_H
+    
+    Args:
+        data (list): Bytes from read_i2c_block_data
+    
+    Returns:
+        tuple: (accel (x, y, z) in g, temperature in °C, gyro (x, y, z) in °/s)
+    """
+    ax, ay, az, temp, gx, gy, gz = _BURST.unpack(bytes(data))
+    return ((ax / ACCEL_SCALE, ay / ACCEL_SCALE, az / ACCEL_SCALE),
+            temp / 340.0 + 36.53,
+            (gx / GYRO_SCALE, gy / GYRO_SCALE, gz / GYRO_SCALE))
+
+
+def read_burst(bus, address=None):
+    """
+    Read accel, temperature and gyro in one I2C transaction
+    
+    Args:
+        bus: smbus2.SMBus
+        address (int): MPU6050 address (default from config)
+    
+    Returns:
+        tuple: See decode_burst()
+    """
+    if address is None:
+        address = config.MPU6050_I2C_ADDRESS
+    return decode_burst(bus.read_i2c_block_data(address, ACCEL_XOUT_H, 14))
+
+
+def read_gyro_z(bus, address=None):
+    """Read only the yaw rate in °/s (2-byte read)"""
+    if address is None:
+        address = config.MPU6050_I2C_ADDRESS
+    return _GYRO_Z.unpack(bytes(bus.read_i2c_block_data(address, GYRO_ZOUT_H, 2)))[0] / GYRO_SCALE
+
+
+def accel_tilt(accel):
+    """
+    Pitch and roll from the gravity vector alone
+    
+    Args:
+        accel (tuple): (x, y, z) in g
+    
+    Returns:
+        tuple: (pitch, roll) in degrees
+    """
+    x, y, z = accel
+    pitch = math.atan2(y, math.sqrt(x * x + z * z))
+    roll = math.atan2(-x, z)
+    return math.degrees(pitch), math.degrees(roll)
+
+
+def imu_data_dict(accel, gyro):
+    """Raw IMU data in SensorManager.read_mpu6050() format"""
+    return {
+        'accel': {'x': accel[0], 'y': accel[1], 'z': accel[2]},
+        'gyro': {'x': gyro[0], 'y': gyro[1], 'z': gyro[2]}
+    }
+
+
+class ComplementaryFilter:
+    """
+    Gyro integration corrected toward the accelerometer tilt
+    Pitch follows the gyro X axis, roll the gyro Y axis and yaw the gyro Z
+    axis (no magnetometer, so yaw is relative to the start and drifts)
+    """
+    
+    def __init__(self, alpha=None):
+        """
+        Initialize filter
+        
+        Args:
+            alpha (float): Gyro weight per update, 0-1 (default from config)
+        """
+        self.alpha = config.IMU_FILTER_ALPHA if alpha is None else alpha
+        self.pitch = None
+        self.roll = None
+        self.yaw = 0.0
+    
+    def update(self, accel, gyro, dt):
+        """
+        Fuse one sample
+        
+        Args:
+            accel (tuple): (x, y, z) in g
+            gyro (tuple): (x, y, z) in °/s, bias removed
+            dt (float): Seconds since the previous sample
+        
+        Returns:
+            tuple: (pitch, roll, yaw) in degrees
+        """
+        accel_pitch, accel_roll = accel_tilt(accel)
+        if self.pitch is None:
+            self.pitch, self.roll = accel_pitch, accel_roll
+        else:
+            a = self.alpha
+            self.pitch = a * (self.pitch + gyro[0] * dt) + (1 - a) * accel_pitch
+            self.roll = a * (self.roll + gyro[1] * dt) + (1 - a) * accel_roll
+        self.yaw = (self.yaw + gyro[2] * dt + 180.0) % 360.0 - 180.0
+        return self.pitch, self.roll, self.yaw
+
+
+class IMUStream:
+    """
+    Background MPU6050 sampling and orientation fusion
+    """
+    
+    def __init__(self, bus, address=None, rate_hz=None, use_fifo=None):
+        """
+        Initialize stream (the MPU6050 must already be awake)
+        
+        Args:
+            bus: smbus2.SMBus
+            address (int): MPU6050 address (default from config)
+            rate_hz (float): Samples per second (default from config)
+            use_fifo (bool): Drain the MPU6050 FIFO instead of polling (default from config)
+        """
+        self.bus = bus
+        self.address = config.MPU6050_I2C_ADDRESS if address is None else address
+        self.rate_hz = config.IMU_RATE_HZ if rate_hz is None else rate_hz
+        self.use_fifo = config.IMU_USE_FIFO if use_fifo is None else use_fifo
+        
+        self.filter = ComplementaryFilter()
+        self.gyro_bias = (0.0, 0.0, 0.0)
+        
+        self._latest = None  # (accel, gyro, orientation dict, time.monotonic())
+        
+        # Statistics
+        self.samples = 0
+        self.fifo_overflows = 0
+        self.read_latency = LatencyStats('imu read')
+        
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def calibrate(self, samples=None):
+        """
+        Measure the gyro bias (the robot must be still)
+        
+        Args:
+            samples (int): Samples to average (default from config)
+        
+        Returns:
+            tuple: Bias (x, y, z) in °/s
+        """
+        if samples is None:
+            samples = config.IMU_CALIBRATION_SAMPLES
+        if not samples:
+            return self.gyro_bias
+        
+        total = np.zeros(3)
+        for _ in range(samples):
+            _, _, gyro = read_burst(self.bus, self.address)
+            total += gyro
+            time.sleep(1.0 / self.rate_hz)
+        self.gyro_bias = tuple((total / samples).tolist())
+        return self.gyro_bias
+    
+    def start(self):
+        """Configure the sample rate (and FIFO) and start the sampling thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        # 1 kHz gyro output with the low-pass filter on, divided down to rate_hz
+        self.bus.write_byte_data(self.address, CONFIG, 3)  # DLPF ~44 Hz
+        self.bus.write_byte_data(self.address, SMPLRT_DIV,
+                                 max(0, min(255, int(round(1000.0 / self.rate_hz)) - 1)))
+        if self.use_fifo:
+            self._reset_fifo()
+        
+        self._stop_event.clear()
+        target = self._fifo_loop if self.use_fifo else self._poll_loop
+        self._thread = threading.Thread(target=target, name='imu-stream', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=1.0):
+        """Stop the sampling thread (and the FIFO)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.use_fifo:
+            try:
+                self.bus.write_byte_data(self.address, USER_CTRL, 0)
+                self.bus.write_byte_data(self.address, FIFO_EN, 0)
+            except Exception:
+                pass
+    
+    @property
+    def running(self):
+        """True while the sampling thread runs"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _update(self, accel, gyro, dt):
+        """Remove the gyro bias, fuse and publish one sample"""
+        gyro = (gyro[0] - self.gyro_bias[0], gyro[1] - self.gyro_bias[1], gyro[2] - self.gyro_bias[2])
+        pitch, roll, yaw = self.filter.update(accel, gyro, dt)
+        orientation = {'pitch': pitch, 'roll': roll, 'yaw': yaw}
+        self._latest = (accel, gyro, orientation, time.monotonic())
+        self.samples += 1
+    
+    def _poll_loop(self):
+        """Read the data registers on an absolute schedule"""
+        interval = 1.0 / self.rate_hz
+        next_time = last = time.monotonic()
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                accel, _, gyro = read_burst(self.bus, self.address)
+            except Exception as e:
+                self.read_latency.record_error()
+                print(f"⚠ IMU read error: {e}")
+                self._stop_event.wait(interval)
+                continue
+            self.read_latency.record(time.perf_counter() - start)
+            
+            now = time.monotonic()
+            self._update(accel, gyro, now - last)
+            last = now
+            
+            next_time += interval
+            if next_time < now:
+                next_time = now  # Fell behind: don't try to catch up
+            self._stop_event.wait(next_time - now)
+    
+    def _reset_fifo(self):
+        """Clear and (re)enable the FIFO with accel + gyro"""
+        self.bus.write_byte_data(self.address, USER_CTRL, 0x04)  # FIFO_RESET
+        self.bus.write_byte_data(self.address, FIFO_EN, 0x78)    # XG, YG, ZG, ACCEL
+        self.bus.write_byte_data(self.address, USER_CTRL, 0x40)  # FIFO_EN
+    
+    def _fifo_loop(self):
+        """Drain the FIFO; every frame is one sample at exactly 1/rate_hz"""
+        dt = 1.0 / self.rate_hz
+        while not self._stop_event.wait(config.IMU_FIFO_POLL_INTERVAL):
+            start = time.perf_counter()
+            try:
+                # Count and data in one bus grant
+                with i2c_bus.batch(self.bus):
+                    high, low = self.bus.read_i2c_block_data(self.address, FIFO_COUNT_H, 2)
+                    count = (high << 8) | low
+                    if count >= FIFO_SIZE - FIFO_FRAME_SIZE:
+                        # Overflowed: frame alignment is lost, start over
+                        self.fifo_overflows += 1
+                        self._reset_fifo()
+                        continue
+                    
+                    frames = count // FIFO_FRAME_SIZE
+                    data = []
+                    while frames:
+                        chunk = min(frames, FIFO_READ_FRAMES)
+                        data += self.bus.read_i2c_block_data(self.address, FIFO_R_W,
+                                                             chunk * FIFO_FRAME_SIZE)
+                        frames -= chunk
+            except Exception as e:
+                self.read_latency.record_error()
+                print(f"⚠ IMU FIFO error: {e}")
+                continue
+            self.read_latency.record(time.perf_counter() - start)
+            
+            if not data:
+                continue
+            raw = np.frombuffer(bytes(data), dtype='>i2').reshape(-1, 6).astype(np.float64)
+            accel = (raw[:, :3] / ACCEL_SCALE).tolist()
+            gyro = (raw[:, 3:] / GYRO_SCALE).tolist()
+            for a, g in zip(accel, gyro):
+                self._update(a, g, dt)
+    
+    def orientation(self):
+        """
+        Latest fused orientation (returns immediately)
+        
+        Returns:
+            dict: pitch, roll, yaw in degrees, or None before the first sample
+        """
+        latest = self._latest
+        return dict(latest[2]) if latest else None
+    
+    def latest(self):
+        """
+        Latest raw sample (gyro bias removed)
+        
+        Returns:
+            dict: read_mpu6050() format, or None before the first sample
+        """
+        latest = self._latest
+        return imu_data_dict(latest[0], latest[1]) if latest else None
+    
+    def yaw_rate(self):
+        """Latest yaw rate in °/s (None before the first sample)"""
+        latest = self._latest
+        return latest[1][2] if latest else None
+    
+    def age(self):
+        """Seconds since the latest sample (None before the first)"""
+        latest = self._latest
+        return time.monotonic() - latest[3] if latest else None
+    
+    def print_stats(self):
+        """Print sample count and read latency"""
+        mode = 'FIFO' if self.use_fifo else 'polled'
+        print(f"IMU: {self.samples} samples at {self.rate_hz:g} Hz ({mode}), "
+              f"{self.fifo_overflows} FIFO overflows")
+        print(self.read_latency.format_line())
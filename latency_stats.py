@@ -0,0 +1,214 @@
+"""
+Latency Statistics Module for AMLAC Robot
+Lightweight, thread-safe timing statistics used to report per-stage latency
+"""
+
+import threading
+import time
+
+
+class LatencyStats:
+    """
+    Running latency statistics for one named stage
+    Keeps count, mean, min, max and last sample without storing every sample
+    """
+    
+    def __init__(self, name):
+        """
+        Initialize latency statistics
+        
+        Args:
+            name (str): Stage name shown in reports
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Clear all recorded samples"""
+        with self._lock:
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+            self.last = None
+            self.errors = 0
+    
+    def record(self, seconds):
+        """
+        Record one latency sample
+        
+        Args:
+            seconds (float): Measured duration in seconds
+        """
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+    
+    def record_error(self):
+        """Count a failed run of this stage"""
+        with self._lock:
+            self.errors += 1
+    
+    def measure(self):
+        """
+        Context manager that records the duration of the enclosed block
+        
+        Returns:
+            _Timer: Context manager
+        """
+        return _Timer(self)
+    
+    @property
+    def mean(self):
+        """Average latency in seconds (0.0 if no samples)"""
+        return self.total / self.count if self.count else 0.0
+    
+    def summary(self):
+        """
+        Get a snapshot of the statistics
+        
+        Returns:
+            dict: count, errors and mean/min/max/last latency in milliseconds
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'count': self.count,
+                'errors': self.errors,
+                'mean_ms': (self.total / self.count * 1000) if self.count else 0.0,
+                'min_ms': self.min * 1000 if self.min is not None else 0.0,
+                'max_ms': self.max * 1000 if self.max is not None else 0.0,
+                'last_ms': self.last * 1000 if self.last is not None else 0.0
+            }
+    
+    def format_line(self):
+        """
+        Format statistics as a single report line
+        
+        Returns:
+            str: Human readable summary
+        """
+        s = self.summary()
+        return (f"{s['name']:<12} n={s['count']:<6} "
+                f"mean={s['mean_ms']:8.2f} ms  min={s['min_ms']:8.2f} ms  "
+                f"max={s['max_ms']:8.2f} ms  err={s['errors']}")
+
+
+class LatencyHistogram(LatencyStats):
+    """
+    LatencyStats plus a fixed-bucket histogram (no per-sample storage),
+    for seeing how often a stage is slow rather than just its mean
+    """
+    
+    # Bucket upper bounds in milliseconds; the last bucket is open-ended
+    BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+    
+    def reset(self):
+        """Clear all recorded samples and buckets"""
+        super().reset()
+        with self._lock:
+            self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+    
+    def record(self, seconds):
+        """
+        Record one latency sample
+        
+        Args:
+            seconds (float): Measured duration in seconds
+        """
+        super().record(seconds)
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(self.BOUNDS_MS) if ms <= bound),
+                     len(self.BOUNDS_MS))
+        with self._lock:
+            self.buckets[index] += 1
+    
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket holding a percentile
+        
+        Args:
+            fraction (float): e.g. 0.95
+        
+        Returns:
+            float: Milliseconds (inf for the open last bucket, 0.0 if no samples)
+        """
+        with self._lock:
+            buckets = list(self.buckets)
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        
+        target = fraction * total
+        running = 0
+        for i, count in enumerate(buckets):
+            running += count
+            if running >= target:
+                return self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else float('inf')
+        return float('inf')
+    
+    def format_histogram(self, width=30):
+        """
+        Format the non-empty buckets as text bars
+        
+        Args:
+            width (int): Length of the longest bar
+        
+        Returns:
+            str: One line per bucket
+        """
+        with self._lock:
+            buckets = list(self.buckets)
+        peak = max(buckets) or 1
+        
+        lines = []
+        lower = 0
+        for i, count in enumerate(buckets):
+            upper = self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else None
+            if count:
+                label = f"{lower:g}-{upper:g} ms" if upper is not None else f"> {lower:g} ms"
+                bar = '#' * max(1, round(count / peak * width))
+                lines.append(f"  {label:>14} {count:>7} {bar}")
+            lower = upper
+        return '\n'.join(lines)
+
+
+class _Timer:
+    """Context manager used by LatencyStats.measure()"""
+    
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = None
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.stats.record(time.perf_counter() - self.start)
+        else:
+            self.stats.record_error()
+        return False
+
+
+def print_latency_report(title, stats_list):
+    """
+    Print a latency report for several stages
+    
+    Args:
+        title (str): Report heading
+        stats_list (list): LatencyStats objects to include
+    """
+    print("\n" + "-" * 50)
+    print(title)
+    print("-" * 50)
+    for stats in stats_list:
+        print(stats.format_line())
+    print("-" * 50 + "\n")
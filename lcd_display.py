@@ -4,8 +4,23 @@ Manages 16x2 I2C LCD display for real-time status updates
 """
 
 import time
-from RPLCD.i2c import CharLCD
 import config
+import i2c_bus
+from hardware import CharLCD
+
+
+class ArbitratedCharLCD(CharLCD):
+    """
+    CharLCD whose bus handle goes through the I2C arbiter from the start
+    RPLCD sends the HD44780 init sequence and a clear from its constructor,
+    so the handle is wrapped as soon as it is opened rather than afterwards.
+    """
+    
+    def _init_connection(self):
+        super()._init_connection()
+        # Share the bus with the sensors through the arbiter (lowest priority)
+        self.bus = i2c_bus.arbitrated(self.bus, 'lcd')
+
 
 class LCDDisplay:
     """
@@ -20,7 +35,7 @@ class LCDDisplay:
         try:
             # Initialize LCD with I2C address 0x27
             # PCF8574 I2C expander is commonly used
-            self.lcd = CharLCD(
+            self.lcd = ArbitratedCharLCD(
                 i2c_expander='PCF8574',
                 address=config.LCD_I2C_ADDRESS,
                 port=1,  # I2C port 1 on Raspberry Pi
@@ -30,7 +45,6 @@ class LCDDisplay:
                 charmap='A02',
                 auto_linebreaks=True
             )
-            
             # Clear display
             self.lcd.clear()
             
@@ -0,0 +1,208 @@
+"""
+Load Cell Module for AMLAC Robot
+Continuous HX711 sampling with a streaming filter.
+
+A background thread reads one HX711 conversion at a time (10 SPS) instead of
+blocking the sensor read path for several conversions per reading. Each
+sample goes through:
+  1. Motion gating: samples taken while the IMU sees the hull accelerating
+     (|a| differs from 1 g by more than WEIGHT_MOTION_LIMIT_G) are dropped,
+     since waves add to or take away from the apparent weight
+  2. A running median over WEIGHT_MEDIAN_WINDOW samples (splashes, knocks)
+  3. An EMA (WEIGHT_EMA_ALPHA) for a smooth reading
+The weight is reported stable once the median window is full, its spread is
+within WEIGHT_STABLE_BAND_G and the EMA has settled to the median.
+"""
+
+import collections
+import statistics
+import threading
+import time
+import config
+
+
+class WeightFilter:
+    """
+    Streaming median + EMA filter with a stability flag
+    """
+    
+    def __init__(self, window=None, alpha=None, stable_band=None):
+        """
+        Initialize filter
+        
+        Args:
+            window (int): Samples in the running median (default from config)
+            alpha (float): EMA weight of each new median, 0-1 (default from config)
+            stable_band (float): Max spread of the window in grams to count as stable
+                                 (default from config)
+        """
+        if window is None:
+            window = config.WEIGHT_MEDIAN_WINDOW
+        self.alpha = config.WEIGHT_EMA_ALPHA if alpha is None else alpha
+        self.stable_band = config.WEIGHT_STABLE_BAND_G if stable_band is None else stable_band
+        self._window = collections.deque(maxlen=window)
+        self.value = None  # Filtered weight in grams
+    
+    def reset(self):
+        """Forget all samples (after taring)"""
+        self._window.clear()
+        self.value = None
+    
+    def update(self, grams):
+        """
+        Add one sample
+        
+        Args:
+            grams (float): Raw weight in grams
+        
+        Returns:
+            float: Filtered weight in grams
+        """
+        self._window.append(grams)
+        median = statistics.median(self._window)
+        if self.value is None:
+            self.value = median
+        else:
+            self.value += self.alpha * (median - self.value)
+        return self.value
+    
+    @property
+    def stable(self):
+        """
+        True when the window is full, its spread is within the stable band
+        and the EMA has caught up with the median
+        """
+        window = self._window
+        return (len(window) == window.maxlen
+                and max(window) - min(window) <= self.stable_band
+                and abs(self.value - statistics.median(window)) <= self.stable_band)
+
+
+class LoadCellSampler:
+    """
+    Background HX711 reader publishing the filtered weight
+    """
+    
+    def __init__(self, hx711, motion_source=None, interval=None):
+        """
+        Initialize sampler
+        
+        Args:
+            hx711: Configured hx711.HX711 (scale ratio set)
+            motion_source (callable): Returns the current acceleration magnitude
+                                      in g, or None if unknown (e.g. IMU not streaming)
+            interval (float): Minimum seconds between conversions (default from config)
+        """
+        self.hx711 = hx711
+        self.motion_source = motion_source
+        self.interval = config.WEIGHT_SAMPLE_INTERVAL if interval is None else interval
+        self.filter = WeightFilter()
+        
+        self._hx711_lock = threading.Lock()  # Taring and sampling share the HX711
+        self._latest = None  # (weight_kg, stable, time.monotonic())
+        
+        # Statistics
+        self.samples = 0
+        self.motion_rejected = 0
+        self.errors = 0
+        
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Take one reading (so a weight is available at once), then start the thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self.sample()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='load-cell', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=1.0):
+        """Stop the sampling thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def running(self):
+        """True while the sampling thread runs"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _in_motion(self):
+        """True if the IMU reports the hull accelerating beyond WEIGHT_MOTION_LIMIT_G"""
+        if self.motion_source is None:
+            return False
+        accel = self.motion_source()
+        return accel is not None and abs(accel - 1.0) > config.WEIGHT_MOTION_LIMIT_G
+    
+    def sample(self):
+        """Read one conversion and update the filter"""
+        # Held across the filter update too, so a tare() cannot reset the
+        # filter between the read and the update and let a pre-tare sample in
+        with self._hx711_lock:
+            try:
+                grams = self.hx711.get_weight_mean(1)
+            except Exception as e:
+                grams = None
+                print(f"⚠ HX711 read error: {e}")
+            if grams is None or grams is False:  # hx711 returns False on bad data
+                self.errors += 1
+                return
+            
+            if self._in_motion():
+                self.motion_rejected += 1
+                return
+            
+            value = self.filter.update(grams)
+            self.samples += 1
+            self._latest = (round(value / 1000.0, 2), self.filter.stable, time.monotonic())
+    
+    def _sample_loop(self):
+        """Sample continuously, at most one conversion per interval"""
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            
+            next_time += self.interval
+            now = time.monotonic()
+            if next_time < now:
+                next_time = now  # Conversion took the whole interval (normal at 10 SPS)
+            self._stop_event.wait(next_time - now)
+    
+    def tare(self):
+        """
+        Zero the scale and restart the filter
+        
+        Returns:
+            bool: True on success
+        """
+        with self._hx711_lock:
+            failed = self.hx711.zero()  # hx711 returns False on success
+            self.filter.reset()
+            self._latest = None
+        return not failed
+    
+    def weight(self):
+        """
+        Latest filtered weight (returns immediately)
+        
+        Returns:
+            float: Weight in kilograms or None before the first sample
+        """
+        latest = self._latest
+        return latest[0] if latest else None
+    
+    @property
+    def stable(self):
+        """True if the latest weight has settled"""
+        latest = self._latest
+        return latest[1] if latest else False
+    
+    def print_stats(self):
+        """Print sample counts"""
+        print(f"Load cell: {self.samples} samples, {self.motion_rejected} rejected "
+              f"(motion), {self.errors} errors, weight {self.weight()} kg "
+              f"({'stable' if self.stable else 'settling'})")
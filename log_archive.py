@@ -0,0 +1,341 @@
+"""
+Log Archive Module for AMLAC Robot
+Rotated log segments. DataLogger closes the active log when it grows past
+LOG_ROTATE_MAX_BYTES, the day changes or a new mission starts, and moves it
+into the archive directory; LogArchive compresses it on a background thread
+so the control loop never waits for gzip.
+
+archive/manifest.json lists every compressed segment with its time range,
+row counts and statistics, so queries can skip segments outside a time
+window and DataLogger statistics can be rebuilt without decompressing.
+
+An uncompressed segment is only deleted after its compressed copy and its
+manifest entry are written. Segments left uncompressed by a crash or power
+cut are archived by recover() on the next start.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+import config
+import record_log
+from log_statistics import LogStatistics
+
+MANIFEST_FORMAT_VERSION = 1
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', None: ''}
+
+# Optional zstd support
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _open_compressed(path, mode, compression):
+    """
+    Open a (possibly) compressed file in binary mode
+    
+    Args:
+        path (str): File path
+        mode (str): 'rb' or 'wb'
+        compression (str): 'gzip', 'zstd' or None
+    
+    Returns:
+        Binary file object
+    """
+    if compression == 'gzip':
+        return gzip.open(path, mode)
+    if compression == 'zstd':
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, mode)
+
+
+class LogArchive:
+    """
+    Compressed, manifest-indexed segments of a rotated log
+    """
+    
+    def __init__(self, log_file_path, archive_dir=None, compression=None, max_bytes=None):
+        """
+        Initialize archive
+        
+        Args:
+            log_file_path (str): Active log file (CSV or .rec)
+            archive_dir (str): Where segments go (default from config, else
+                               an 'archive' folder next to the log)
+            compression (str): 'gzip', 'zstd' or 'none' (default from config)
+            max_bytes (int): Delete the oldest segments beyond this many
+                             compressed bytes (default from config, None = keep all)
+        """
+        if archive_dir is None:
+            archive_dir = config.LOG_ARCHIVE_DIR or os.path.join(
+                os.path.dirname(log_file_path) or '.', 'archive')
+        if compression is None:
+            compression = config.LOG_COMPRESSION
+        if compression == 'none':
+            compression = None
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown log compression: {compression} "
+                             f"(expected 'gzip', 'zstd' or 'none')")
+        if compression == 'zstd' and zstandard is None:
+            print("⚠ zstandard not installed, archiving with gzip")
+            compression = 'gzip'
+        
+        self.log_file_path = log_file_path
+        self.archive_dir = archive_dir
+        self.compression = compression
+        self.max_bytes = config.LOG_ARCHIVE_MAX_BYTES if max_bytes is None else max_bytes
+        self.manifest_path = os.path.join(archive_dir, 'manifest.json')
+        
+        self._lock = threading.Lock()
+        self._threads = []
+        
+        os.makedirs(archive_dir, exist_ok=True)
+        self.segments = self._load_manifest()
+    
+    def _load_manifest(self):
+        """Read the manifest (empty if missing or unreadable)"""
+        if not os.path.isfile(self.manifest_path):
+            return []
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('format_version') != MANIFEST_FORMAT_VERSION:
+                raise ValueError(f"unsupported version {manifest.get('format_version')}")
+            return manifest['segments']
+        except Exception as e:
+            print(f"⚠ Error reading {self.manifest_path}: {e}")
+            return []
+    
+    def _save_manifest(self):
+        """Write the manifest atomically (lock held)"""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'format_version': MANIFEST_FORMAT_VERSION, 'segments': self.segments},
+                      f, indent=1)
+        os.replace(temp_path, self.manifest_path)
+    
+    def rotate_file(self, reason):
+        """
+        Move the (closed) active log into the archive and compress it in
+        the background
+        
+        Args:
+            reason (str): Why the log was rotated ('size', 'day', 'mission', ...)
+        
+        Returns:
+            str: Path of the uncompressed segment
+        """
+        base, ext = os.path.splitext(os.path.basename(self.log_file_path))
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        segment_path = os.path.join(self.archive_dir, f"{base}_{stamp}{ext}")
+        compressed_suffix = COMPRESSION_SUFFIXES[self.compression]
+        number = 1
+        while os.path.exists(segment_path) or os.path.exists(segment_path + compressed_suffix):
+            segment_path = os.path.join(self.archive_dir, f"{base}_{stamp}_{number}{ext}")
+            number += 1
+        
+        os.replace(self.log_file_path, segment_path)
+        events_path = record_log.events_path_for(self.log_file_path)
+        if os.path.exists(events_path):
+            os.replace(events_path, record_log.events_path_for(segment_path))
+        
+        thread = threading.Thread(target=self._archive, args=(segment_path, reason),
+                                  name='log-archive', daemon=True)
+        thread.start()
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        return segment_path
+    
+    def _archive(self, segment_path, reason):
+        """
+        Compress a segment and add it to the manifest
+        
+        Args:
+            segment_path (str): Uncompressed segment in the archive directory
+            reason (str): Rotation reason recorded in the manifest
+        """
+        try:
+            stats = LogStatistics(segment_path)
+            stats.rebuild()
+            state = stats.to_dict()
+            
+            suffix = COMPRESSION_SUFFIXES[self.compression]
+            files = [segment_path]
+            events_path = record_log.events_path_for(segment_path)
+            if os.path.exists(events_path):
+                files.append(events_path)
+            
+            for path in files:
+                if self.compression:
+                    with open(path, 'rb') as src, \
+                            _open_compressed(path + suffix, 'wb', self.compression) as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+            
+            entry = {
+                'file': os.path.basename(segment_path) + suffix,
+                'events_file': os.path.basename(events_path) + suffix if len(files) > 1 else None,
+                'format': 'binary' if record_log.is_record_file(segment_path) else 'csv',
+                'compression': self.compression,
+                'reason': reason,
+                'start': state['first_timestamp'],
+                'end': state['last_timestamp'],
+                'rows': state['total_rows'],
+                'detections': state['total_detections'],
+                'bytes': os.path.getsize(segment_path),
+                'compressed_bytes': sum(os.path.getsize(path + suffix) for path in files),
+                'stats': {k: v for k, v in state.items()
+                          if k not in ('format_version', 'log_file', 'offset')}
+            }
+            
+            with self._lock:
+                self.segments = [s for s in self.segments if s['file'] != entry['file']]
+                self.segments.append(entry)
+                self.segments.sort(key=lambda s: s['file'])
+                self._save_manifest()
+            
+            if self.compression:
+                for path in files:
+                    os.remove(path)
+            
+            print(f"[LOG] Archived {entry['file']}: {entry['rows']} rows, "
+                  f"{entry['bytes'] / 1024:.0f} KB -> {entry['compressed_bytes'] / 1024:.0f} KB")
+            
+            self._prune()
+        
+        except Exception as e:
+            print(f"⚠ Error archiving {segment_path}: {e}")
+    
+    def _prune(self):
+        """Delete the oldest segments while the archive exceeds max_bytes"""
+        if not self.max_bytes:
+            return
+        
+        with self._lock:
+            while len(self.segments) > 1 and self.total_bytes > self.max_bytes:
+                entry = self.segments.pop(0)
+                for name in (entry['file'], entry['events_file']):
+                    if name and os.path.exists(os.path.join(self.archive_dir, name)):
+                        os.remove(os.path.join(self.archive_dir, name))
+                print(f"⚠ Archive over {self.max_bytes / 2**20:.0f} MB, deleted {entry['file']}")
+            self._save_manifest()
+    
+    def recover(self):
+        """
+        Archive segments left uncompressed by a crash (runs synchronously)
+        
+        Returns:
+            int: Number of segments recovered
+        """
+        base, ext = os.path.splitext(os.path.basename(self.log_file_path))
+        archived = {s['file'] for s in self.segments}
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        
+        pending = sorted(
+            name for name in os.listdir(self.archive_dir)
+            if name.startswith(base + '_') and name.endswith(ext)
+            and name + suffix not in archived
+        )
+        for name in pending:
+            print(f"⚠ Archiving segment left by an interrupted run: {name}")
+            self._archive(os.path.join(self.archive_dir, name), 'recovered')
+        return len(pending)
+    
+    def wait(self, timeout=None):
+        """
+        Wait for background compression to finish
+        
+        Args:
+            timeout (float): Max seconds to wait in total (default LOG_DRAIN_TIMEOUT)
+        
+        Returns:
+            bool: True if nothing is still compressing
+        """
+        if timeout is None:
+            timeout = config.LOG_DRAIN_TIMEOUT
+        
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.time()))
+        self._threads = [t for t in self._threads if t.is_alive()]
+        
+        if self._threads:
+            print(f"⚠ {len(self._threads)} log segment(s) still compressing, "
+                  f"finished on next start")
+        return not self._threads
+    
+    @property
+    def total_bytes(self):
+        """Compressed size of all archived segments"""
+        return sum(s['compressed_bytes'] for s in self.segments)
+    
+    def statistics_states(self):
+        """
+        Get per-segment statistics (for LogStatistics.rebuild)
+        
+        Returns:
+            list: Statistics snapshots, oldest first
+        """
+        with self._lock:
+            return [s['stats'] for s in self.segments]
+    
+    def segments_between(self, start=None, end=None):
+        """
+        Get segments whose time range overlaps [start, end]
+        
+        Args:
+            start (str): 'YYYY-MM-DD HH:MM:SS' or a prefix like '2024-01-05' (None = open)
+            end (str): Same format as start (None = open)
+        
+        Returns:
+            list: Manifest entries, oldest first
+        """
+        with self._lock:
+            segments = list(self.segments)
+        
+        return [
+            s for s in segments
+            if s['start'] is not None
+            and (end is None or s['start'][:len(end)] <= end)
+            and (start is None or s['end'] >= start)
+        ]
+    
+    def read_segment(self, entry):
+        """
+        Read an archived segment as CSV-style rows
+        
+        Args:
+            entry (dict): Manifest entry
+        
+        Returns:
+            list: Rows in LOG_HEADERS order
+        """
+        path = os.path.join(self.archive_dir, entry['file'])
+        with _open_compressed(path, 'rb', entry['compression']) as f:
+            data = f.read()
+        
+        if entry['format'] == 'binary':
+            events = {}
+            if entry['events_file']:
+                events_path = os.path.join(self.archive_dir, entry['events_file'])
+                with _open_compressed(events_path, 'rb', entry['compression']) as f:
+                    events = record_log.read_events(io.StringIO(f.read().decode('utf-8'), newline=''))
+            return record_log.records_to_rows(record_log.records_from_bytes(data), events)
+        
+        rows = list(csv.reader(io.StringIO(data.decode('utf-8', errors='replace'), newline='')))
+        return [row for row in rows[1:] if row]
+    
+    def print_summary(self):
+        """Print archived segment count and size"""
+        rows = sum(s['rows'] for s in self.segments)
+        raw = sum(s['bytes'] for s in self.segments)
+        print(f"Archived segments: {len(self.segments)} ({rows} rows, "
+              f"{raw / 2**20:.1f} MB -> {self.total_bytes / 2**20:.1f} MB "
+              f"{self.compression or 'uncompressed'})")
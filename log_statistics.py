@@ -0,0 +1,350 @@
+"""
+Log Statistics Module for AMLAC Robot
+Running statistics of the CSV (or binary record) log, updated as rows are
+written and checkpointed to a small JSON file next to the log, so
+DataLogger never has to re-read weeks of CSV to print its statistics.
+
+The checkpoint records how many bytes of the log it covers. On startup:
+- checkpoint missing or unreadable, or CSV shorter/replaced -> full rebuild
+- CSV longer than the checkpoint (rows written after the last checkpoint,
+  e.g. after a crash) -> only the new tail is read
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+import time
+import config
+import record_log
+
+CHECKPOINT_FORMAT_VERSION = 1
+TAIL_CHECK_BYTES = 64  # Bytes before the covered offset used to detect a replaced CSV
+
+
+def checkpoint_path_for(log_file_path):
+    """
+    Get the statistics checkpoint path for a log file
+    
+    Args:
+        log_file_path (str): CSV log path
+    
+    Returns:
+        str: e.g. collection_log.csv -> collection_log.stats.json
+    """
+    return os.path.splitext(log_file_path)[0] + '.stats.json'
+
+
+def _new_bucket():
+    """Counters kept per hour and per day"""
+    return {'rows': 0, 'detections': 0, 'confidence_sum': 0.0}
+
+
+class LogStatistics:
+    """
+    Incremental statistics over CSV log rows
+    Rows are fed in LOG_HEADERS order, exactly as written to (or read from)
+    the CSV, so incremental updates and rebuilds always agree.
+    """
+    
+    def __init__(self, log_file_path, checkpoint_interval=None, archived=None):
+        """
+        Initialize empty statistics
+        
+        Args:
+            log_file_path (str): CSV log the statistics describe
+            checkpoint_interval (float): Seconds between automatic checkpoints
+                                         (default from config)
+            archived (callable): Returns statistics of rotated log segments
+                                 (see LogArchive), merged in on rebuild
+        """
+        self.log_file_path = log_file_path
+        self.archived = archived
+        self.checkpoint_path = checkpoint_path_for(log_file_path)
+        self.checkpoint_interval = (config.LOG_STATS_CHECKPOINT_INTERVAL
+                                    if checkpoint_interval is None else checkpoint_interval)
+        self._lock = threading.Lock()
+        self._last_checkpoint = time.time()
+        self.reset()
+    
+    def reset(self, offset=0):
+        """
+        Clear all counters
+        
+        Args:
+            offset (int): CSV bytes already covered (e.g. the header row)
+        """
+        with self._lock:
+            self.offset = offset
+            self.total_rows = 0
+            self.total_detections = 0
+            self.total_events = 0
+            self.confidence_sum = 0.0
+            self.confidence_count = 0
+            self.confidence_min = None
+            self.confidence_max = None
+            self.first_timestamp = None
+            self.last_timestamp = None
+            self.hourly = {}
+            self.daily = {}
+    
+    def _add_row(self, row):
+        """Update counters with one CSV row (lock held)"""
+        if not row or row[0] == config.LOG_HEADERS[0]:
+            return  # Empty line or header
+        
+        timestamp = str(row[0])
+        status = row[1] if len(row) > 1 else ''
+        
+        self.total_rows += 1
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        
+        hour = self.hourly.setdefault(timestamp[:13], _new_bucket())
+        day = self.daily.setdefault(timestamp[:10], _new_bucket())
+        hour['rows'] += 1
+        day['rows'] += 1
+        
+        if status == 'Yes':
+            self.total_detections += 1
+            hour['detections'] += 1
+            day['detections'] += 1
+            try:
+                confidence = float(row[2])
+            except (IndexError, ValueError):
+                return
+            self.confidence_sum += confidence
+            self.confidence_count += 1
+            hour['confidence_sum'] += confidence
+            day['confidence_sum'] += confidence
+            if self.confidence_min is None or confidence < self.confidence_min:
+                self.confidence_min = confidence
+            if self.confidence_max is None or confidence > self.confidence_max:
+                self.confidence_max = confidence
+        elif status != 'No':
+            self.total_events += 1
+    
+    def rows_written(self, rows, offset):
+        """
+        Writer callback: rows reached the CSV file
+        
+        Args:
+            rows (list): Rows just written, in LOG_HEADERS order
+            offset (int): CSV file size after writing them
+        """
+        with self._lock:
+            for row in rows:
+                self._add_row(row)
+            self.offset = offset
+        
+        if time.time() - self._last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+    
+    def _scan(self, start_offset):
+        """
+        Add rows from the CSV starting at a byte offset
+        
+        Args:
+            start_offset (int): Byte offset of a line (or record) start
+        """
+        if record_log.is_record_file(self.log_file_path):
+            rows, end_offset = record_log.read_rows(self.log_file_path, start_offset)
+            with self._lock:
+                for row in rows:
+                    self._add_row(row)
+                self.offset = end_offset
+            return
+        
+        with open(self.log_file_path, 'rb') as f:
+            f.seek(start_offset)
+            data = f.read()
+        
+        with self._lock:
+            for row in csv.reader(io.StringIO(data.decode('utf-8', errors='replace'), newline='')):
+                self._add_row(row)
+            self.offset = start_offset + len(data)
+    
+    def rebuild(self):
+        """Recompute everything from the CSV (slow for long logs)"""
+        self.reset()
+        if self.archived:
+            for state in self.archived():
+                self.merge(state)
+        if os.path.isfile(self.log_file_path):
+            self._scan(0)
+    
+    def merge(self, state):
+        """
+        Add the counters of another statistics snapshot (e.g. a rotated segment)
+        
+        Args:
+            state (dict): Snapshot from to_dict()
+        """
+        with self._lock:
+            self.total_rows += state['total_rows']
+            self.total_detections += state['total_detections']
+            self.total_events += state['total_events']
+            self.confidence_sum += state['confidence_sum']
+            self.confidence_count += state['confidence_count']
+            
+            for name, pick in (('confidence_min', min), ('confidence_max', max)):
+                values = [v for v in (getattr(self, name), state[name]) if v is not None]
+                setattr(self, name, pick(values) if values else None)
+            
+            if state['first_timestamp'] and (self.first_timestamp is None
+                                             or state['first_timestamp'] < self.first_timestamp):
+                self.first_timestamp = state['first_timestamp']
+            if state['last_timestamp'] and (self.last_timestamp is None
+                                            or state['last_timestamp'] > self.last_timestamp):
+                self.last_timestamp = state['last_timestamp']
+            
+            for buckets, other in ((self.hourly, state['hourly']), (self.daily, state['daily'])):
+                for key, counts in other.items():
+                    bucket = buckets.setdefault(key, _new_bucket())
+                    for field in bucket:
+                        bucket[field] += counts[field]
+    
+    def start_segment(self, offset):
+        """
+        Keep the counters but continue in a new, freshly rotated log file
+        
+        Args:
+            offset (int): Size of the new file (its header)
+        """
+        with self._lock:
+            self.offset = offset
+        self.save_checkpoint()
+    
+    def _tail_check(self, offset):
+        """Bytes just before an offset, used to recognise the same CSV"""
+        if offset <= 0:
+            return ''
+        with open(self.log_file_path, 'rb') as f:
+            f.seek(max(0, offset - TAIL_CHECK_BYTES))
+            return f.read(min(offset, TAIL_CHECK_BYTES)).decode('utf-8', errors='replace')
+    
+    def to_dict(self):
+        """Serializable snapshot of all counters"""
+        with self._lock:
+            return {
+                'format_version': CHECKPOINT_FORMAT_VERSION,
+                'log_file': os.path.basename(self.log_file_path),
+                'offset': self.offset,
+                'total_rows': self.total_rows,
+                'total_detections': self.total_detections,
+                'total_events': self.total_events,
+                'confidence_sum': self.confidence_sum,
+                'confidence_count': self.confidence_count,
+                'confidence_min': self.confidence_min,
+                'confidence_max': self.confidence_max,
+                'first_timestamp': self.first_timestamp,
+                'last_timestamp': self.last_timestamp,
+                'hourly': {k: dict(v) for k, v in self.hourly.items()},
+                'daily': {k: dict(v) for k, v in self.daily.items()}
+            }
+    
+    def save_checkpoint(self):
+        """
+        Write the checkpoint atomically (temp file + rename)
+        
+        Returns:
+            bool: True if saved
+        """
+        self._last_checkpoint = time.time()
+        try:
+            state = self.to_dict()
+            state['tail_check'] = self._tail_check(state['offset'])
+            temp_path = self.checkpoint_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.checkpoint_path)
+            return True
+        except Exception as e:
+            print(f"⚠ Error saving log statistics checkpoint: {e}")
+            return False
+    
+    def load(self):
+        """
+        Load the checkpoint, reading only CSV rows written after it
+        Falls back to a full rebuild when the checkpoint is missing or stale.
+        
+        Returns:
+            str: 'checkpoint', 'checkpoint+tail' or 'rebuilt'
+        """
+        state = None
+        if os.path.isfile(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, 'r') as f:
+                    state = json.load(f)
+            except Exception as e:
+                print(f"⚠ Error reading {self.checkpoint_path}: {e}")
+        
+        size = os.path.getsize(self.log_file_path) if os.path.isfile(self.log_file_path) else 0
+        
+        if (state is None
+                or state.get('format_version') != CHECKPOINT_FORMAT_VERSION
+                or state['offset'] > size
+                or state.get('tail_check') != self._tail_check(state['offset'])):
+            self.rebuild()
+            self.save_checkpoint()
+            return 'rebuilt'
+        
+        with self._lock:
+            self.offset = state['offset']
+            self.total_rows = state['total_rows']
+            self.total_detections = state['total_detections']
+            self.total_events = state['total_events']
+            self.confidence_sum = state['confidence_sum']
+            self.confidence_count = state['confidence_count']
+            self.confidence_min = state['confidence_min']
+            self.confidence_max = state['confidence_max']
+            self.first_timestamp = state['first_timestamp']
+            self.last_timestamp = state['last_timestamp']
+            self.hourly = state['hourly']
+            self.daily = state['daily']
+        
+        if size > self.offset:
+            self._scan(self.offset)
+            self.save_checkpoint()
+            return 'checkpoint+tail'
+        
+        return 'checkpoint'
+    
+    def summary(self):
+        """
+        Get the statistics in DataLogger.get_statistics() form
+        
+        Returns:
+            dict: total_rows, total_detections, average_confidence,
+                  detection_rate, plus events, min/max confidence, first/last
+                  timestamp and per-day/per-hour buckets
+        """
+        with self._lock:
+            def bucket_summary(buckets):
+                return {
+                    key: {
+                        'rows': b['rows'],
+                        'detections': b['detections'],
+                        'average_confidence': (b['confidence_sum'] / b['detections']
+                                               if b['detections'] else 0.0)
+                    }
+                    for key, b in sorted(buckets.items())
+                }
+            
+            return {
+                'total_rows': self.total_rows,
+                'total_detections': self.total_detections,
+                'total_events': self.total_events,
+                'average_confidence': (self.confidence_sum / self.confidence_count
+                                       if self.confidence_count else 0.0),
+                'min_confidence': self.confidence_min,
+                'max_confidence': self.confidence_max,
+                'detection_rate': (self.total_detections / self.total_rows
+                                   if self.total_rows else 0.0),
+                'first_timestamp': self.first_timestamp,
+                'last_timestamp': self.last_timestamp,
+                'per_day': bucket_summary(self.daily),
+                'per_hour': bucket_summary(self.hourly)
+            }
@@ -0,0 +1,544 @@
+"""
+Log Writers Module for AMLAC Robot
+Row writers used by DataLogger to append to the CSV log
+
+- DirectCSVWriter: opens, appends one row and closes the file per call
+  (every row is handed to the OS immediately, one metadata update per row)
+- BufferedCSVWriter: keeps the file open and writes rows in batches
+- RecordLogWriter: like BufferedCSVWriter, but appends fixed-size binary
+  records (see record_log.py)
+- EventLogWriter: like BufferedCSVWriter, but appends JSON lines (see event_log.py)
+- AsyncLogWriter: hands rows to a background thread through a bounded
+  queue, so the control loop never waits on the SD card
+
+Crash safety of BufferedCSVWriter:
+- Rows are held in memory until LOG_BUFFER_ROWS rows are buffered or the
+  oldest buffered row is LOG_FLUSH_INTERVAL seconds old (checked on every
+  write and by poll()). If the process dies, at most that many rows are lost.
+- A flush hands the rows to the OS. They survive a crash of the program
+  but not a power cut until the OS writes them out.
+- fsync() runs at most every LOG_FSYNC_INTERVAL seconds (0 = on every
+  flush, None = never), which bounds the rows lost on power loss.
+- Rows are always written whole, so a power cut can truncate at most the
+  last line of the file; csv.DictReader reads it as a short row.
+- close() (called from DataLogger.close() at shutdown) flushes and fsyncs.
+
+With AsyncLogWriter, rows still in its queue are lost on a crash as well;
+close() drains the queue (up to LOG_DRAIN_TIMEOUT seconds) before closing.
+reopen() swaps the inner writer on the worker thread (log rotation) without
+making the caller wait for the queue.
+"""
+
+import csv
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import config
+import record_log
+from latency_stats import LatencyStats
+
+# Default for arguments where None is a meaningful value
+_FROM_CONFIG = object()
+
+
+class DirectCSVWriter:
+    """Open-append-close per row (original DataLogger behaviour)"""
+    
+    def __init__(self, path, on_write=None):
+        """
+        Initialize writer
+        
+        Args:
+            path (str): CSV file to append to
+            on_write (callable): Called as on_write(rows, file_size) once rows
+                                 reach the file (e.g. LogStatistics.rows_written)
+        """
+        self.path = path
+        self.on_write = on_write
+        self.rows_written = 0
+    
+    def write_row(self, row):
+        """
+        Append one row
+        
+        Args:
+            row (list): CSV row values
+        """
+        with open(self.path, 'a', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(row)
+        self.rows_written += 1
+        if self.on_write:
+            self.on_write([row], os.path.getsize(self.path))
+    
+    def poll(self):
+        """Nothing is buffered"""
+        pass
+    
+    def flush(self):
+        """Nothing is buffered"""
+        pass
+    
+    def close(self):
+        """Nothing is held open"""
+        pass
+
+
+class BufferedCSVWriter:
+    """
+    Keeps the CSV open and appends rows in batches
+    See the module docstring for what survives a crash or power cut.
+    """
+    
+    def __init__(self, path, buffer_rows=None, flush_interval=None, fsync_interval=_FROM_CONFIG,
+                 on_write=None):
+        """
+        Initialize writer
+        
+        Args:
+            path (str): CSV file to append to
+            buffer_rows (int): Flush when this many rows are buffered (default from config)
+            flush_interval (float): Flush when the oldest buffered row is this
+                                    old, in seconds (default from config)
+            fsync_interval (float): Seconds between fsyncs, 0 = every flush,
+                                    None = never (default from config)
+            on_write (callable): Called as on_write(rows, file_size) after each flush
+        """
+        self.path = path
+        self.on_write = on_write
+        self.buffer_rows = config.LOG_BUFFER_ROWS if buffer_rows is None else buffer_rows
+        self.flush_interval = config.LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.fsync_interval = config.LOG_FSYNC_INTERVAL if fsync_interval is _FROM_CONFIG else fsync_interval
+        
+        self._open()
+        self._buffer = []
+        self._oldest = None  # Time the first buffered row arrived
+        self._last_fsync = time.time()
+        
+        self.rows_written = 0
+        self.flushes = 0
+        self.fsyncs = 0
+    
+    def _open(self):
+        """Open the log file for appending"""
+        self._file = open(self.path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+    
+    def _write_rows(self, rows):
+        """Write rows to the open file"""
+        self._writer.writerows(rows)
+    
+    def write_row(self, row):
+        """
+        Buffer one row, flushing if the size or age limit is reached
+        
+        Args:
+            row (list): CSV row values
+        """
+        if not self._buffer:
+            self._oldest = time.time()
+        self._buffer.append(row)
+        
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+        else:
+            self.poll()
+    
+    def poll(self):
+        """Flush if the oldest buffered row exceeded the flush interval"""
+        if self._buffer and time.time() - self._oldest >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered rows to the OS (and fsync if due)"""
+        if self._buffer:
+            rows = self._buffer
+            self._write_rows(rows)
+            self.rows_written += len(rows)
+            self._buffer = []
+            self._oldest = None
+            self._file.flush()
+            self.flushes += 1
+            if self.on_write:
+                self.on_write(rows, os.fstat(self._file.fileno()).st_size)
+        
+        if self.fsync_interval is not None and time.time() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+    
+    def _fsync(self):
+        """Force written rows onto the SD card"""
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.time()
+        self.fsyncs += 1
+    
+    @property
+    def pending_rows(self):
+        """Rows buffered in memory, not yet written"""
+        return len(self._buffer)
+    
+    def close(self):
+        """Flush, fsync and close the file"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._fsync()
+        self._file.close()
+
+
+class RecordLogWriter(BufferedCSVWriter):
+    """
+    Appends rows as fixed-size binary records (record_log.py format)
+    Rows are passed in the same CSV-style form and buffered, flushed and
+    fsynced exactly like BufferedCSVWriter.
+    """
+    
+    def _open(self):
+        """Create or repair the record log and open it for appending"""
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            record_log.create_record_file(self.path)
+        self._next_index = record_log.repair(self.path)
+        self._file = open(self.path, 'ab')
+    
+    def _write_rows(self, rows):
+        """Convert rows to records and append them (event text to the sidecar)"""
+        records, events = record_log.rows_to_records(rows, self._next_index)
+        if events:
+            record_log.append_events(self.path, events)
+        self._file.write(records.tobytes())
+        self._next_index += len(records)
+
+
+class EventLogWriter(BufferedCSVWriter):
+    """
+    Appends event dicts as JSON lines (event_log.py format)
+    Buffered, flushed and fsynced exactly like BufferedCSVWriter.
+    """
+    
+    def _open(self):
+        """Open the event log for appending"""
+        self._file = open(self.path, 'a')
+    
+    def _write_rows(self, rows):
+        """Write events, one JSON object per line"""
+        self._file.write(''.join(json.dumps(event, default=str) + '\n' for event in rows))
+
+
+class AsyncLogWriter:
+    """
+    Writes rows on a background thread
+    write_row() only enqueues into a bounded queue. When the queue is full
+    the row is dropped ('drop' policy) or the caller waits up to a timeout
+    before dropping it ('block' policy), so an SD card stall never holds up
+    the control loop for longer than that.
+    """
+    
+    _FLUSH = object()
+    _REOPEN = object()
+    _STOP = object()
+    
+    def __init__(self, writer, queue_size=None, policy=None, block_timeout=None):
+        """
+        Initialize and start the logging worker
+        
+        Args:
+            writer: Inner writer (DirectCSVWriter or BufferedCSVWriter), only
+                    ever used from the worker thread
+            queue_size (int): Max queued rows (default from config)
+            policy (str): 'drop' or 'block' when the queue is full (default from config)
+            block_timeout (float): Max seconds to wait with 'block' (default from config)
+        """
+        if queue_size is None:
+            queue_size = config.LOG_QUEUE_SIZE
+        if policy is None:
+            policy = config.LOG_QUEUE_POLICY
+        if block_timeout is None:
+            block_timeout = config.LOG_QUEUE_BLOCK_TIMEOUT
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown log queue policy: {policy} (expected 'drop' or 'block')")
+        
+        self.writer = writer
+        self.path = writer.path
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        
+        # Queue metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.enqueue_stats = LatencyStats('log_enqueue')
+        self.write_stats = LatencyStats('log_write')
+        
+        self._thread = threading.Thread(target=self._worker, name='log-writer', daemon=True)
+        self._thread.start()
+    
+    def _worker(self):
+        """Write queued rows, and flush aged rows while idle"""
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                self._call(self.writer.poll)
+                continue
+            
+            if item is self._STOP:
+                self._call(self.writer.close)
+                return
+            
+            if isinstance(item, tuple) and item[0] is self._FLUSH:
+                self._call(self.writer.flush)
+                item[1].set()
+                continue
+            
+            if isinstance(item, tuple) and item[0] is self._REOPEN:
+                self._call(self.writer.close)
+                try:
+                    self.writer = item[1]()
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Error reopening log: {e}")
+                continue
+            
+            with self.write_stats.measure():
+                self._call(self.writer.write_row, item)
+    
+    def _call(self, fn, *args):
+        """Run a writer method, counting (not raising) errors"""
+        try:
+            fn(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error writing log: {e}")
+    
+    def write_row(self, row):
+        """
+        Queue one row for the worker
+        
+        Args:
+            row (list): CSV row values
+        
+        Returns:
+            bool: False if the row was dropped because the queue was full
+        """
+        with self.enqueue_stats.measure():
+            try:
+                if self.policy == 'block':
+                    self._queue.put(row, timeout=self.block_timeout)
+                else:
+                    self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+    
+    def poll(self):
+        """The worker flushes aged rows itself"""
+        pass
+    
+    def flush(self, timeout=None):
+        """
+        Wait until every queued row is written and flushed
+        
+        Args:
+            timeout (float): Max seconds to wait (default LOG_DRAIN_TIMEOUT)
+        
+        Returns:
+            bool: True if the worker finished in time
+        """
+        if not self._thread.is_alive():
+            return False
+        
+        if timeout is None:
+            timeout = config.LOG_DRAIN_TIMEOUT
+        
+        done = threading.Event()
+        try:
+            self._queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def reopen(self, factory):
+        """
+        Close the inner writer and replace it with factory() on the worker
+        thread, once the rows queued before this call are written (e.g. for
+        log rotation). Returns at once.
+        
+        Args:
+            factory (callable): Returns the new inner writer; runs on the
+                                worker thread
+        
+        Returns:
+            bool: False if the queue was full and nothing was queued
+        """
+        try:
+            self._queue.put_nowait((self._REOPEN, factory))
+        except queue.Full:
+            return False
+        return True
+    
+    def close(self, timeout=None):
+        """
+        Drain the queue, close the inner writer and stop the worker
+        
+        Args:
+            timeout (float): Max seconds to wait (default LOG_DRAIN_TIMEOUT)
+        
+        Returns:
+            bool: True if every queued row was written
+        """
+        if not self._thread.is_alive():
+            return True
+        
+        if timeout is None:
+            timeout = config.LOG_DRAIN_TIMEOUT
+        
+        deadline = time.time() + timeout
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(max(0.0, deadline - time.time()))
+        
+        drained = not self._thread.is_alive()
+        if not drained:
+            print(f"⚠ Log queue not drained: {self._queue.qsize()} rows still pending")
+        return drained
+    
+    @property
+    def depth(self):
+        """Rows currently waiting in the queue"""
+        return self._queue.qsize()
+    
+    def get_stats(self):
+        """
+        Get queue metrics
+        
+        Returns:
+            dict: enqueued, dropped, errors, depth, max_depth and latency summaries
+        """
+        return {
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'enqueue': self.enqueue_stats.summary(),
+            'write': self.write_stats.summary()
+        }
+    
+    def print_stats(self):
+        """Print queue metrics"""
+        print(f"Log queue: {self.enqueued} rows, {self.dropped} dropped, {self.errors} errors, "
+              f"depth {self.depth} (max {self.max_depth}/{self._queue.maxsize})")
+        print(self.enqueue_stats.format_line())
+        print(self.write_stats.format_line())
+
+
+def create_writer(path, mode=None, use_async=None, on_write=None, log_format=None):
+    """
+    Create the row writer selected in config
+    
+    Args:
+        path (str): CSV file to append to
+        mode (str): 'direct' or 'buffered' (default from config)
+        use_async (bool): Wrap in an AsyncLogWriter (default from config)
+        on_write (callable): Called as on_write(rows, file_size) once rows
+                             reach the file (on the worker thread in async mode)
+        log_format (str): 'csv' or 'binary' (default from config)
+    
+    Returns:
+        DirectCSVWriter, BufferedCSVWriter, RecordLogWriter or AsyncLogWriter
+    """
+    if mode is None:
+        mode = config.LOG_WRITE_MODE
+    if use_async is None:
+        use_async = config.LOG_ASYNC
+    if log_format is None:
+        log_format = config.LOG_FORMAT
+    
+    if mode not in ('direct', 'buffered'):
+        raise ValueError(f"Unknown log write mode: {mode} (expected 'direct' or 'buffered')")
+    
+    if log_format == 'binary':
+        # Direct mode: every row is written on its own
+        writer = RecordLogWriter(path, buffer_rows=1 if mode == 'direct' else None,
+                                 on_write=on_write)
+    elif log_format == 'csv':
+        if mode == 'direct':
+            writer = DirectCSVWriter(path, on_write=on_write)
+        else:
+            writer = BufferedCSVWriter(path, on_write=on_write)
+    else:
+        raise ValueError(f"Unknown log format: {log_format} (expected 'csv' or 'binary')")
+    
+    if use_async:
+        return AsyncLogWriter(writer)
+    return writer
+
+
+def benchmark(num_rows=5000, directory=None):
+    """
+    Compare rows/second and file size of the log writers
+    
+    Args:
+        num_rows (int): Rows written per writer
+        directory (str): Where to write the test files (default: temp dir,
+                         run on the SD card for representative numbers)
+    
+    Returns:
+        dict: writer name -> rows per second
+    """
+    directory = directory or tempfile.mkdtemp(prefix='amlac_log_')
+    row = ['2024-01-01 12:00:00', 'Yes', '0.8765', '14.599500', '120.984200',
+           '1.50', 3, '25.50', 'P:2.5 R:-1.2']
+    
+    writers = {
+        'direct': lambda path: DirectCSVWriter(path),
+        'buffered': lambda path: BufferedCSVWriter(path, fsync_interval=None),
+        'buffered+fsync': lambda path: BufferedCSVWriter(path, fsync_interval=0),
+        'records': lambda path: RecordLogWriter(record_log.record_path_for(path),
+                                                fsync_interval=None),
+        'async+buffered': lambda path: AsyncLogWriter(
+            BufferedCSVWriter(path, fsync_interval=None), queue_size=num_rows, policy='block'
+        ),
+    }
+    results = {}
+    caller_us = {}
+    bytes_per_row = {}
+    
+    print(f"Log writer benchmark: {num_rows} rows in {directory}")
+    for name, factory in writers.items():
+        path = os.path.join(directory, f'bench_{name}.csv')
+        writer = factory(path)
+        start = time.perf_counter()
+        for _ in range(num_rows):
+            writer.write_row(row)
+        caller_us[name] = (time.perf_counter() - start) / num_rows * 1e6
+        writer.close()
+        duration = time.perf_counter() - start
+        results[name] = num_rows / duration if duration else 0.0
+        bytes_per_row[name] = os.path.getsize(writer.path) / num_rows
+        os.remove(writer.path)
+    
+    for name, rows_per_second in results.items():
+        speedup = rows_per_second / results['direct'] if results['direct'] else 0.0
+        print(f"  {name:<15} {rows_per_second:10.0f} rows/s  x{speedup:.1f}  "
+              f"caller {caller_us[name]:7.1f} us/row  {bytes_per_row[name]:5.1f} bytes/row")
+    
+    return results
+
+
+if __name__ == "__main__":
+    """Benchmark log writers"""
+    import sys
+    
+    print("=== AMLAC Log Writer Benchmark ===\n")
+    benchmark(directory=sys.argv[1] if len(sys.argv) > 1 else None)
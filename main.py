@@ -18,16 +18,19 @@ import time
 import sys
 import signal
 from datetime import datetime
-from picamera2 import Picamera2
-import RPi.GPIO as GPIO
+import numpy as np
 
 # Import AMLAC modules
 import config
+import i2c_bus
+from hardware import GPIO, Picamera2
 from ml_inference import MLInference
 from sensor_manager import SensorManager
 from motor_controller import MotorController
 from lcd_display import LCDDisplay, LCDRotator
 from data_logger import DataLogger
+from scan_pipeline import ScanPipeline
+from frame_gate import FrameChangeGate
 
 
 class AMLACRobot:
@@ -71,9 +74,13 @@ class AMLACRobot:
         
         # Initialize sensors
         self.sensors = SensorManager()
+        if config.IMU_STREAMING:
+            self.sensors.start_imu_stream()
+        if config.SENSOR_SAMPLING_ENABLED:
+            self.sensors.start_sampling()
         
         # Initialize motors
-        self.motors = MotorController()
+        self.motors = MotorController(yaw_rate_source=self.sensors.read_yaw_rate)
         
         # Initialize LCD display
         self.lcd = LCDDisplay()
@@ -82,6 +89,18 @@ class AMLACRobot:
         # Initialize data logger
         self.logger = DataLogger()
         
+        # Skip inference on frames that barely changed since the last one
+        self.frame_gate = FrameChangeGate() if config.FRAME_GATE_ENABLED else None
+        
+        # Initialize scan pipeline (sensors read during capture/inference)
+        self.pipeline = None
+        if config.PIPELINE_ENABLED:
+            self.pipeline = ScanPipeline(
+                capture_fn=self.capture_image,
+                detect_fn=self.detect_algae,
+                sensor_fn=self.sensors.get_all_sensor_data
+            )
+        
         # Initialize state variables
         self.collection_count = 0
         self.running = False
@@ -94,10 +113,14 @@ class AMLACRobot:
         # Display ready message
         self.lcd.show_ready()
     
-    def run(self):
+    def run(self, max_iterations=None):
         """
         Main control loop
         Continuously scans for algae and collects when detected
+        
+        Args:
+            max_iterations (int): Stop after this many loops (None = until stopped),
+                                  used for simulation load tests
         """
         self.running = True
         self.lcd.show_scanning(self.collection_count)
@@ -106,34 +129,43 @@ class AMLACRobot:
         print("Press Ctrl+C to stop\n")
         
         # Log startup
-        self.logger.log_event('INFO', 'Robot started')
+        self.logger.log_event('INFO', 'Robot started', code='ROBOT_START')
+        
+        if self.pipeline:
+            self.pipeline.start()
         
         loop_count = 0
         
         while self.running:
+            if max_iterations is not None and loop_count >= max_iterations:
+                break
+            
             try:
                 loop_count += 1
                 loop_start_time = time.time()
                 
-                # ==========================================
-                # 1. CAPTURE IMAGE
-                # ==========================================
-                if self.camera_available:
-                    image = self.camera.capture_array()
+                if self.pipeline:
+                    # ==========================================
+                    # 1-3. PIPELINED CAPTURE / INFERENCE / SENSORS
+                    # ==========================================
+                    # Sensors are read while this scan's frame is captured
+                    # and inferred; nothing is buffered between loops
+                    algae_detected, confidence, sensor_data = self.pipeline.next_scan()
                 else:
-                    # If no camera, create dummy image for testing
-                    import numpy as np
-                    image = np.zeros((480, 640, 3), dtype=np.uint8)
-                
-                # ==========================================
-                # 2. RUN ML INFERENCE
-                # ==========================================
-                algae_detected, confidence = self.ml_model.detect(image)
-                
-                # ==========================================
-                # 3. READ ALL SENSORS
-                # ==========================================
-                sensor_data = self.sensors.get_all_sensor_data()
+                    # ==========================================
+                    # 1. CAPTURE IMAGE
+                    # ==========================================
+                    image = self.capture_image()
+                    
+                    # ==========================================
+                    # 2. RUN ML INFERENCE
+                    # ==========================================
+                    algae_detected, confidence = self.detect_algae(image)
+                    
+                    # ==========================================
+                    # 3. READ ALL SENSORS
+                    # ==========================================
+                    sensor_data = self.sensors.get_all_sensor_data()
                 
                 # ==========================================
                 # 4. DECISION LOGIC
@@ -144,14 +176,18 @@ class AMLACRobot:
                     self.handle_bin_full()
                     continue
                 
-                # Check for obstacles
-                if sensor_data['distance'] is not None:
-                    if sensor_data['distance'] < config.MIN_DISTANCE_CM:
+                # Check for obstacles. The turn away runs in the background, so
+                # the loop keeps its pace (logging, reports, delay) meanwhile
+                obstacle_ahead = (sensor_data['distance'] is not None
+                                  and sensor_data['distance'] < config.MIN_DISTANCE_CM)
+                turning = self.motors.motion_busy
+                if obstacle_ahead or turning:
+                    # No collection or LCD rotation until the maneuver is done
+                    if not turning:
                         self.handle_obstacle(sensor_data['distance'])
-                        continue
-                
-                # Check for algae detection
-                if algae_detected and confidence > config.CONFIDENCE_THRESHOLD:
+                # Check for algae detection (one collection cycle at a time)
+                elif (algae_detected and confidence > self.ml_model.confidence_threshold
+                        and not self.motors.conveyor_busy):
                     self.handle_algae_detection(confidence, sensor_data)
                 else:
                     # Normal scanning mode - rotate LCD display
@@ -163,6 +199,19 @@ class AMLACRobot:
                 if loop_count % 30 == 0:  # Every 30 loops (~1 minute)
                     self.print_status(sensor_data)
                 
+                if self.pipeline and loop_count % config.PIPELINE_REPORT_INTERVAL == 0:
+                    self.pipeline.print_report()
+                if self.frame_gate and loop_count % config.PIPELINE_REPORT_INTERVAL == 0:
+                    self.frame_gate.print_stats()
+                if loop_count % config.PIPELINE_REPORT_INTERVAL == 0:
+                    self.logger.print_queue_stats()
+                    self.sensors.print_sampling_report()
+                    if config.I2C_ARBITER_ENABLED:
+                        i2c_bus.get_arbiter().print_report()
+                
+                # Write out log rows that have been buffered too long
+                self.logger.poll()
+                
                 # ==========================================
                 # 6. WAIT BEFORE NEXT SCAN
                 # ==========================================
@@ -176,12 +225,66 @@ class AMLACRobot:
             except Exception as e:
                 print(f"\n⚠ Error in main loop: {e}")
                 self.lcd.show_error(str(e)[:16])
-                self.logger.log_event('ERROR', str(e))
+                self.logger.log_event('ERROR', str(e), code='LOOP_ERROR')
                 time.sleep(5)
         
         # Shutdown
         self.shutdown()
     
+    def capture_image(self):
+        """
+        Capture a frame from the camera
+        
+        Returns:
+            numpy.ndarray: RGB image (dummy black frame if no camera)
+        """
+        if self.camera_available:
+            return self.camera.capture_array()
+        
+        # If no camera, create dummy image for testing
+        return np.zeros((480, 640, 3), dtype=np.uint8)
+    
+    def detect_algae(self, image):
+        """
+        Run algae detection on a frame, reusing the previous result when the
+        frame gate sees no scene change
+        
+        Args:
+            image (numpy.ndarray): Camera frame
+        
+        Returns:
+            tuple: (is_algae_detected: bool, confidence: float)
+        """
+        if self.frame_gate:
+            return self.frame_gate.detect(image, self._run_detection)
+        
+        return self._run_detection(image)
+    
+    def _run_detection(self, image):
+        """
+        Run the model on a frame (whole frame or overlapping tiles)
+        
+        Args:
+            image (numpy.ndarray): Camera frame
+        
+        Returns:
+            tuple: (is_algae_detected: bool, confidence: float)
+        """
+        if config.ML_TILED_DETECTION:
+            algae_detected, confidence, _ = self.ml_model.detect_tiled(image)
+            return algae_detected, confidence
+        
+        return self.ml_model.detect(image)
+    
+    def discard_stale_scans(self):
+        """Drop pipelined scans captured before a long action"""
+        if self.pipeline:
+            self.pipeline.flush()
+        
+        # The robot moved or collected, never reuse the old result
+        if self.frame_gate:
+            self.frame_gate.reset()
+    
     def handle_algae_detection(self, confidence, sensor_data):
         """
         Handle algae detection event
@@ -202,16 +305,15 @@ class AMLACRobot:
         time.sleep(1)
         self.lcd.show_collecting()
         
-        # Activate collection mechanism
+        # Activate collection mechanism; the conveyor runs in the
+        # background and scanning continues while it collects
         print("Activating collection mechanism...")
-        self.motors.activate_conveyor()
-        time.sleep(config.COLLECTION_DURATION)
-        self.motors.stop_conveyor()
+        self.motors.start_conveyor(hold=config.COLLECTION_DURATION)
         
         # Increment collection count
         self.collection_count += 1
         
-        print(f"✓ Collection complete! Total collected: {self.collection_count}\n")
+        print(f"✓ Collection started! Total collected: {self.collection_count}\n")
         
         # Log detection to CSV
         self.logger.log_detection(
@@ -227,6 +329,8 @@ class AMLACRobot:
         
         # Reset LCD rotator
         self.lcd_rotator.reset()
+        
+        self.discard_stale_scans()
     
     def handle_bin_full(self):
         """Handle bin full condition"""
@@ -235,10 +339,12 @@ class AMLACRobot:
         self.motors.stop_all()
         
         # Log event
-        self.logger.log_event('WARNING', 'Collection bin full')
+        self.logger.log_event('WARNING', 'Collection bin full', code='BIN_FULL')
         
         # Wait for user intervention
         time.sleep(10)
+        
+        self.discard_stale_scans()
     
     def handle_obstacle(self, distance):
         """
@@ -253,13 +359,12 @@ class AMLACRobot:
         # Stop motors
         self.motors.stop()
         
-        # Simple obstacle avoidance (can be improved)
-        # Turn right for 2 seconds
-        self.motors.turn_right(speed=30)
-        time.sleep(2)
-        self.motors.stop()
+        # Simple obstacle avoidance (can be improved): turn right, then
+        # settle. The maneuver runs in the background while scanning continues
+        self.motors.turn_by(config.OBSTACLE_TURN_ANGLE, speed=config.OBSTACLE_TURN_SPEED)
+        self.motors.pause(1)
         
-        time.sleep(1)
+        self.discard_stale_scans()
     
     def print_status(self, sensor_data):
         """
@@ -274,7 +379,8 @@ class AMLACRobot:
         print(f"Status Update - Runtime: {runtime}")
         print("-" * 50)
         print(f"Collections: {self.collection_count}")
-        print(f"Weight: {sensor_data['weight']:.2f} kg")
+        settling = '' if sensor_data.get('weight_stable', True) else ' (settling)'
+        print(f"Weight: {sensor_data['weight']:.2f} kg{settling}")
         print(f"GPS: {sensor_data['gps_lat']}, {sensor_data['gps_lon']}")
         print(f"Distance: {sensor_data['distance']} cm")
         print(f"Orientation: {sensor_data['orientation']}")
@@ -288,14 +394,24 @@ class AMLACRobot:
         
         self.running = False
         
+        # Stop scan pipeline before releasing the devices it uses
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline.print_report()
+        
+        if self.frame_gate:
+            self.frame_gate.print_stats()
+        
         # Log shutdown
-        self.logger.log_event('INFO', f'Robot stopped - Total collections: {self.collection_count}')
+        self.logger.log_event('INFO', f'Robot stopped - Total collections: {self.collection_count}',
+                              code='ROBOT_STOP')
         
         # Print final statistics
         print(f"\nFinal Statistics:")
         print(f"  Total collections: {self.collection_count}")
         print(f"  Runtime: {datetime.now() - self.start_time}")
         self.logger.print_statistics()
+        self.logger.close()
         
         # Stop all motors
         print("Stopping motors...")
@@ -3,10 +3,19 @@ ML Inference Module for AMLAC Robot
 Handles TensorFlow Lite model loading and inference for algae detection
 """
 
+import os
 import numpy as np
-from PIL import Image
-import tflite_runtime.interpreter as tflite
+try:
+    import tflite_runtime.interpreter as tflite
+except ImportError:
+    # LiteRT is the renamed tflite_runtime (same Interpreter API), the only
+    # package published for newer Python versions
+    from ai_edge_litert import interpreter as tflite
 import config
+from preprocessing import FramePreprocessor, PREPROCESS_MODES, pil_preprocess
+from model_tuning import load_tuning, save_tuning, file_sha256
+from model_metadata import (load_model_metadata, default_metadata,
+                            positive_class_score_fn, class_scores)
 
 class MLInference:
     """
@@ -14,80 +23,303 @@ class MLInference:
     Uses TensorFlow Lite model trained on Teachable Machine
     """
     
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, preprocess_mode=None, zero_copy=None,
+                 num_threads=None, use_xnnpack=None):
         """
         Initialize ML model
         
         Args:
             model_path (str): Path to TFLite model file
+            preprocess_mode (str): 'pil', 'nearest', 'bilinear', 'area' or 'auto'
+                                   (default from config; 'auto' uses the model
+                                   metadata recommendation)
+            zero_copy (bool): Preprocess straight into the interpreter's input
+                              tensor and read outputs as views (default from config)
+            num_threads (int): Interpreter threads (default: autotuned, then config)
+            use_xnnpack (bool): Use the XNNPACK delegate (default: autotuned, then config)
         """
         if model_path is None:
             model_path = config.MODEL_PATH
+        if preprocess_mode is None:
+            preprocess_mode = config.PREPROCESS_MODE
+        if zero_copy is None:
+            zero_copy = config.ML_ZERO_COPY
         
         print(f"Loading ML model from {model_path}...")
         
+        # Sidecar written by train_model.py: class order, activation,
+        # normalization and thresholds, so nothing is guessed at runtime
+        # The model is hashed once; the sidecar and the tuning file are both
+        # keyed on it
+        model_exists = os.path.isfile(model_path)
+        self.model_sha256 = file_sha256(model_path) if model_exists else None
+        self.metadata = load_model_metadata(model_path, self.model_sha256) if model_exists else None
+        
+        if preprocess_mode == 'auto':
+            preprocess_mode = 'area'
+            if self.metadata:
+                preprocess_mode = self.metadata.get('recommended_preprocess', preprocess_mode)
+        
+        self.model_path = model_path
+        self.preprocess_mode = preprocess_mode
+        self.zero_copy = zero_copy
+        self._preprocessors = {}  # (height, width, mode) -> FramePreprocessor
+        
+        self.confidence_threshold = config.CONFIDENCE_THRESHOLD
+        if self.metadata:
+            self.confidence_threshold = self.metadata.get(
+                'confidence_threshold', self.confidence_threshold
+            )
+        
+        # Interpreter settings: explicit arguments, then the autotune result
+        # saved next to the model, then config defaults
+        tuning = load_tuning(model_path, self.model_sha256) if model_exists else None
+        if num_threads is None:
+            num_threads = tuning['num_threads'] if tuning else config.ML_NUM_THREADS
+        if use_xnnpack is None:
+            use_xnnpack = tuning['use_xnnpack'] if tuning else config.ML_USE_XNNPACK
+        
         try:
             # Load TFLite model
-            self.interpreter = tflite.Interpreter(model_path=model_path)
-            self.interpreter.allocate_tensors()
+            self._load_interpreter(num_threads, use_xnnpack)
             
-            # Get input and output details
-            self.input_details = self.interpreter.get_input_details()
-            self.output_details = self.interpreter.get_output_details()
-            
-            # Get input shape
-            self.input_shape = self.input_details[0]['shape']
-            self.input_height = self.input_shape[1]
-            self.input_width = self.input_shape[2]
+            # Class order and activation: from the sidecar, else the layout
+            # train_model.py / Teachable Machine produce for this output size
+            self.output_layout = self.metadata or default_metadata(
+                int(self.output_details[0]['shape'][-1])
+            )
+            self.class_names = self.output_layout['class_names']
+            self._algae_score = positive_class_score_fn(self.output_layout)
             
             print(f"✓ Model loaded successfully")
             print(f"  Input shape: {self.input_shape}")
             print(f"  Input size: {self.input_width}x{self.input_height}")
-            print(f"  Output shape: {self.output_details[0]['shape']}\n")
+            print(f"  Output shape: {self.output_details[0]['shape']}")
+            print(f"  Input type: {self.input_dtype.name}"
+                  f"{' (quantized)' if self.input_quantized else ''}")
+            print(f"  Threads: {self.num_threads}, XNNPACK: {'on' if self.use_xnnpack else 'off'}"
+                  f"{' (autotuned)' if tuning else ' (not tuned: python3 ml_inference.py --autotune)'}")
+            print(f"  Preprocessing: {self.preprocess_mode}")
+            print(f"  Zero-copy tensors: {'on' if self.zero_copy else 'off'}")
+            if self.metadata:
+                print(f"  Metadata: classes {self.class_names}, "
+                      f"{self.metadata['output_activation']} output, "
+                      f"threshold {self.confidence_threshold}\n")
+            else:
+                print(f"  Metadata: none, assuming classes {self.class_names}, "
+                      f"{self.output_layout['output_activation']} output\n")
             
             self.model_loaded = True
             
         except Exception as e:
             print(f"⚠ Error loading model: {e}")
             self.model_loaded = False
+        
+        # Optional: tune at boot when this model file has no tuning yet
+        # (ML_AUTOTUNE_ON_STARTUP; slow, normally run via --autotune instead)
+        if self.model_loaded and tuning is None and config.ML_AUTOTUNE_ON_STARTUP:
+            self.autotune()
+    
+    def _load_interpreter(self, num_threads, use_xnnpack):
+        """
+        Create the TFLite interpreter and cache tensor details
+        
+        Args:
+            num_threads (int): Number of interpreter threads
+            use_xnnpack (bool): False disables TFLite's default XNNPACK delegate
+        """
+        if use_xnnpack:
+            op_resolver = tflite.OpResolverType.AUTO
+        else:
+            op_resolver = tflite.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        
+        self.interpreter = tflite.Interpreter(
+            model_path=self.model_path,
+            num_threads=num_threads,
+            experimental_op_resolver_type=op_resolver
+        )
+        self.interpreter.allocate_tensors()
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
+        
+        # Get input and output details
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        
+        # Get input shape
+        self.input_shape = self.input_details[0]['shape']
+        self.input_height = self.input_shape[1]
+        self.input_width = self.input_shape[2]
+        
+        # Normalization the model was trained with (Teachable Machine and
+        # train_model.py use [0, 1]; the metadata sidecar says so explicitly)
+        norm_scale, norm_offset = 1.0 / 255.0, 0.0
+        if self.metadata:
+            norm_scale = self.metadata['normalization']['scale']
+            norm_offset = self.metadata['normalization']['offset']
+        
+        # Input type: float32 models take normalized pixels, full-integer
+        # quantized models (train_model.py --int8) take uint8/int8
+        self.input_dtype = np.dtype(self.input_details[0]['dtype'])
+        self.input_quantized = np.issubdtype(self.input_dtype, np.integer)
+        self._pixel_scale = norm_scale
+        self._pixel_offset = norm_offset
+        if self.input_quantized:
+            # Real input x = pixel * norm_scale + norm_offset is stored as
+            # x / scale + zero_point
+            in_scale, in_zero_point = self.input_details[0]['quantization']
+            self._pixel_scale = norm_scale / in_scale
+            self._pixel_offset = norm_offset / in_scale + float(in_zero_point)
+            if abs(self._pixel_scale - 1.0) < 1e-3 and abs(self._pixel_offset) < 1e-3:
+                # uint8 frames are fed unchanged
+                self._pixel_scale = 1.0
+                self._pixel_offset = 0.0
+        
+        # Quantized outputs are converted back to probabilities
+        self._output_quantization = None
+        if np.issubdtype(np.dtype(self.output_details[0]['dtype']), np.integer):
+            out_scale, out_zero_point = self.output_details[0]['quantization']
+            if out_scale:
+                self._output_quantization = (out_scale, out_zero_point)
+        
+        # Reused batch buffer for vectorized preprocessing
+        self._input_buffer = np.empty(
+            (1, self.input_height, self.input_width, 3), dtype=self.input_dtype
+        )
+        
+        # Accessors returning numpy views onto the interpreter's own
+        # tensor memory. Call them per frame and never keep the returned
+        # view across invoke(); TFLite refuses to run while one is held.
+        self._input_tensor = self.interpreter.tensor(self.input_details[0]['index'])
+        self._output_tensor = self.interpreter.tensor(self.output_details[0]['index'])
+    
+    def _get_preprocessor(self, height, width, mode):
+        """
+        Get (or build once) the vectorized preprocessor for a frame size
+        
+        Args:
+            height (int): Frame height
+            width (int): Frame width
+            mode (str): Resampling mode
+        
+        Returns:
+            FramePreprocessor: Preprocessor with precomputed resampling tables
+        """
+        key = (height, width, mode)
+        preprocessor = self._preprocessors.get(key)
+        if preprocessor is None:
+            preprocessor = FramePreprocessor(
+                height, width, self.input_height, self.input_width, mode=mode,
+                scale=self._pixel_scale, offset=self._pixel_offset,
+                out_dtype=self.input_dtype
+            )
+            self._preprocessors[key] = preprocessor
+        return preprocessor
     
-    def preprocess_image(self, image_array):
+    def preprocess_image(self, image_array, mode=None):
         """
         Preprocess image for model input
         
         Args:
             image_array (numpy.ndarray): Raw image from camera
+            mode (str): Override preprocessing mode for this call
             
         Returns:
-            numpy.ndarray: Preprocessed image ready for inference
-        """
-        # Convert to PIL Image if needed
-        if isinstance(image_array, np.ndarray):
-            # Handle different image formats (RGB, RGBA, BGR)
-            if len(image_array.shape) == 3:
-                if image_array.shape[2] == 4:  # RGBA
-                    image_array = image_array[:, :, :3]  # Remove alpha channel
-                elif image_array.shape[2] == 3:  # RGB or BGR
-                    pass  # Already in correct format
+            numpy.ndarray: Preprocessed image ready for inference. Vectorized
+                           modes return a buffer that is reused by the next call.
+        """
+        self._preprocess_into(image_array, self._input_buffer[0], mode)
+        return self._input_buffer
+    
+    def _preprocess_into(self, image_array, out, mode=None):
+        """
+        Preprocess image, writing the result into an existing buffer
+        
+        Args:
+            image_array (numpy.ndarray): Raw image from camera
+            out (numpy.ndarray): (height, width, 3) destination, e.g. a view
+                                 of the interpreter input tensor
+            mode (str): Override preprocessing mode for this call
+        """
+        if mode is None:
+            mode = self.preprocess_mode
+        
+        # Vectorized path: resize + normalize straight from the uint8 frame
+        # (Teachable Machine uses [0, 1] input; quantized models take pixels)
+        if (mode in PREPROCESS_MODES and isinstance(image_array, np.ndarray)
+                and image_array.dtype == np.uint8 and image_array.ndim == 3):
+            preprocessor = self._get_preprocessor(
+                image_array.shape[0], image_array.shape[1], mode
+            )
+            preprocessor(image_array, out=out)
+            return
+        
+        # PIL path: LANCZOS resize to [0, 1], then the model's normalization
+        image = pil_preprocess(image_array, self.input_width, self.input_height)
+        image = image * (255.0 * self._pixel_scale) + self._pixel_offset
+        
+        if self.input_quantized:
+            info = np.iinfo(self.input_dtype)
+            image = np.clip(np.rint(image), info.min, info.max)
+        
+        out[...] = image
+    
+    def _dequantize(self, predictions):
+        """
+        Convert quantized output scores to probabilities
+        
+        Args:
+            predictions (numpy.ndarray): Raw output scores
+        
+        Returns:
+            numpy.ndarray: float scores (unchanged for float models)
+        """
+        if self._output_quantization is None:
+            return predictions
+        
+        scale, zero_point = self._output_quantization
+        return (predictions.astype(np.float32) - zero_point) * scale
+    
+    def _run_inference(self, image_array):
+        """
+        Preprocess an image and invoke the interpreter
+        
+        Args:
+            image_array (numpy.ndarray): Image from camera
+        
+        Returns:
+            numpy.ndarray: Output scores for the first batch item. In zero-copy
+                           mode this is a view of interpreter memory that must be
+                           consumed before the next inference.
+        """
+        if self.zero_copy:
+            # Write preprocessed pixels straight into the input tensor
+            input_view = self._input_tensor()
+            self._preprocess_into(image_array, input_view[0])
+            del input_view  # Release before invoke()
             
-            image = Image.fromarray(image_array.astype('uint8'), 'RGB')
-        else:
-            image = image_array
+            self.interpreter.invoke()
+            
+            return self._dequantize(self._output_tensor()[0])
         
-        # Resize to model input size (usually 224x224 for Teachable Machine)
-        image = image.resize((self.input_width, self.input_height), Image.LANCZOS)
+        # Preprocess image
+        processed_image = self.preprocess_image(image_array)
         
-        # Convert to numpy array
-        image_array = np.array(image, dtype=np.float32)
+        # Set input tensor
+        self.interpreter.set_tensor(
+            self.input_details[0]['index'],
+            processed_image
+        )
         
-        # Normalize pixel values to [0, 1] or [-1, 1] depending on model
-        # Teachable Machine typically uses [0, 1] normalization
-        image_array = image_array / 255.0
+        # Run inference
+        self.interpreter.invoke()
         
-        # Add batch dimension
-        image_array = np.expand_dims(image_array, axis=0)
+        # Get output tensor
+        output_data = self.interpreter.get_tensor(
+            self.output_details[0]['index']
+        )
         
-        return image_array
+        return self._dequantize(output_data[0])
     
     def detect(self, image_array):
         """
@@ -104,36 +336,14 @@ class MLInference:
             return (False, 0.0)
         
         try:
-            # Preprocess image
-            processed_image = self.preprocess_image(image_array)
-            
-            # Set input tensor
-            self.interpreter.set_tensor(
-                self.input_details[0]['index'],
-                processed_image
-            )
+            predictions = self._run_inference(image_array)
             
-            # Run inference
-            self.interpreter.invoke()
-            
-            # Get output tensor
-            output_data = self.interpreter.get_tensor(
-                self.output_details[0]['index']
-            )
-            
-            # Get predictions (assuming binary classification: algae vs no algae)
-            # For Teachable Machine, output is typically [no_algae_prob, algae_prob]
-            predictions = output_data[0]
-            
-            # Get algae confidence (assuming class 1 is algae)
-            # Adjust index based on your model's class order
-            if len(predictions) >= 2:
-                algae_confidence = float(predictions[1])  # Class 1: Algae
-            else:
-                algae_confidence = float(predictions[0])
+            # Get algae confidence (class order and activation come from
+            # the model metadata when available)
+            algae_confidence = self._algae_score(predictions)
             
             # Determine if algae is detected based on threshold
-            is_algae_detected = algae_confidence > config.CONFIDENCE_THRESHOLD
+            is_algae_detected = algae_confidence > self.confidence_threshold
             
             return (is_algae_detected, algae_confidence)
             
@@ -141,6 +351,76 @@ class MLInference:
             print(f"Error during inference: {e}")
             return (False, 0.0)
     
+    def tile_grid(self, frame_height, frame_width, tile_size=None, overlap=None):
+        """
+        Compute overlapping tile positions covering a frame
+        
+        Args:
+            frame_height (int): Frame height
+            frame_width (int): Frame width
+            tile_size (int): Tile size in pixels (default: config, else model input size)
+            overlap (float): Minimum overlap between neighbouring tiles (default from config)
+        
+        Returns:
+            tuple: (row_starts, col_starts, tile_height, tile_width)
+        """
+        if tile_size is None:
+            tile_size = config.ML_TILE_SIZE
+        if overlap is None:
+            overlap = config.ML_TILE_OVERLAP
+        
+        tile_height = min(tile_size or self.input_height, frame_height)
+        tile_width = min(tile_size or self.input_width, frame_width)
+        
+        def starts(length, tile):
+            # Evenly spread tiles so the first and last touch the frame edges
+            stride = max(int(tile * (1.0 - overlap)), 1)
+            count = int(np.ceil((length - tile) / stride)) + 1
+            return [int(round(x)) for x in np.linspace(0, length - tile, count)]
+        
+        return (starts(frame_height, tile_height), starts(frame_width, tile_width),
+                tile_height, tile_width)
+    
+    def detect_tiled(self, image_array, tile_size=None, overlap=None):
+        """
+        Detect algae on overlapping tiles of the full-resolution frame
+        Small patches near the frame edges are not averaged away by the
+        downscale. Tiles run one by one through detect()'s interpreter: a
+        separate batched interpreter was no faster on the shipped model, as
+        the convolutions dominate and batching only saves per-invoke overhead.
+        
+        Args:
+            image_array (numpy.ndarray): Image from camera
+            tile_size (int): Tile size in pixels (default: config, else model input size)
+            overlap (float): Minimum overlap between neighbouring tiles (default from config)
+        
+        Returns:
+            tuple: (is_algae_detected: bool, max_confidence: float,
+                    heatmap: numpy.ndarray of per-tile confidences (rows, cols))
+        """
+        if not self.model_loaded:
+            print("Model not loaded, cannot perform inference")
+            return (False, 0.0, np.zeros((0, 0), dtype=np.float32))
+        
+        try:
+            image_array = np.asarray(image_array)[:, :, :3]
+            row_starts, col_starts, tile_height, tile_width = self.tile_grid(
+                image_array.shape[0], image_array.shape[1], tile_size, overlap
+            )
+            
+            heatmap = np.empty((len(row_starts), len(col_starts)), dtype=np.float32)
+            for i, y in enumerate(row_starts):
+                for j, x in enumerate(col_starts):
+                    tile = image_array[y:y + tile_height, x:x + tile_width]
+                    heatmap[i, j] = self._algae_score(self._run_inference(tile))
+            max_confidence = float(heatmap.max())
+            
+            return (max_confidence > self.confidence_threshold, max_confidence, heatmap)
+        
+        except Exception as e:
+            print(f"Error during tiled inference: {e}")
+            return (False, 0.0, np.zeros((0, 0), dtype=np.float32))
+    
     def get_detailed_predictions(self, image_array):
         """
         Get detailed prediction scores for all classes
@@ -155,44 +435,21 @@ class MLInference:
             return {}
         
         try:
-            # Preprocess image
-            processed_image = self.preprocess_image(image_array)
-            
-            # Set input tensor
-            self.interpreter.set_tensor(
-                self.input_details[0]['index'],
-                processed_image
-            )
-            
-            # Run inference
-            self.interpreter.invoke()
-            
-            # Get output tensor
-            output_data = self.interpreter.get_tensor(
-                self.output_details[0]['index']
-            )
-            
-            predictions = output_data[0]
-            
-            # Return predictions for each class
-            # Adjust class names based on your Teachable Machine model
-            result = {
-                'no_algae': float(predictions[0]) if len(predictions) > 0 else 0.0,
-                'algae': float(predictions[1]) if len(predictions) > 1 else 0.0
-            }
+            predictions = self._run_inference(image_array)
             
-            return result
+            return class_scores(self.output_layout, predictions)
             
         except Exception as e:
             print(f"Error getting detailed predictions: {e}")
             return {}
     
-    def benchmark(self, num_runs=10):
+    def benchmark(self, num_runs=10, verbose=True):
         """
         Benchmark inference speed
         
         Args:
             num_runs (int): Number of inference runs to average
+            verbose (bool): Print every run
             
         Returns:
             float: Average inference time in milliseconds
@@ -212,7 +469,8 @@ class MLInference:
         
         times = []
         
-        print(f"Running {num_runs} inference benchmarks...")
+        if verbose:
+            print(f"Running {num_runs} inference benchmarks...")
         
         for i in range(num_runs):
             start_time = time.time()
@@ -221,18 +479,219 @@ class MLInference:
             
             inference_time = (end_time - start_time) * 1000  # Convert to ms
             times.append(inference_time)
-            print(f"  Run {i+1}: {inference_time:.2f} ms")
+            if verbose:
+                print(f"  Run {i+1}: {inference_time:.2f} ms")
         
         avg_time = sum(times) / len(times)
-        print(f"\nAverage inference time: {avg_time:.2f} ms")
+        if verbose:
+            print(f"\nAverage inference time: {avg_time:.2f} ms")
         
         return avg_time
+    
+    def autotune(self, thread_counts=None, try_xnnpack=None, num_runs=None, save=True):
+        """
+        Find the fastest interpreter settings for this model on this machine
+        Benchmarks every thread count (and XNNPACK on/off), keeps the best
+        setting loaded and saves it next to the model for the next boot.
+        
+        Args:
+            thread_counts (list): Thread counts to try (default from config)
+            try_xnnpack (bool): Also try with XNNPACK disabled (default from config)
+            num_runs (int): Benchmark runs per setting (default from config)
+            save (bool): Write the tuning file
+        
+        Returns:
+            dict: Best setting {'num_threads', 'use_xnnpack', 'mean_ms'} or None
+        """
+        if not self.model_loaded:
+            print("Model not loaded")
+            return None
+        
+        if thread_counts is None:
+            thread_counts = config.ML_AUTOTUNE_THREADS
+        if try_xnnpack is None:
+            try_xnnpack = config.ML_AUTOTUNE_XNNPACK
+        if num_runs is None:
+            num_runs = config.ML_AUTOTUNE_RUNS
+        
+        xnnpack_options = (True, False) if try_xnnpack else (self.use_xnnpack,)
+        original = (self.num_threads, self.use_xnnpack)
+        warmup_image = np.zeros((self.input_height, self.input_width, 3), dtype=np.uint8)
+        results = []
+        
+        print(f"Autotuning interpreter ({num_runs} runs per setting)...")
+        
+        for use_xnnpack in xnnpack_options:
+            for num_threads in thread_counts:
+                try:
+                    self._load_interpreter(num_threads, use_xnnpack)
+                except Exception as e:
+                    print(f"  threads={num_threads} xnnpack={use_xnnpack}: failed - {e}")
+                    continue
+                
+                # First invokes include delegate setup and cache warm-up
+                self.detect(warmup_image)
+                self.detect(warmup_image)
+                
+                mean_ms = self.benchmark(num_runs, verbose=False)
+                results.append({
+                    'num_threads': num_threads,
+                    'use_xnnpack': use_xnnpack,
+                    'mean_ms': mean_ms
+                })
+                print(f"  threads={num_threads} xnnpack={'on' if use_xnnpack else 'off'}: "
+                      f"{mean_ms:.2f} ms")
+        
+        if not results:
+            self._load_interpreter(*original)
+            return None
+        
+        best = min(results, key=lambda r: r['mean_ms'])
+        self._load_interpreter(best['num_threads'], best['use_xnnpack'])
+        print(f"✓ Best: threads={best['num_threads']} "
+              f"xnnpack={'on' if best['use_xnnpack'] else 'off'} ({best['mean_ms']:.2f} ms)")
+        
+        if save:
+            save_tuning(self.model_path, best, results, self.model_sha256)
+        
+        return best
+    
+    def benchmark_zero_copy(self, num_runs=10):
+        """
+        Compare set_tensor/get_tensor copies against zero-copy tensor views
+        
+        Args:
+            num_runs (int): Number of inference runs per setting
+        
+        Returns:
+            dict: {'copy': avg_ms, 'zero_copy': avg_ms}
+        """
+        original = self.zero_copy
+        results = {}
+        
+        try:
+            for label, enabled in (('copy', False), ('zero_copy', True)):
+                print(f"\n--- {label} ---")
+                self.zero_copy = enabled
+                self.detect(np.zeros((self.input_height, self.input_width, 3), dtype=np.uint8))  # Warm up
+                results[label] = self.benchmark(num_runs)
+        finally:
+            self.zero_copy = original
+        
+        if results.get('copy'):
+            saved = results['copy'] - results['zero_copy']
+            print(f"\nZero-copy saves {saved:.2f} ms per frame "
+                  f"({saved / results['copy']:.1%})")
+        
+        return results
+    
+    def benchmark_tiled(self, frame_height=480, frame_width=640, num_runs=10):
+        """
+        Time tiled detection against a single downscaled detect()
+        
+        Args:
+            frame_height (int): Camera frame height
+            frame_width (int): Camera frame width
+            num_runs (int): Frames per method
+        
+        Returns:
+            dict: {'tiles': int, 'tiled_ms': float, 'single_ms': float}
+        """
+        if not self.model_loaded:
+            print("Model not loaded")
+            return {}
+        
+        import time
+        
+        frame = np.random.randint(0, 255, (frame_height, frame_width, 3), dtype=np.uint8)
+        row_starts, col_starts, tile_height, tile_width = self.tile_grid(frame_height, frame_width)
+        tiles = len(row_starts) * len(col_starts)
+        
+        # Warm up the preprocessors for both frame sizes
+        self.detect_tiled(frame)
+        self.detect(frame)
+        
+        start_time = time.time()
+        for _ in range(num_runs):
+            self.detect_tiled(frame)
+        tiled_ms = (time.time() - start_time) * 1000 / num_runs
+        
+        start_time = time.time()
+        for _ in range(num_runs):
+            self.detect(frame)
+        single_ms = (time.time() - start_time) * 1000 / num_runs
+        
+        print(f"Tiled detection: {tiles} tiles of {tile_width}x{tile_height} "
+              f"({len(row_starts)}x{len(col_starts)} grid), {num_runs} frames")
+        print(f"  Tiled:          {tiled_ms:8.2f} ms/frame ({tiled_ms / tiles:.2f} ms/tile)")
+        print(f"  Single detect:  {single_ms:8.2f} ms/frame")
+        
+        return {
+            'tiles': tiles,
+            'tiled_ms': tiled_ms,
+            'single_ms': single_ms
+        }
+    
+    def compare_preprocessing(self, images, tolerance=None):
+        """
+        Check that vectorized preprocessing modes give the same predictions
+        as the PIL path (within a tolerance) and time each mode
+        
+        Args:
+            images (list): Camera frames (uint8 numpy arrays)
+            tolerance (float): Max allowed algae confidence difference
+                               (default from config)
+        
+        Returns:
+            dict: mode -> {'max_diff': float, 'mean_ms': float, 'within_tolerance': bool}
+        """
+        if not self.model_loaded:
+            print("Model not loaded")
+            return {}
+        
+        if tolerance is None:
+            tolerance = config.PREPROCESS_TOLERANCE
+        
+        import time
+        
+        original_mode = self.preprocess_mode
+        results = {}
+        reference = None
+        
+        try:
+            for mode in ('pil',) + PREPROCESS_MODES:
+                self.preprocess_mode = mode
+                confidences = []
+                start_time = time.time()
+                for image in images:
+                    confidences.append(self.detect(image)[1])
+                mean_ms = (time.time() - start_time) * 1000 / max(len(images), 1)
+                
+                if reference is None:
+                    reference = confidences
+                max_diff = max(
+                    (abs(a - b) for a, b in zip(confidences, reference)), default=0.0
+                )
+                results[mode] = {
+                    'max_diff': max_diff,
+                    'mean_ms': mean_ms,
+                    'within_tolerance': max_diff <= tolerance
+                }
+                status = "✓" if max_diff <= tolerance else "⚠"
+                print(f"  {status} {mode:<9} {mean_ms:8.2f} ms/frame  "
+                      f"max confidence diff vs PIL: {max_diff:.4f}")
+        finally:
+            self.preprocess_mode = original_mode
+        
+        return results
 
 
 if __name__ == "__main__":
     """Test ML inference"""
     print("=== AMLAC ML Inference Test ===\n")
     
+    import sys
+    
     try:
         # Initialize ML model
         ml_model = MLInference()
@@ -241,6 +700,16 @@ if __name__ == "__main__":
             print("Failed to load model. Please check model path.")
             exit(1)
         
+        # Offline tuning: python ml_inference.py --autotune
+        if '--autotune' in sys.argv:
+            print("\n--- Autotuning interpreter settings ---")
+            ml_model.autotune()
+        
+        # Tiled vs single-frame detection: python ml_inference.py --tiled
+        if '--tiled' in sys.argv:
+            print("\n--- Benchmarking tiled detection ---")
+            ml_model.benchmark_tiled()
+        
         # Benchmark inference speed
         print("\n--- Benchmarking inference speed ---")
         avg_time = ml_model.benchmark(num_runs=10)
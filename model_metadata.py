@@ -0,0 +1,157 @@
+"""
+Model Metadata Module for AMLAC Robot
+Sidecar JSON written by train_model.py next to each .tflite model, so the
+robot knows the class order, output activation, normalization and
+quantization of the model instead of guessing at runtime
+"""
+
+import json
+import os
+from model_tuning import file_sha256
+
+METADATA_FORMAT_VERSION = 1
+
+
+def metadata_path_for(model_path):
+    """
+    Get the metadata sidecar path for a model
+    
+    Args:
+        model_path (str): Path to .tflite model
+    
+    Returns:
+        str: e.g. models/model.tflite -> models/model.meta.json
+    """
+    return os.path.splitext(model_path)[0] + '.meta.json'
+
+
+def save_model_metadata(model_path, metadata):
+    """
+    Write the metadata sidecar for a model
+    The model's SHA-256 is added so a stale sidecar is detected on load.
+    
+    Args:
+        model_path (str): Path to .tflite model
+        metadata (dict): Metadata fields
+    
+    Returns:
+        str: Path of the sidecar file
+    """
+    metadata = dict(metadata)
+    metadata['format_version'] = METADATA_FORMAT_VERSION
+    metadata['model_file'] = os.path.basename(model_path)
+    metadata['model_sha256'] = file_sha256(model_path)
+    
+    path = metadata_path_for(model_path)
+    with open(path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    
+    return path
+
+
+def load_model_metadata(model_path, model_sha256=None):
+    """
+    Load the metadata sidecar for a model
+    
+    Args:
+        model_path (str): Path to .tflite model
+        model_sha256 (str): Model hash if already computed (default: hash the file)
+    
+    Returns:
+        dict: Metadata, or None if missing, unreadable or for another model file
+    """
+    path = metadata_path_for(model_path)
+    if not os.path.isfile(path):
+        return None
+    
+    try:
+        with open(path, 'r') as f:
+            metadata = json.load(f)
+    except Exception as e:
+        print(f"⚠ Error reading model metadata {path}: {e}")
+        return None
+    
+    if metadata.get('format_version') != METADATA_FORMAT_VERSION:
+        print(f"⚠ Ignoring {path}: unsupported format version")
+        return None
+    
+    if model_sha256 is None:
+        model_sha256 = file_sha256(model_path)
+    if metadata.get('model_sha256') != model_sha256:
+        print(f"⚠ Ignoring {path}: written for a different model file")
+        return None
+    
+    return metadata
+
+
+def default_metadata(output_units):
+    """
+    Output layout assumed for a model without a metadata sidecar
+    
+    A single unit is train_model.py's sigmoid over the alphabetically ordered
+    classes (algae=0, no_algae=1), i.e. P(no_algae), as in
+    test_model_windows.py. Two or more units are a Teachable Machine softmax
+    with algae as class 1.
+    
+    Args:
+        output_units (int): Size of the model's last output dimension
+    
+    Returns:
+        dict: class_names, positive_class, output_activation and output_units
+    """
+    if output_units == 1:
+        return {
+            'class_names': ['algae', 'no_algae'],
+            'positive_class': 'algae',
+            'output_activation': 'sigmoid',
+            'output_units': 1
+        }
+    return {
+        'class_names': ['no_algae', 'algae'],
+        'positive_class': 'algae',
+        'output_activation': 'softmax',
+        'output_units': output_units
+    }
+
+
+def positive_class_score_fn(metadata):
+    """
+    Build a function that extracts the positive-class probability from the
+    raw output vector, using the class order and activation in the metadata
+    
+    Args:
+        metadata (dict): Model metadata
+    
+    Returns:
+        callable: predictions (numpy.ndarray) -> float
+    """
+    class_names = metadata['class_names']
+    positive_index = class_names.index(metadata['positive_class'])
+    
+    if metadata['output_activation'] == 'sigmoid' and metadata.get('output_units', 1) == 1:
+        # Single sigmoid unit = probability of class index 1
+        if positive_index == 1:
+            return lambda predictions: float(predictions[0])
+        return lambda predictions: 1.0 - float(predictions[0])
+    
+    return lambda predictions: float(predictions[positive_index])
+
+
+def class_scores(metadata, predictions):
+    """
+    Get the probability of every class
+    
+    Args:
+        metadata (dict): Model metadata
+        predictions (numpy.ndarray): Raw output vector (dequantized)
+    
+    Returns:
+        dict: class name -> probability
+    """
+    class_names = metadata['class_names']
+    
+    if metadata['output_activation'] == 'sigmoid' and metadata.get('output_units', 1) == 1:
+        p = float(predictions[0])
+        return {class_names[0]: 1.0 - p, class_names[1]: p}
+    
+    return {name: float(predictions[i]) for i, name in enumerate(class_names)}
@@ -0,0 +1,117 @@
+"""
+Model Tuning Module for AMLAC Robot
+Persists the fastest interpreter settings (threads, XNNPACK) found by
+MLInference.autotune() in a JSON file next to the model
+"""
+
+import hashlib
+import json
+import os
+import platform
+from datetime import datetime
+
+
+def tuning_path_for(model_path):
+    """
+    Get the tuning file path for a model
+    
+    Args:
+        model_path (str): Path to .tflite model
+    
+    Returns:
+        str: e.g. models/model.tflite -> models/model.tuning.json
+    """
+    return os.path.splitext(model_path)[0] + '.tuning.json'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Compute SHA-256 of a file
+    
+    Args:
+        path (str): File path
+        chunk_size (int): Bytes read per chunk
+    
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_tuning(model_path, model_sha256=None):
+    """
+    Load tuned interpreter settings for a model
+    
+    Settings are ignored if the model file changed since tuning or if they
+    were tuned on a different kind of machine.
+    
+    Args:
+        model_path (str): Path to .tflite model
+        model_sha256 (str): Model hash if already computed (default: hash the file)
+    
+    Returns:
+        dict: {'num_threads': int, 'use_xnnpack': bool, ...} or None
+    """
+    path = tuning_path_for(model_path)
+    if not os.path.isfile(path):
+        return None
+    
+    try:
+        with open(path, 'r') as f:
+            tuning = json.load(f)
+        
+        if model_sha256 is None:
+            model_sha256 = file_sha256(model_path)
+        if tuning.get('model_sha256') != model_sha256:
+            print(f"⚠ Ignoring {path}: model file changed since tuning")
+            return None
+        
+        if tuning.get('machine') != platform.machine() or tuning.get('cpu_count') != os.cpu_count():
+            print(f"⚠ Ignoring {path}: tuned on a different machine")
+            return None
+        
+        return tuning
+    
+    except Exception as e:
+        print(f"⚠ Error reading tuning file {path}: {e}")
+        return None
+
+
+def save_tuning(model_path, best, results, model_sha256=None):
+    """
+    Save tuned interpreter settings next to the model
+    
+    Args:
+        model_path (str): Path to .tflite model
+        best (dict): Winning settings ('num_threads', 'use_xnnpack', 'mean_ms')
+        results (list): All benchmarked settings
+        model_sha256 (str): Model hash if already computed (default: hash the file)
+    
+    Returns:
+        str: Path of the tuning file (None on error)
+    """
+    path = tuning_path_for(model_path)
+    tuning = {
+        'model_file': os.path.basename(model_path),
+        'model_sha256': model_sha256 or file_sha256(model_path),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'tuned_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'num_threads': best['num_threads'],
+        'use_xnnpack': best['use_xnnpack'],
+        'mean_ms': best['mean_ms'],
+        'results': results
+    }
+    
+    try:
+        with open(path, 'w') as f:
+            json.dump(tuning, f, indent=2)
+        print(f"✓ Tuning saved to {path}")
+        return path
+    except Exception as e:
+        print(f"⚠ Error saving tuning file {path}: {e}")
+        return None
@@ -1,11 +1,91 @@
 """
 Motor Controller Module for AMLAC Robot
 Controls L298N (paddle motors) and TB6600 (stepper motor)
+
+Pin and PWM writes go through a state cache: only pins whose level changes
+are written, and every change is recorded in an actuator timeline that can
+be saved and replayed on the bench. With PADDLE_RAMP_RATE set, paddle speed
+changes ramp smoothly instead of jumping.
+
+Timed maneuvers (drive for N seconds, turn by an angle, ramp to a speed) are
+queued and run by a background executor, so the main loop keeps scanning
+while the robot moves. A higher-priority command preempts the running one;
+stop_all() clears the queue and stops everything at once.
 """
 
+import collections
+import csv
+import threading
 import time
-import RPi.GPIO as GPIO
 import config
+from hardware import GPIO
+from stepper_driver import StepperDriver
+
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+
+class MotionCommand:
+    """
+    One queued motion primitive
+    """
+    
+    def __init__(self, kind, left=0, right=0, duration=None, angle=None,
+                 priority=PRIORITY_NORMAL):
+        """
+        Initialize command
+        
+        Args:
+            kind (str): 'drive', 'ramp' or 'turn'
+            left (int): Left paddle speed (-100 to 100); for turns, the turn speed
+            right (int): Right paddle speed (-100 to 100)
+            duration (float): Seconds to drive/ramp (drive: None = keep going)
+            angle (float): Degrees to turn, positive = right
+            priority (int): Higher priorities preempt the running command
+        """
+        self.kind = kind
+        self.left = left
+        self.right = right
+        self.duration = duration
+        self.angle = angle
+        self.priority = priority
+        self.status = 'queued'  # 'running', 'done' or 'preempted'
+        self.done = threading.Event()
+    
+    def wait(self, timeout=None):
+        """
+        Wait for the command to finish or be preempted
+        
+        Returns:
+            bool: True if it is no longer queued or running
+        """
+        return self.done.wait(timeout)
+    
+    def __str__(self):
+        if self.kind == 'turn':
+            return f"turn {abs(self.angle):g}° {'right' if self.angle > 0 else 'left'}"
+        if self.kind == 'ramp':
+            return f"ramp to {self.left}/{self.right} over {self.duration:g} s"
+        duration = f" for {self.duration:g} s" if self.duration is not None else ''
+        return f"drive {self.left}/{self.right}{duration}"
+
+
+def load_timeline(path):
+    """
+    Load an actuator timeline saved by MotorController.save_timeline
+    
+    Args:
+        path (str): CSV file
+    
+    Returns:
+        list: (time, actuator, value) entries
+    """
+    with open(path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [(float(t), name, float(value) if name.endswith('_PWM') else int(value))
+                for t, name, value in reader]
+
 
 class MotorController:
     """
@@ -14,8 +94,15 @@ class MotorController:
     - TB6600: Stepper motor for conveyor/actuator
     """
     
-    def __init__(self):
-        """Initialize all motor controllers"""
+    def __init__(self, yaw_rate_source=None):
+        """
+        Initialize all motor controllers
+        
+        Args:
+            yaw_rate_source (callable): Returns the yaw rate in degrees/s (or
+                                        None) for turns by angle; without
+                                        it turns are timed from TURN_RATE_DEG_S
+        """
         print("Initializing motors...")
         
         # Setup L298N Motor 1 (Left Paddle)
@@ -41,17 +128,101 @@ class MotorController:
         self.pwm_motor1.start(0)
         self.pwm_motor2.start(0)
         
+        # Actuator state cache: only changed pins/duty cycles are written
+        self._gpio_lock = threading.RLock()
+        self._pins = {
+            'MOTOR1_IN1': config.MOTOR1_IN1, 'MOTOR1_IN2': config.MOTOR1_IN2,
+            'MOTOR2_IN3': config.MOTOR2_IN3, 'MOTOR2_IN4': config.MOTOR2_IN4,
+            'STEPPER_ENA': config.STEPPER_ENA
+        }
+        self._pwms = {'MOTOR1_PWM': self.pwm_motor1, 'MOTOR2_PWM': self.pwm_motor2}
+        self._state = {'MOTOR1_PWM': 0, 'MOTOR2_PWM': 0}
+        self.timeline = collections.deque(maxlen=config.ACTUATOR_TIMELINE_SIZE)
+        self.gpio_writes = 0
+        self.gpio_writes_skipped = 0
+        
         # Disable stepper motor initially
-        GPIO.output(config.STEPPER_ENA, GPIO.HIGH)  # HIGH = disabled for TB6600
+        self._write('STEPPER_ENA', GPIO.HIGH)  # HIGH = disabled for TB6600
         
         # Initialize motor states
         self.motor1_speed = 0
         self.motor2_speed = 0
+        self.target_speeds = (0, 0)
         self.stepper_enabled = False
         
+        # Paddle speed ramping (runs on its own thread when enabled)
+        self.ramp_rate = config.PADDLE_RAMP_RATE
+        self._ramp_wake = threading.Event()
+        self._ramp_running = True
+        self._ramp_thread = None
+        if self.ramp_rate:
+            self._ramp_thread = threading.Thread(target=self._ramp_loop,
+                                                 name='paddle-ramp', daemon=True)
+            self._ramp_thread.start()
+        
+        # Stepper pulses are generated on their own thread
+        self.stepper = StepperDriver()
+        
+        # Motion queue, run by a background executor
+        self.yaw_rate_source = yaw_rate_source
+        self._motion_cond = threading.Condition()
+        self._motion_pending = []
+        self._motion_current = None
+        self._preempt = False
+        self._motion_running = True
+        self._motion_thread = threading.Thread(target=self._motion_loop,
+                                               name='motion', daemon=True)
+        self._motion_thread.start()
+        
         print("✓ Motors initialized\n")
     
-    def set_paddle_speed(self, left_speed, right_speed):
+    def _write(self, name, value, record=True):
+        """
+        Write a pin level or PWM duty cycle if it differs from the cached
+        state, and record the change
+        
+        Args:
+            name (str): Actuator name, e.g. 'MOTOR1_IN1' or 'MOTOR1_PWM'
+            value (int/float): Pin level or duty cycle (0-100)
+            record (bool): Add the change to the timeline
+        
+        Returns:
+            bool: True if the hardware was written
+        """
+        with self._gpio_lock:
+            if self._state.get(name) == value:
+                self.gpio_writes_skipped += 1
+                return False
+            
+            if name in self._pwms:
+                self._pwms[name].ChangeDutyCycle(value)
+            else:
+                GPIO.output(self._pins[name], value)
+            self._state[name] = value
+            self.gpio_writes += 1
+            if record:
+                self.timeline.append((time.time(), name, value))
+            return True
+    
+    def _write_speeds(self, left_speed, right_speed):
+        """Drive both L298N channels (direction pins + PWM)"""
+        for prefix, in_a, in_b, speed in (('MOTOR1', 'MOTOR1_IN1', 'MOTOR1_IN2', left_speed),
+                                          ('MOTOR2', 'MOTOR2_IN3', 'MOTOR2_IN4', right_speed)):
+            if speed > 0:
+                self._write(in_a, GPIO.HIGH)
+                self._write(in_b, GPIO.LOW)
+            elif speed < 0:
+                self._write(in_a, GPIO.LOW)
+                self._write(in_b, GPIO.HIGH)
+            else:
+                self._write(in_a, GPIO.LOW)
+                self._write(in_b, GPIO.LOW)
+            self._write(prefix + '_PWM', abs(speed))
+        
+        self.motor1_speed = left_speed
+        self.motor2_speed = right_speed
+    
+    def set_paddle_speed(self, left_speed, right_speed, immediate=False):
         """
         Set speed for both paddle motors
         
@@ -59,41 +230,47 @@ class MotorController:
             left_speed (int): Speed for left motor (-100 to 100)
             right_speed (int): Speed for right motor (-100 to 100)
                               Positive = forward, Negative = backward
+            immediate (bool): Skip the PADDLE_RAMP_RATE ramp
         """
         # Clamp speeds to valid range
         left_speed = max(-100, min(100, left_speed))
         right_speed = max(-100, min(100, right_speed))
         
-        # Set left motor (Motor 1)
-        if left_speed > 0:
-            GPIO.output(config.MOTOR1_IN1, GPIO.HIGH)
-            GPIO.output(config.MOTOR1_IN2, GPIO.LOW)
-            self.pwm_motor1.ChangeDutyCycle(abs(left_speed))
-        elif left_speed < 0:
-            GPIO.output(config.MOTOR1_IN1, GPIO.LOW)
-            GPIO.output(config.MOTOR1_IN2, GPIO.HIGH)
-            self.pwm_motor1.ChangeDutyCycle(abs(left_speed))
-        else:
-            GPIO.output(config.MOTOR1_IN1, GPIO.LOW)
-            GPIO.output(config.MOTOR1_IN2, GPIO.LOW)
-            self.pwm_motor1.ChangeDutyCycle(0)
-        
-        # Set right motor (Motor 2)
-        if right_speed > 0:
-            GPIO.output(config.MOTOR2_IN3, GPIO.HIGH)
-            GPIO.output(config.MOTOR2_IN4, GPIO.LOW)
-            self.pwm_motor2.ChangeDutyCycle(abs(right_speed))
-        elif right_speed < 0:
-            GPIO.output(config.MOTOR2_IN3, GPIO.LOW)
-            GPIO.output(config.MOTOR2_IN4, GPIO.HIGH)
-            self.pwm_motor2.ChangeDutyCycle(abs(right_speed))
-        else:
-            GPIO.output(config.MOTOR2_IN3, GPIO.LOW)
-            GPIO.output(config.MOTOR2_IN4, GPIO.LOW)
-            self.pwm_motor2.ChangeDutyCycle(0)
-        
-        self.motor1_speed = left_speed
-        self.motor2_speed = right_speed
+        with self._gpio_lock:
+            self.target_speeds = (left_speed, right_speed)
+            if immediate or not self.ramp_rate:
+                self._write_speeds(left_speed, right_speed)
+            else:
+                self._ramp_wake.set()
+    
+    def _ramp_loop(self):
+        """Move the paddle speeds toward their targets at ramp_rate %/s"""
+        last = time.monotonic()
+        while self._ramp_running:
+            self._ramp_wake.wait()
+            now = time.monotonic()
+            max_change = self.ramp_rate * min(now - last, config.MOTION_TICK)
+            last = now
+            
+            with self._gpio_lock:
+                current = (self.motor1_speed, self.motor2_speed)
+                if current == self.target_speeds:
+                    self._ramp_wake.clear()
+                    continue
+                self._write_speeds(*[
+                    target if abs(target - speed) <= max_change
+                    else speed + max_change * (1 if target > speed else -1)
+                    for speed, target in zip(current, self.target_speeds)
+                ])
+            time.sleep(config.MOTION_TICK)
+    
+    def _set_direct(self, left_speed, right_speed, message):
+        """Direct (unqueued) paddle command; prints only when the target changes"""
+        self.cancel_motion()
+        changed = self.target_speeds != (left_speed, right_speed)
+        self.set_paddle_speed(left_speed, right_speed)
+        if changed:
+            print(message)
     
     def move_forward(self, speed=None):
         """
@@ -105,8 +282,7 @@ class MotorController:
         if speed is None:
             speed = config.DEFAULT_SPEED
         
-        self.set_paddle_speed(speed, speed)
-        print(f"Moving forward at speed {speed}")
+        self._set_direct(speed, speed, f"Moving forward at speed {speed}")
     
     def move_backward(self, speed=None):
         """
@@ -118,8 +294,7 @@ class MotorController:
         if speed is None:
             speed = config.DEFAULT_SPEED
         
-        self.set_paddle_speed(-speed, -speed)
-        print(f"Moving backward at speed {speed}")
+        self._set_direct(-speed, -speed, f"Moving backward at speed {speed}")
     
     def turn_left(self, speed=None):
         """
@@ -131,8 +306,7 @@ class MotorController:
         if speed is None:
             speed = config.TURN_SPEED
         
-        self.set_paddle_speed(-speed, speed)
-        print(f"Turning left at speed {speed}")
+        self._set_direct(-speed, speed, f"Turning left at speed {speed}")
     
     def turn_right(self, speed=None):
         """
@@ -144,76 +318,336 @@ class MotorController:
         if speed is None:
             speed = config.TURN_SPEED
         
-        self.set_paddle_speed(speed, -speed)
-        print(f"Turning right at speed {speed}")
+        self._set_direct(speed, -speed, f"Turning right at speed {speed}")
     
     def stop(self):
-        """Stop both paddle motors"""
-        self.set_paddle_speed(0, 0)
-        print("Motors stopped")
+        """Stop both paddle motors (and any queued motion) without ramping"""
+        self.cancel_motion()
+        moving = self.motor1_speed or self.motor2_speed or self.target_speeds != (0, 0)
+        self.set_paddle_speed(0, 0, immediate=True)
+        if moving:
+            print("Motors stopped")
+    
+    # ===========================
+    # Motion queue
+    # ===========================
+    
+    def submit(self, command):
+        """
+        Queue a motion command; it preempts the running command if its
+        priority is higher
+        
+        Args:
+            command (MotionCommand): Command to run
+        
+        Returns:
+            MotionCommand: The queued command
+        """
+        with self._motion_cond:
+            self._motion_pending.append(command)
+            current = self._motion_current
+            if current is not None and command.priority > current.priority:
+                self._preempt = True
+            self._motion_cond.notify_all()
+        return command
+    
+    def drive_for(self, duration, left, right, priority=PRIORITY_NORMAL):
+        """
+        Queue driving at fixed paddle speeds, stopping after duration
+        
+        Args:
+            duration (float): Seconds to drive (None = keep going)
+            left (int): Left paddle speed (-100 to 100)
+            right (int): Right paddle speed (-100 to 100)
+            priority (int): Command priority
+        
+        Returns:
+            MotionCommand: The queued command
+        """
+        return self.submit(MotionCommand('drive', left, right, duration, priority=priority))
+    
+    def forward_for(self, duration, speed=None, priority=PRIORITY_NORMAL):
+        """Queue driving forward for duration seconds"""
+        if speed is None:
+            speed = config.DEFAULT_SPEED
+        return self.drive_for(duration, speed, speed, priority)
+    
+    def backward_for(self, duration, speed=None, priority=PRIORITY_NORMAL):
+        """Queue driving backward for duration seconds"""
+        if speed is None:
+            speed = config.DEFAULT_SPEED
+        return self.drive_for(duration, -speed, -speed, priority)
+    
+    def pause(self, duration, priority=PRIORITY_NORMAL):
+        """Queue standing still for duration seconds"""
+        return self.drive_for(duration, 0, 0, priority)
+    
+    def turn_by(self, angle, speed=None, priority=PRIORITY_NORMAL):
+        """
+        Queue turning on the spot by an angle, measured with the gyro
+        
+        Args:
+            angle (float): Degrees, positive = right
+            speed (int): Turn speed 0-100 (default from config)
+            priority (int): Command priority
+        
+        Returns:
+            MotionCommand: The queued command
+        """
+        if speed is None:
+            speed = config.TURN_SPEED
+        return self.submit(MotionCommand('turn', speed, speed, angle=angle, priority=priority))
+    
+    def ramp_to(self, left, right, duration, priority=PRIORITY_NORMAL):
+        """
+        Queue a linear change to new paddle speeds (which are then kept)
+        
+        Args:
+            left (int): Target left speed (-100 to 100)
+            right (int): Target right speed (-100 to 100)
+            duration (float): Seconds for the ramp
+            priority (int): Command priority
+        
+        Returns:
+            MotionCommand: The queued command
+        """
+        return self.submit(MotionCommand('ramp', left, right, duration, priority=priority))
+    
+    def cancel_motion(self):
+        """
+        Drop queued commands and preempt the running one
+        (paddle speeds are left as they are)
+        
+        Returns:
+            int: Number of commands dropped, including the running one
+        """
+        with self._motion_cond:
+            dropped = self._motion_pending
+            self._motion_pending = []
+            if self._motion_current is not None:
+                self._preempt = True
+                dropped = dropped + [self._motion_current]
+            self._motion_cond.notify_all()
+        
+        for command in dropped:
+            if command.status == 'queued':
+                command.status = 'preempted'
+                command.done.set()
+        return len(dropped)
+    
+    @property
+    def motion_busy(self):
+        """True while motion commands are running or queued"""
+        with self._motion_cond:
+            return self._motion_current is not None or bool(self._motion_pending)
+    
+    def wait_motion(self, timeout=None):
+        """
+        Wait until the motion queue is empty
+        
+        Args:
+            timeout (float): Max seconds to wait (None = forever)
+        
+        Returns:
+            bool: True if the queue drained
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._motion_cond:
+            while self._motion_current is not None or self._motion_pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._motion_cond.wait(remaining)
+        return True
+    
+    def _motion_loop(self):
+        """Executor: run queued commands, highest priority first"""
+        while True:
+            with self._motion_cond:
+                while self._motion_running and not self._motion_pending:
+                    self._motion_cond.wait()
+                if not self._motion_running:
+                    return
+                
+                top = max(c.priority for c in self._motion_pending)
+                index = next(i for i, c in enumerate(self._motion_pending) if c.priority == top)
+                command = self._motion_pending.pop(index)
+                self._motion_current = command
+                self._preempt = False
+                command.status = 'running'
+            
+            print(f"Motion: {command}")
+            try:
+                finished = self._execute(command)
+            except Exception as e:
+                print(f"⚠ Motion error: {e}")
+                finished = False
+                self.set_paddle_speed(0, 0, immediate=True)
+            
+            with self._motion_cond:
+                command.status = 'done' if finished else 'preempted'
+                self._motion_current = None
+                self._motion_cond.notify_all()
+            command.done.set()
+    
+    def _execute(self, command):
+        """
+        Run one command (executor thread)
+        
+        Returns:
+            bool: False if the command was preempted
+        """
+        if command.kind == 'drive':
+            if not self._apply(command.left, command.right):
+                return False
+            if command.duration is None:
+                return True
+            return self._hold(command.duration) and self._apply(0, 0)
+        
+        if command.kind == 'ramp':
+            start_left, start_right = self.motor1_speed, self.motor2_speed
+            ticks = max(1, int(round(command.duration / config.MOTION_TICK)))
+            for tick in range(1, ticks + 1):
+                fraction = tick / ticks
+                left = round(start_left + (command.left - start_left) * fraction)
+                right = round(start_right + (command.right - start_right) * fraction)
+                if not self._apply(left, right):
+                    return False
+                if tick < ticks and not self._hold(config.MOTION_TICK):
+                    return False
+            return True
+        
+        if command.kind == 'turn':
+            return self._turn(command.angle, command.left)
+        
+        raise ValueError(f"Unknown motion command: {command.kind}")
+    
+    def _turn(self, angle, speed):
+        """Turn on the spot until the gyro has measured angle degrees"""
+        sign = 1 if angle > 0 else -1
+        target = abs(angle)
+        if not self._apply(sign * speed, -sign * speed):
+            return False
+        
+        if self._read_yaw_rate() is None:
+            # No gyro: time the turn from the calibrated turn rate
+            rate = config.TURN_RATE_DEG_S * speed / config.TURN_SPEED
+            return self._hold(target / rate) and self._apply(0, 0)
+        
+        heading = 0.0
+        start = last = time.monotonic()
+        while abs(heading) < target:
+            if not self._hold(config.MOTION_TICK):
+                return False
+            now = time.monotonic()
+            rate = self._read_yaw_rate()
+            if rate is not None:
+                heading += rate * (now - last)
+            last = now
+            if now - start > config.MOTION_TURN_TIMEOUT:
+                print(f"⚠ Turn timed out after {abs(heading):.0f}° of {target:g}°")
+                break
+        return self._apply(0, 0)
+    
+    def _read_yaw_rate(self):
+        """Yaw rate in degrees/s, or None without a gyro"""
+        if self.yaw_rate_source is None:
+            return None
+        try:
+            return self.yaw_rate_source()
+        except Exception:
+            return None
+    
+    def _apply(self, left, right):
+        """Set paddle speeds unless the running command was preempted"""
+        with self._motion_cond:
+            if self._preempt:
+                return False
+            self.set_paddle_speed(left, right)
+            return True
+    
+    def _hold(self, seconds):
+        """Wait while a command runs; False if it was preempted"""
+        deadline = time.monotonic() + seconds
+        with self._motion_cond:
+            while not self._preempt:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._motion_cond.wait(remaining)
+            return False
     
     def enable_stepper(self):
         """Enable stepper motor"""
-        GPIO.output(config.STEPPER_ENA, GPIO.LOW)  # LOW = enabled for TB6600
+        if self._write('STEPPER_ENA', GPIO.LOW):  # LOW = enabled for TB6600
+            time.sleep(0.01)  # Small delay for driver to enable
         self.stepper_enabled = True
-        time.sleep(0.01)  # Small delay for driver to enable
     
     def disable_stepper(self):
         """Disable stepper motor"""
-        GPIO.output(config.STEPPER_ENA, GPIO.HIGH)  # HIGH = disabled for TB6600
+        self._write('STEPPER_ENA', GPIO.HIGH)  # HIGH = disabled for TB6600
         self.stepper_enabled = False
     
-    def step_motor(self, steps, direction='forward', speed=1000):
+    def step_motor(self, steps, direction='forward', speed=None):
         """
-        Move stepper motor a specific number of steps
+        Move stepper motor a specific number of steps (blocks until done)
         
         Args:
             steps (int): Number of steps to move
             direction (str): 'forward' or 'backward'
-            speed (int): Steps per second (default 1000)
+            speed (int): Steps per second (default from config)
         """
         if not self.stepper_enabled:
             self.enable_stepper()
         
-        # Set direction
-        if direction == 'forward':
-            GPIO.output(config.STEPPER_DIR, GPIO.HIGH)
-        else:
-            GPIO.output(config.STEPPER_DIR, GPIO.LOW)
+        self.stepper.start(steps, direction, speed)
+        self.stepper.wait()
+    
+    def start_conveyor(self, steps=None, speed=None, hold=0.0):
+        """
+        Start a conveyor collection cycle without waiting for it
+        The stepper is disabled again when the cycle completes
         
-        # Calculate delay between pulses
-        delay = 1.0 / (speed * 2)  # Divide by 2 for HIGH and LOW states
+        Args:
+            steps (int): Steps for the cycle (default from config)
+            speed (int): Steps per second (default from config)
+            hold (float): Seconds to keep the stepper enabled after the last step
+        """
+        if steps is None:
+            steps = config.CONVEYOR_STEPS
         
-        # Generate step pulses
-        for _ in range(steps):
-            GPIO.output(config.STEPPER_PUL, GPIO.HIGH)
-            time.sleep(delay)
-            GPIO.output(config.STEPPER_PUL, GPIO.LOW)
-            time.sleep(delay)
+        print("Activating conveyor...")
+        self.enable_stepper()
+        self.stepper.start(steps, 'forward', speed, hold=hold, on_done=self._conveyor_done)
+    
+    def _conveyor_done(self, completed):
+        """Driver callback at the end of a conveyor cycle"""
+        if completed:
+            self.disable_stepper()
+            print("Conveyor cycle complete")
+    
+    @property
+    def conveyor_busy(self):
+        """True while a conveyor cycle is running"""
+        return self.stepper.busy
     
     def activate_conveyor(self):
         """
         Activate conveyor belt (stepper motor)
-        Runs for the duration specified in config
+        Runs one collection cycle and waits for it to finish
         """
-        print("Activating conveyor...")
-        self.enable_stepper()
-        
-        # Run conveyor for collection
-        # Adjust steps based on your conveyor design
-        total_steps = 2000  # Example: 2000 steps for one collection cycle
-        self.step_motor(total_steps, direction='forward', speed=1000)
-        
-        print("Conveyor cycle complete")
+        self.start_conveyor()
+        self.stepper.wait()
     
     def stop_conveyor(self):
-        """Stop conveyor belt"""
+        """Stop conveyor belt (cancels a running cycle)"""
+        self.stepper.cancel()
         self.disable_stepper()
         print("Conveyor stopped")
     
     def stop_all(self):
         """Emergency stop - stop all motors immediately"""
-        # Stop paddle motors
+        # Stop paddle motors (preempts any maneuver in progress)
         self.stop()
         
         # Stop and disable stepper
@@ -221,11 +655,78 @@ class MotorController:
         
         print("ALL MOTORS STOPPED")
     
+    def save_timeline(self, path):
+        """
+        Save the actuator timeline as CSV (time, actuator, value)
+        
+        Args:
+            path (str): Output file
+        """
+        with self._gpio_lock:
+            entries = list(self.timeline)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['time', 'actuator', 'value'])
+            writer.writerows(entries)
+        print(f"✓ Saved {len(entries)} actuator changes to {path}")
+    
+    def replay_timeline(self, timeline, speed=1.0):
+        """
+        Re-apply recorded actuator changes with their original timing
+        (blocks; queued motion is cancelled first). Replayed changes are not
+        added to the timeline, so replaying self.timeline leaves it as recorded
+        
+        Args:
+            timeline (list): (time, actuator, value) entries, e.g. from load_timeline()
+            speed (float): Playback speed multiplier
+        """
+        self.cancel_motion()
+        timeline = list(timeline)
+        if not timeline:
+            return
+        
+        start = time.monotonic()
+        first = timeline[0][0]
+        for timestamp, name, value in timeline:
+            delay = start + (timestamp - first) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if name in self._pins or name in self._pwms:
+                self._write(name, value, record=False)
+        
+        # Keep the speed bookkeeping in line with the replayed pins
+        with self._gpio_lock:
+            speeds = []
+            for prefix, in_a, in_b in (('MOTOR1', 'MOTOR1_IN1', 'MOTOR1_IN2'),
+                                       ('MOTOR2', 'MOTOR2_IN3', 'MOTOR2_IN4')):
+                sign = 1 if self._state.get(in_a) else (-1 if self._state.get(in_b) else 0)
+                speeds.append(sign * self._state.get(prefix + '_PWM', 0))
+            self.motor1_speed, self.motor2_speed = speeds
+            self.target_speeds = tuple(speeds)
+    
+    def print_actuator_stats(self):
+        """Print GPIO write counts"""
+        total = self.gpio_writes + self.gpio_writes_skipped
+        print(f"Actuator writes: {self.gpio_writes} of {total} "
+              f"({self.gpio_writes_skipped} unchanged skipped), "
+              f"{len(self.timeline)} changes in timeline")
+    
     def cleanup(self):
         """Clean up motor resources"""
         # Stop all motors
         self.stop_all()
         
+        # Stop the motion executor
+        with self._motion_cond:
+            self._motion_running = False
+            self._motion_cond.notify_all()
+        self._motion_thread.join(timeout=1.0)
+        
+        self._ramp_running = False
+        self._ramp_wake.set()
+        if self._ramp_thread is not None:
+            self._ramp_thread.join(timeout=1.0)
+        
         # Stop PWM
         self.pwm_motor1.stop()
         self.pwm_motor2.stop()
@@ -0,0 +1,497 @@
+"""
+Record Log Module for AMLAC Robot
+Compact binary log format: fixed-size NumPy records appended in chunks,
+with converters to and from the CSV log. A month of missions loads with one
+np.fromfile() call instead of parsing formatted strings.
+
+File layout (<name>.rec):
+- 16-byte header: b'AMLACREC', format version (uint32), record size (uint32)
+- RECORD_DTYPE records back to back (little-endian, unpacked)
+
+Missing values (N/A) are stored as NaN, or -1 for the collection count.
+Event rows keep their sensor columns in the record file; the free-text event
+type and message go to a small sidecar (<name>.events.csv) keyed by record
+index. A power cut can leave a partial last record, which readers ignore and
+the writer truncates before appending.
+
+Usage:
+    python record_log.py to-rec collection_log.csv
+    python record_log.py to-csv collection_log.rec
+    python record_log.py to-arrow collection_log.rec   (needs pyarrow)
+    python record_log.py info collection_log.rec
+"""
+
+import csv
+import os
+import struct
+import numpy as np
+import config
+
+MAGIC = b'AMLACREC'
+FORMAT_VERSION = 1
+HEADER_SIZE = 16
+
+# Record kinds
+KIND_NO_DETECTION = 0
+KIND_DETECTION = 1
+KIND_EVENT = 2
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<M8[s]'),  # Local time, as in the CSV
+    ('kind', 'u1'),
+    ('confidence', '<f4'),
+    ('gps_lat', '<f8'),
+    ('gps_lon', '<f8'),
+    ('weight_kg', '<f4'),
+    ('collection_count', '<i4'),
+    ('distance_cm', '<f4'),
+    ('pitch', '<f4'),
+    ('roll', '<f4'),
+])
+
+EVENT_HEADERS = ['Record', 'Event_Type', 'Message']
+
+
+def record_path_for(log_file_path):
+    """
+    Get the record log path for a log file
+    
+    Args:
+        log_file_path (str): Log path (e.g. collection_log.csv)
+    
+    Returns:
+        str: e.g. collection_log.csv -> collection_log.rec
+    """
+    return os.path.splitext(log_file_path)[0] + '.rec'
+
+
+def events_path_for(record_path):
+    """
+    Get the event sidecar path for a record log
+    
+    Args:
+        record_path (str): Record log path
+    
+    Returns:
+        str: e.g. collection_log.rec -> collection_log.events.csv
+    """
+    return os.path.splitext(record_path)[0] + '.events.csv'
+
+
+def create_record_file(path):
+    """
+    Create an empty record log (header only) and clear its event sidecar
+    
+    Args:
+        path (str): Record log path
+    """
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<II', FORMAT_VERSION, RECORD_DTYPE.itemsize))
+    events_path = events_path_for(path)
+    if os.path.exists(events_path):
+        os.remove(events_path)
+
+
+def is_record_file(path):
+    """
+    Check whether a file is a record log (by its magic bytes)
+    
+    Args:
+        path (str): File path
+    
+    Returns:
+        bool: True for record logs
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _check_header(f):
+    """Validate the header of an open record log"""
+    header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{f.name} is not a record log")
+    version, itemsize = struct.unpack('<II', header[len(MAGIC):])
+    if version != FORMAT_VERSION or itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{f.name}: unsupported record format "
+                         f"(version {version}, record size {itemsize})")
+
+
+def record_count(path):
+    """
+    Count complete records in a record log
+    
+    Args:
+        path (str): Record log path
+    
+    Returns:
+        int: Number of whole records
+    """
+    return max(0, os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+
+def repair(path):
+    """
+    Truncate a partial last record (left by a power cut)
+    
+    Args:
+        path (str): Record log path
+    
+    Returns:
+        int: Number of whole records
+    """
+    with open(path, 'rb') as f:
+        _check_header(f)
+    count = record_count(path)
+    end = HEADER_SIZE + count * RECORD_DTYPE.itemsize
+    if os.path.getsize(path) > end:
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+        print(f"⚠ Truncated partial record at the end of {path}")
+    return count
+
+
+def _number(value, default=np.nan):
+    """Parse a CSV cell, N/A and empty cells become the default"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _orientation(value):
+    """Parse 'P:2.5 R:-1.2' into (pitch, roll)"""
+    try:
+        pitch, roll = str(value).split()
+        return float(pitch[2:]), float(roll[2:])
+    except ValueError:
+        return np.nan, np.nan
+
+
+def rows_to_records(rows, first_index=0):
+    """
+    Convert CSV-style log rows (LOG_HEADERS order) to records
+    
+    Args:
+        rows (list): Rows as written by DataLogger or read from the CSV
+        first_index (int): Record index of the first row
+    
+    Returns:
+        tuple: (records array, [(record index, event type, message), ...])
+    """
+    values = []
+    events = []
+    
+    for i, row in enumerate(rows):
+        timestamp = np.datetime64(str(row[0]).replace(' ', 'T'), 's')
+        lat, lon, distance = _number(row[3]), _number(row[4]), _number(row[7])
+        
+        if row[1] in ('Yes', 'No'):
+            pitch, roll = _orientation(row[8])
+            values.append((
+                timestamp,
+                KIND_DETECTION if row[1] == 'Yes' else KIND_NO_DETECTION,
+                _number(row[2], 0.0), lat, lon, _number(row[5], 0.0),
+                int(_number(row[6], -1)), distance, pitch, roll
+            ))
+        else:
+            values.append((timestamp, KIND_EVENT, np.nan, lat, lon, _number(row[5]),
+                           -1, distance, np.nan, np.nan))
+            events.append((first_index + i, row[1], row[2]))
+    
+    records = np.array(values, dtype=RECORD_DTYPE)
+    return records, events
+
+
+def _cell(value, fmt):
+    """Format a stored value, NaN becomes N/A"""
+    return 'N/A' if value != value else format(value, fmt)
+
+
+def records_to_rows(records, events=None, first_index=0):
+    """
+    Convert records back to CSV-style rows in DataLogger's formats
+    
+    Args:
+        records (np.ndarray): RECORD_DTYPE array
+        events (dict): record index -> (event type, message), see load_events()
+        first_index (int): Record index of records[0]
+    
+    Returns:
+        list: Rows in LOG_HEADERS order
+    """
+    events = events or {}
+    rows = []
+    
+    # tolist() converts all fields at once (datetime64 -> datetime)
+    for i, (timestamp, kind, confidence, lat, lon, weight, count,
+            distance, pitch, roll) in enumerate(records.tolist()):
+        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        
+        if kind == KIND_EVENT:
+            event_type, message = events.get(first_index + i, ('EVENT', ''))
+            rows.append([timestamp, event_type, message, _cell(lat, '.6f'), _cell(lon, '.6f'),
+                         _cell(weight, '.2f'), 'N/A', _cell(distance, '.2f'), 'N/A'])
+        else:
+            rows.append([
+                timestamp,
+                'Yes' if kind == KIND_DETECTION else 'No',
+                f"{confidence:.4f}",
+                _cell(lat, '.6f'),
+                _cell(lon, '.6f'),
+                f"{weight:.2f}",
+                count,
+                _cell(distance, '.2f'),
+                '' if pitch != pitch else f"P:{pitch:.1f} R:{roll:.1f}"
+            ])
+    
+    return rows
+
+
+def append_events(path, events):
+    """
+    Append event messages to the sidecar of a record log
+    
+    Args:
+        path (str): Record log path
+        events (list): (record index, event type, message) tuples
+    """
+    events_path = events_path_for(path)
+    new_file = not os.path.exists(events_path)
+    with open(events_path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(EVENT_HEADERS)
+        writer.writerows(events)
+
+
+def load_events(path):
+    """
+    Load event messages of a record log
+    
+    Args:
+        path (str): Record log path
+    
+    Returns:
+        dict: record index -> (event type, message)
+    """
+    events_path = events_path_for(path)
+    if not os.path.exists(events_path):
+        return {}
+    with open(events_path, 'r', newline='') as f:
+        return read_events(f)
+
+
+def read_events(f):
+    """
+    Read an event sidecar from an open text file (e.g. a decompressed archive)
+    
+    Args:
+        f: File object opened in text mode
+    
+    Returns:
+        dict: record index -> (event type, message)
+    """
+    return {int(row['Record']): (row['Event_Type'], row['Message'])
+            for row in csv.DictReader(f)}
+
+
+def records_from_bytes(data):
+    """
+    Parse a whole record log held in memory (e.g. a decompressed archive)
+    
+    Args:
+        data (bytes): File contents including the header
+    
+    Returns:
+        np.ndarray: RECORD_DTYPE array (partial trailing record ignored)
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Not a supported record log")
+    version, itemsize = struct.unpack('<II', data[len(MAGIC):HEADER_SIZE])
+    if data[:len(MAGIC)] != MAGIC or version != FORMAT_VERSION or itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError("Not a supported record log")
+    count = max(0, len(data) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    return np.frombuffer(data, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)
+
+
+def load_records(path, start_offset=HEADER_SIZE):
+    """
+    Load records from a record log
+    
+    Args:
+        path (str): Record log path
+        start_offset (int): Byte offset of the first record to load
+    
+    Returns:
+        np.ndarray: RECORD_DTYPE array (partial trailing record ignored)
+    """
+    start_offset = max(start_offset, HEADER_SIZE)
+    with open(path, 'rb') as f:
+        _check_header(f)
+        count = max(0, os.path.getsize(path) - start_offset) // RECORD_DTYPE.itemsize
+        f.seek(start_offset)
+        return np.fromfile(f, dtype=RECORD_DTYPE, count=count)
+
+
+def read_rows(path, start_offset=0):
+    """
+    Read a record log as CSV-style rows (used to rebuild statistics)
+    
+    Args:
+        path (str): Record log path
+        start_offset (int): Byte offset of the first record to read
+    
+    Returns:
+        tuple: (rows, byte offset after the last whole record)
+    """
+    start_offset = max(start_offset, HEADER_SIZE)
+    records = load_records(path, start_offset)
+    first_index = (start_offset - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    rows = records_to_rows(records, load_events(path), first_index)
+    return rows, start_offset + len(records) * RECORD_DTYPE.itemsize
+
+
+def csv_to_records(csv_path, record_path=None, chunk_rows=10000):
+    """
+    Convert a CSV log to a record log
+    
+    Args:
+        csv_path (str): Source CSV log
+        record_path (str): Output path (default: same name with .rec)
+        chunk_rows (int): Rows converted and appended per chunk
+    
+    Returns:
+        str: Output path
+    """
+    record_path = record_path or record_path_for(csv_path)
+    create_record_file(record_path)
+    written = 0
+    
+    with open(csv_path, 'r', newline='') as src, open(record_path, 'ab') as dst:
+        reader = csv.reader(src)
+        next(reader, None)  # Header
+        
+        chunk = []
+        for row in reader:
+            if len(row) < len(config.LOG_HEADERS):
+                continue  # Truncated last line
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                written += _write_chunk(dst, record_path, chunk, written)
+                chunk = []
+        if chunk:
+            written += _write_chunk(dst, record_path, chunk, written)
+    
+    print(f"✓ {written} rows: {csv_path} -> {record_path}")
+    return record_path
+
+
+def _write_chunk(f, record_path, rows, first_index):
+    """Append one chunk of rows to an open record log"""
+    records, events = rows_to_records(rows, first_index)
+    if events:
+        append_events(record_path, events)
+    f.write(records.tobytes())
+    return len(records)
+
+
+def records_to_csv(record_path, csv_path=None):
+    """
+    Convert a record log to a CSV log
+    
+    Args:
+        record_path (str): Source record log
+        csv_path (str): Output path (default: same name with .csv)
+    
+    Returns:
+        str: Output path
+    """
+    csv_path = csv_path or os.path.splitext(record_path)[0] + '.csv'
+    rows = records_to_rows(load_records(record_path), load_events(record_path))
+    
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(config.LOG_HEADERS)
+        writer.writerows(rows)
+    
+    print(f"✓ {len(rows)} rows: {record_path} -> {csv_path}")
+    return csv_path
+
+
+def records_to_arrow(record_path, arrow_path=None):
+    """
+    Export a record log as an Arrow IPC file (requires pyarrow)
+    
+    Args:
+        record_path (str): Source record log
+        arrow_path (str): Output path (default: same name with .arrow)
+    
+    Returns:
+        str: Output path, or None if pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("⚠ pyarrow not installed (pip install pyarrow)")
+        return None
+    
+    arrow_path = arrow_path or os.path.splitext(record_path)[0] + '.arrow'
+    records = load_records(record_path)
+    table = pa.table({name: records[name] for name in RECORD_DTYPE.names})
+    
+    with pa.OSFile(arrow_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    
+    print(f"✓ {len(records)} rows: {record_path} -> {arrow_path}")
+    return arrow_path
+
+
+def print_info(record_path):
+    """
+    Print size, load time and a short summary of a record log
+    
+    Args:
+        record_path (str): Record log path
+    """
+    import time
+    
+    start = time.perf_counter()
+    records = load_records(record_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    
+    detections = records['kind'] == KIND_DETECTION
+    size_kb = os.path.getsize(record_path) / 1024
+    
+    print(f"{record_path}: {len(records)} records, {size_kb:.1f} KB "
+          f"({RECORD_DTYPE.itemsize} bytes/record), loaded in {load_ms:.2f} ms")
+    if len(records):
+        print(f"  {records['timestamp'][0]} to {records['timestamp'][-1]}")
+        print(f"  Detections: {int(detections.sum())}, events: "
+              f"{int((records['kind'] == KIND_EVENT).sum())}")
+        if detections.any():
+            print(f"  Mean detection confidence: {records['confidence'][detections].mean():.2%}")
+
+
+if __name__ == "__main__":
+    """Convert and inspect record logs"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AMLAC record log tools')
+    parser.add_argument('command', choices=['to-rec', 'to-csv', 'to-arrow', 'info'])
+    parser.add_argument('input', help='Source log file')
+    parser.add_argument('output', nargs='?', default=None, help='Output file (default: same name)')
+    args = parser.parse_args()
+    
+    if args.command == 'to-rec':
+        print_info(csv_to_records(args.input, args.output))
+    elif args.command == 'to-csv':
+        records_to_csv(args.input, args.output)
+    elif args.command == 'to-arrow':
+        records_to_arrow(args.input, args.output)
+    else:
+        print_info(args.input)
@@ -0,0 +1,289 @@
+"""
+Scan Pipeline Module for AMLAC Robot
+Runs camera capture + ML inference and sensor reading in background threads
+at the same time, so each scan costs roughly the slower of the two instead of
+the sum of all stages
+"""
+
+import threading
+import time
+import config
+from latency_stats import LatencyStats, print_latency_report
+
+
+class LatestSlot:
+    """
+    Single-item handoff between stages
+    put() replaces the held item instead of blocking, so a consumer only
+    ever sees the newest item and a slow consumer never leaves old data
+    queued behind it.
+    """
+    
+    def __init__(self):
+        """Initialize an empty slot"""
+        self._cond = threading.Condition()
+        self._item = None
+    
+    def put(self, item):
+        """Store item, replacing whatever was held"""
+        with self._cond:
+            self._item = item
+            self._cond.notify_all()
+    
+    def take(self, timeout):
+        """
+        Remove and return the held item, waiting for one if needed
+        
+        Args:
+            timeout (float): Seconds to wait
+        
+        Returns:
+            The item, or None if the slot stayed empty
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._item is not None, timeout):
+                return None
+            item, self._item = self._item, None
+            return item
+    
+    def clear(self):
+        """Drop the held item"""
+        with self._cond:
+            self._item = None
+
+
+class ScanPipeline:
+    """
+    Scan pipeline triggered once per next_scan():
+    - Capture thread: grabs one frame per scan request
+    - Inference thread: runs detection on the newest captured frame
+    - Sensor thread: reads one sensor snapshot per scan request, while the
+      frame is being captured and inferred
+    
+    Stages hand over through single-item LatestSlots tagged with the scan
+    number, so nothing runs ahead of the control loop and a scan never
+    returns a frame or snapshot taken before it was requested.
+    """
+    
+    def __init__(self, capture_fn, detect_fn, sensor_fn):
+        """
+        Initialize scan pipeline
+        
+        Args:
+            capture_fn (callable): Returns a camera frame (numpy.ndarray)
+            detect_fn (callable): Takes a frame, returns (is_algae_detected, confidence)
+            sensor_fn (callable): Returns the sensor data dictionary
+        """
+        self.capture_fn = capture_fn
+        self.detect_fn = detect_fn
+        self.sensor_fn = sensor_fn
+        
+        # Scan requests for the capture and sensor threads, and stage outputs
+        self.capture_request = LatestSlot()
+        self.sensor_request = LatestSlot()
+        self.frame_slot = LatestSlot()
+        self.result_slot = LatestSlot()
+        self.sensor_slot = LatestSlot()
+        
+        # Per-stage latency statistics
+        self.stats = {
+            'capture': LatencyStats('capture'),
+            'inference': LatencyStats('inference'),
+            'sensors': LatencyStats('sensors'),
+            'wait': LatencyStats('wait'),
+            'frame_age': LatencyStats('frame_age'),
+            'sensor_age': LatencyStats('sensor_age')
+        }
+        
+        # Number of the latest requested scan; items tagged with an older
+        # number (e.g. started before a flush()) are discarded
+        self._scan = 0
+        
+        self._stop_event = threading.Event()
+        self._threads = []
+        self.running = False
+    
+    def start(self):
+        """Start the capture, inference and sensor threads"""
+        if self.running:
+            return
+        
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='pipeline-capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='pipeline-inference', daemon=True),
+            threading.Thread(target=self._sensor_loop, name='pipeline-sensors', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        
+        self.running = True
+        print("✓ Scan pipeline started")
+    
+    def stop(self, timeout=2.0):
+        """
+        Stop all pipeline threads
+        
+        Args:
+            timeout (float): Seconds to wait for each thread to exit
+        """
+        if not self.running:
+            return
+        
+        self._stop_event.set()
+        self.flush()
+        for thread in self._threads:
+            thread.join(timeout)
+        
+        self._threads = []
+        self.running = False
+        print("Scan pipeline stopped")
+    
+    def _take(self, slot):
+        """
+        Wait for the next item in slot until the pipeline is stopped
+        
+        Returns:
+            The item, or None once stopped
+        """
+        while not self._stop_event.is_set():
+            item = slot.take(timeout=0.1)
+            if item is not None:
+                return item
+        return None
+    
+    def _capture_loop(self):
+        """Capture stage - grabs one frame per scan request"""
+        while True:
+            scan = self._take(self.capture_request)
+            if scan is None:
+                return
+            
+            try:
+                start = time.perf_counter()
+                frame = self.capture_fn()
+                self.stats['capture'].record(time.perf_counter() - start)
+            except Exception as e:
+                self.stats['capture'].record_error()
+                print(f"Error in capture stage: {e}")
+                continue
+            
+            self.frame_slot.put((scan, start, frame))
+    
+    def _inference_loop(self):
+        """Inference stage - turns the newest frame into a detection result"""
+        while True:
+            item = self._take(self.frame_slot)
+            if item is None:
+                return
+            scan, captured_at, frame = item
+            if scan != self._scan:
+                continue  # Flushed or superseded while waiting
+            
+            try:
+                start = time.perf_counter()
+                algae_detected, confidence = self.detect_fn(frame)
+                self.stats['inference'].record(time.perf_counter() - start)
+            except Exception as e:
+                self.stats['inference'].record_error()
+                print(f"Error in inference stage: {e}")
+                continue
+            
+            self.result_slot.put((scan, captured_at, algae_detected, confidence))
+    
+    def _sensor_loop(self):
+        """Sensor stage - reads one snapshot per scan request"""
+        while True:
+            scan = self._take(self.sensor_request)
+            if scan is None:
+                return
+            
+            try:
+                start = time.perf_counter()
+                sensor_data = self.sensor_fn()
+                self.stats['sensors'].record(time.perf_counter() - start)
+            except Exception as e:
+                self.stats['sensors'].record_error()
+                print(f"Error in sensor stage: {e}")
+                continue
+            
+            self.sensor_slot.put((scan, start, sensor_data))
+    
+    def next_scan(self, timeout=None):
+        """
+        Request a scan and wait for its detection result and sensor snapshot
+        Capture + inference and the sensor read run concurrently, both
+        started by this call.
+        
+        Args:
+            timeout (float): Seconds to wait for each stage (default from config)
+        
+        Returns:
+            tuple: (is_algae_detected: bool, confidence: float, sensor_data: dict)
+        
+        Raises:
+            RuntimeError: If a stage produced nothing within the timeout
+        """
+        if timeout is None:
+            timeout = config.PIPELINE_STAGE_TIMEOUT
+        
+        start = time.perf_counter()
+        self._scan += 1
+        scan = self._scan
+        self.sensor_request.put(scan)
+        self.capture_request.put(scan)
+        
+        _, captured_at, algae_detected, confidence = self._get_current(
+            self.result_slot, scan, start + timeout, "no inference result"
+        )
+        _, read_at, sensor_data = self._get_current(
+            self.sensor_slot, scan, start + timeout, "no sensor data"
+        )
+        
+        now = time.perf_counter()
+        self.stats['wait'].record(now - start)
+        self.stats['frame_age'].record(now - captured_at)
+        self.stats['sensor_age'].record(now - read_at)
+        
+        return (algae_detected, confidence, sensor_data)
+    
+    def _get_current(self, slot, scan, deadline, what):
+        """
+        Wait for the item of the given scan, discarding older ones
+        
+        Raises:
+            RuntimeError: If the item did not arrive before the deadline
+        """
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise RuntimeError(f"Scan pipeline stalled: {what}")
+            item = slot.take(remaining)
+            if item is None:
+                raise RuntimeError(f"Scan pipeline stalled: {what}")
+            if item[0] == scan:
+                return item
+    
+    def flush(self):
+        """
+        Discard pending scan requests, frames, results and sensor snapshots
+        Call after long actions (collection, obstacle avoidance). Work
+        already in progress is dropped when it arrives.
+        """
+        self._scan += 1
+        for slot in (self.capture_request, self.sensor_request, self.frame_slot,
+                     self.result_slot, self.sensor_slot):
+            slot.clear()
+    
+    def get_report(self):
+        """
+        Get per-stage latency summaries
+        
+        Returns:
+            dict: Stage name -> latency summary
+        """
+        return {name: stats.summary() for name, stats in self.stats.items()}
+    
+    def print_report(self):
+        """Print per-stage latency report"""
+        print_latency_report("Scan Pipeline Latency", self.stats.values())
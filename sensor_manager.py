@@ -1,18 +1,23 @@
 """
 Sensor Manager Module for AMLAC Robot
 Handles all sensor readings: TCS34725, JSN-SR04T, MPU6050, GPS, HX711, Float Switch
+
+With start_sampling() each sensor is read by its own background thread and
+get_all_sensor_data() returns the latest snapshot instantly; otherwise the
+sensors are read one after another on every call.
 """
 
+import math
 import time
-import serial
 import pynmea2
-import RPi.GPIO as GPIO
-from smbus2 import SMBus
-import board
-import busio
-import adafruit_tcs34725
-from hx711 import HX711
 import config
+from hardware import GPIO, SMBus, board, busio, adafruit_tcs34725, HX711, serial
+import i2c_bus
+import imu
+from gps_reader import GPSReader
+from load_cell import LoadCellSampler
+from sensor_sampler import SensorSamplers
+from ultrasonic import EdgeUltrasonic
 
 class SensorManager:
     """
@@ -25,7 +30,7 @@ class SensorManager:
         print("Initializing sensors...")
         
         # Initialize I2C bus
-        self.i2c = busio.I2C(board.SCL, board.SDA)
+        self.i2c = i2c_bus.arbitrated(busio.I2C(board.SCL, board.SDA), 'tcs34725')
         
         # Initialize color sensor (TCS34725)
         try:
@@ -48,15 +53,24 @@ class SensorManager:
             print(f"⚠ Warning: Ultrasonic sensor not available - {e}")
             self.ultrasonic_available = False
         
+        # Edge-callback measurement (falls back to polling the echo pin)
+        self.ultrasonic = None
+        if self.ultrasonic_available and config.ULTRASONIC_MODE == 'edge':
+            try:
+                self.ultrasonic = EdgeUltrasonic()
+            except Exception as e:
+                print(f"⚠ Ultrasonic edge detection unavailable, polling instead - {e}")
+        
         # Initialize MPU6050 IMU
         try:
-            self.mpu_bus = SMBus(1)
+            self.mpu_bus = i2c_bus.arbitrated(SMBus(1), 'mpu6050')
             self._init_mpu6050()
             self.mpu_available = True
             print("✓ MPU6050 IMU initialized")
         except Exception as e:
             print(f"⚠ Warning: MPU6050 not available - {e}")
             self.mpu_available = False
+        self.imu_stream = None  # Started by start_imu_stream()
         
         # Initialize GPS (NEO-6M)
         try:
@@ -71,6 +85,13 @@ class SensorManager:
             print(f"⚠ Warning: GPS not available - {e}")
             self.gps_available = False
         
+        # Start background GPS reader (read_gps then returns the cached fix)
+        self.gps_reader = None
+        if self.gps_available and config.GPS_BACKGROUND_READER:
+            self.gps_reader = GPSReader(self.gps_serial)
+            self.gps_reader.start()
+            print("✓ GPS background reader started")
+        
         # Initialize HX711 load cell
         try:
             self.hx711 = HX711(
@@ -84,6 +105,13 @@ class SensorManager:
             print(f"⚠ Warning: HX711 not available - {e}")
             self.hx711_available = False
         
+        # Continuous load cell sampling with filtering
+        self.load_cell = None
+        if self.hx711_available and config.WEIGHT_SAMPLING:
+            self.load_cell = LoadCellSampler(self.hx711, motion_source=self._accel_magnitude)
+            self.load_cell.start()
+            print("✓ Load cell sampler started")
+        
         # Initialize float switch
         try:
             GPIO.setup(config.FLOAT_SWITCH, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
@@ -93,6 +121,18 @@ class SensorManager:
             print(f"⚠ Warning: Float switch not available - {e}")
             self.float_switch_available = False
         
+        # Snapshot fields produced by each sensor, in sequential read order
+        # (GPS first, it may take time without the background reader)
+        self._sensor_sources = [
+            ('gps', self._sample_gps),
+            ('color', self._sample_color),
+            ('ultrasonic', self._sample_ultrasonic),
+            ('imu', self._sample_imu),
+            ('weight', self._sample_weight),
+            ('float_switch', self._sample_float_switch)
+        ]
+        self.samplers = None
+        
         print("Sensor initialization complete!\n")
     
     def _init_mpu6050(self):
@@ -112,7 +152,9 @@ class SensorManager:
             return (None, None, None)
         
         try:
-            r, g, b = self.color_sensor.color_rgb_bytes
+            # One bus grant for the whole clear/red/green/blue register read
+            with i2c_bus.batch(self.i2c):
+                r, g, b = self.color_sensor.color_rgb_bytes
             return (r, g, b)
         except Exception as e:
             print(f"Error reading color sensor: {e}")
@@ -121,6 +163,7 @@ class SensorManager:
     def read_ultrasonic(self):
         """
         Measure distance using JSN-SR04T ultrasonic sensor
+        (median of several edge-timed pings in 'edge' mode)
         
         Returns:
             float: Distance in centimeters or None if unavailable/timeout
@@ -128,6 +171,13 @@ class SensorManager:
         if not self.ultrasonic_available:
             return None
         
+        if self.ultrasonic is not None:
+            try:
+                return self.ultrasonic.read()
+            except Exception as e:
+                print(f"Error reading ultrasonic sensor: {e}")
+                return None
+        
         try:
             # Send trigger pulse
             GPIO.output(config.ULTRASONIC_TRIG, GPIO.HIGH)
@@ -164,60 +214,81 @@ class SensorManager:
     def read_mpu6050(self):
         """
         Read accelerometer and gyroscope data from MPU6050
+        (one 14-byte burst: accel, temperature, gyro)
         
         Returns:
-            dict: Contains 'accel' (x,y,z) and 'gyro' (x,y,z) or None if unavailable
+            dict: Contains 'accel' (x,y,z), 'gyro' (x,y,z) and 'temperature' (°C)
+                  or None if unavailable
         """
         if not self.mpu_available:
             return None
         
         try:
-            # Read accelerometer data (registers 0x3B to 0x40)
-            accel_data = self.mpu_bus.read_i2c_block_data(
-                config.MPU6050_I2C_ADDRESS, 0x3B, 6
-            )
-            
-            # Read gyroscope data (registers 0x43 to 0x48)
-            gyro_data = self.mpu_bus.read_i2c_block_data(
-                config.MPU6050_I2C_ADDRESS, 0x43, 6
-            )
-            
-            # Convert to signed values
-            accel_x = self._convert_to_signed(accel_data[0], accel_data[1])
-            accel_y = self._convert_to_signed(accel_data[2], accel_data[3])
-            accel_z = self._convert_to_signed(accel_data[4], accel_data[5])
-            
-            gyro_x = self._convert_to_signed(gyro_data[0], gyro_data[1])
-            gyro_y = self._convert_to_signed(gyro_data[2], gyro_data[3])
-            gyro_z = self._convert_to_signed(gyro_data[4], gyro_data[5])
-            
-            # Scale values (default sensitivity)
-            accel_scale = 16384.0  # For ±2g range
-            gyro_scale = 131.0     # For ±250°/s range
-            
-            return {
-                'accel': {
-                    'x': accel_x / accel_scale,
-                    'y': accel_y / accel_scale,
-                    'z': accel_z / accel_scale
-                },
-                'gyro': {
-                    'x': gyro_x / gyro_scale,
-                    'y': gyro_y / gyro_scale,
-                    'z': gyro_z / gyro_scale
-                }
-            }
+            accel, temperature, gyro = imu.read_burst(self.mpu_bus)
+            imu_data = imu.imu_data_dict(accel, gyro)
+            imu_data['temperature'] = temperature
+            return imu_data
             
         except Exception as e:
             print(f"Error reading MPU6050: {e}")
             return None
     
-    def _convert_to_signed(self, high_byte, low_byte):
-        """Convert two bytes to signed 16-bit integer"""
-        value = (high_byte << 8) | low_byte
-        if value > 32767:
-            value -= 65536
-        return value
+    def read_yaw_rate(self):
+        """
+        Read only the gyroscope Z axis (fast, for turns by angle)
+        Returns the latest streamed sample when the IMU stream is running
+        
+        Returns:
+            float: Yaw rate in degrees/s or None if unavailable
+        """
+        if not self.mpu_available:
+            return None
+        
+        if self.imu_stream is not None and self.imu_stream.running:
+            return self.imu_stream.yaw_rate()
+        
+        try:
+            return imu.read_gyro_z(self.mpu_bus)
+        except Exception as e:
+            print(f"Error reading MPU6050 gyro: {e}")
+            return None
+    
+    def start_imu_stream(self, calibrate=True):
+        """
+        Sample the IMU in the background and fuse orientation
+        (the robot should be still while the gyro bias is measured)
+        
+        Args:
+            calibrate (bool): Measure the gyro bias first
+        """
+        if not self.mpu_available or self.imu_stream is not None:
+            return
+        
+        self.imu_stream = imu.IMUStream(self.mpu_bus)
+        if calibrate:
+            self.imu_stream.calibrate()
+        self.imu_stream.start()
+        mode = 'FIFO' if self.imu_stream.use_fifo else 'polled'
+        print(f"✓ IMU streaming at {self.imu_stream.rate_hz:g} Hz ({mode})")
+    
+    def stop_imu_stream(self):
+        """Stop background IMU sampling"""
+        if self.imu_stream is not None:
+            self.imu_stream.stop()
+            self.imu_stream = None
+    
+    def get_orientation(self):
+        """
+        Get the current orientation
+        Fused pitch/roll/yaw from the IMU stream if running (instant),
+        otherwise tilt from one accelerometer reading
+        
+        Returns:
+            dict: 'pitch', 'roll' (and 'yaw' when streaming) in degrees, or None
+        """
+        if self.imu_stream is not None and self.imu_stream.running:
+            return self.imu_stream.orientation()
+        return self._sample_imu()['orientation']
     
     def read_gps(self):
         """
@@ -225,10 +296,15 @@ class SensorManager:
         
         Returns:
             dict: Contains 'lat', 'lon', 'altitude', 'fix_quality' or None if no fix
+                  (the background reader also adds speed, heading, timestamp and age)
         """
         if not self.gps_available:
             return None
         
+        # Return instantly from the background reader's cache
+        if self.gps_reader is not None:
+            return self.gps_reader.get_fix()
+        
         try:
             # Read multiple lines to find GPGGA sentence
             for _ in range(10):  # Try up to 10 lines
@@ -258,6 +334,7 @@ class SensorManager:
     def read_weight(self):
         """
         Read weight from HX711 load cell
+        Returns the latest filtered weight when the load cell sampler runs
         
         Returns:
             float: Weight in kilograms or None if unavailable
@@ -265,6 +342,9 @@ class SensorManager:
         if not self.hx711_available:
             return None
         
+        if self.load_cell is not None and self.load_cell.running:
+            return self.load_cell.weight()
+        
         try:
             # Get average of multiple readings for stability
             weight_grams = self.hx711.get_weight_mean(5)
@@ -275,11 +355,37 @@ class SensorManager:
             print(f"Error reading weight: {e}")
             return None
     
+    def weight_stable(self):
+        """
+        Check whether the weight reading has settled
+        
+        Returns:
+            bool: True if stable. Without the load cell sampler each reading
+                  is a blocking mean, so this is True whenever the HX711 is
+                  available
+        """
+        if self.load_cell is not None and self.load_cell.running:
+            return self.load_cell.stable
+        return self.hx711_available
+    
+    def _accel_magnitude(self):
+        """Acceleration magnitude in g from the IMU stream (None if not streaming)"""
+        if self.imu_stream is None:
+            return None
+        imu_data = self.imu_stream.latest()
+        if imu_data is None:
+            return None
+        accel = imu_data['accel']
+        return math.sqrt(accel['x'] ** 2 + accel['y'] ** 2 + accel['z'] ** 2)
+    
     def tare_scale(self):
         """Zero the load cell scale"""
         if self.hx711_available:
             try:
-                self.hx711.zero()
+                if self.load_cell is not None:
+                    self.load_cell.tare()
+                else:
+                    self.hx711.zero()
                 print("Scale tared successfully")
                 return True
             except Exception as e:
@@ -303,50 +409,118 @@ class SensorManager:
             print(f"Error reading float switch: {e}")
             return False
     
-    def get_all_sensor_data(self):
-        """
-        Read all sensors and return consolidated data
-        
-        Returns:
-            dict: All sensor readings in a single dictionary
-        """
-        # Read GPS first (may take time)
+    def _sample_gps(self):
+        """GPS snapshot fields"""
         gps_data = self.read_gps()
+        return {
+            'gps_lat': gps_data['lat'] if gps_data else None,
+            'gps_lon': gps_data['lon'] if gps_data else None,
+            'gps_altitude': gps_data['altitude'] if gps_data else None
+        }
+    
+    def _sample_color(self):
+        """Color sensor snapshot fields"""
+        return {'color_rgb': self.read_color_sensor()}
+    
+    def _sample_ultrasonic(self):
+        """Ultrasonic snapshot fields"""
+        return {'distance': self.read_ultrasonic()}
+    
+    def _sample_imu(self):
+        """IMU snapshot fields (raw data and orientation)"""
+        if self.imu_stream is not None and self.imu_stream.running:
+            return {'orientation': self.imu_stream.orientation(),
+                    'imu_data': self.imu_stream.latest()}
         
-        # Read other sensors
-        color_rgb = self.read_color_sensor()
-        distance = self.read_ultrasonic()
         imu_data = self.read_mpu6050()
-        weight = self.read_weight()
-        float_switch_active = self.read_float_switch()
         
-        # Calculate orientation from IMU if available
+        # Tilt from the accelerometer alone
         orientation = None
         if imu_data:
-            # Simple tilt calculation (can be improved)
             accel = imu_data['accel']
-            import math
-            pitch = math.atan2(accel['y'], math.sqrt(accel['x']**2 + accel['z']**2))
-            roll = math.atan2(-accel['x'], accel['z'])
-            orientation = {
-                'pitch': math.degrees(pitch),
-                'roll': math.degrees(roll)
-            }
+            pitch, roll = imu.accel_tilt((accel['x'], accel['y'], accel['z']))
+            orientation = {'pitch': pitch, 'roll': roll}
         
-        return {
-            'gps_lat': gps_data['lat'] if gps_data else None,
-            'gps_lon': gps_data['lon'] if gps_data else None,
-            'gps_altitude': gps_data['altitude'] if gps_data else None,
-            'color_rgb': color_rgb,
-            'distance': distance,
-            'weight': weight if weight else 0.0,
-            'orientation': orientation,
-            'float_switch_active': float_switch_active,
-            'imu_data': imu_data
-        }
+        return {'orientation': orientation, 'imu_data': imu_data}
+    
+    def _sample_weight(self):
+        """Load cell snapshot fields"""
+        weight = self.read_weight()
+        return {'weight': weight if weight else 0.0, 'weight_stable': self.weight_stable()}
+    
+    def _sample_float_switch(self):
+        """Float switch snapshot fields"""
+        return {'float_switch_active': self.read_float_switch()}
+    
+    def start_sampling(self, intervals=None):
+        """
+        Start one background sampler per sensor
+        
+        Args:
+            intervals (dict): sensor -> seconds between samples
+                              (default SENSOR_SAMPLE_INTERVALS)
+        """
+        if self.samplers is not None:
+            return
+        
+        if intervals is None:
+            intervals = config.SENSOR_SAMPLE_INTERVALS
+        
+        self.samplers = SensorSamplers()
+        for name, read_fn in self._sensor_sources:
+            self.samplers.add(name, read_fn, intervals[name])
+        self.samplers.start()
+        print(f"✓ Sensor sampling started ({len(self.samplers.samplers)} sensors)")
+    
+    def stop_sampling(self):
+        """Stop the background samplers (back to sequential reads)"""
+        if self.samplers is not None:
+            self.samplers.stop()
+            self.samplers = None
+    
+    def print_sampling_report(self, histograms=False):
+        """Print per-sensor sampling latency (if sampling is running)"""
+        if self.samplers is not None:
+            self.samplers.print_report(histograms)
+        if self.imu_stream is not None:
+            self.imu_stream.print_stats()
+        if self.load_cell is not None:
+            self.load_cell.print_stats()
+    
+    def get_all_sensor_data(self):
+        """
+        Get all sensor readings: the latest background snapshot when
+        sampling is running, otherwise read every sensor now
+        
+        Returns:
+            dict: All sensor readings in a single dictionary, plus
+                  'stale_sensors' (sensors whose last sample is too old)
+        """
+        if self.samplers is not None:
+            data = dict(self.samplers.store.snapshot())
+            data['stale_sensors'] = self.samplers.stale_sensors()
+            return data
+        
+        data = {}
+        for _, read_fn in self._sensor_sources:
+            data.update(read_fn())
+        data['stale_sensors'] = []
+        return data
     
     def cleanup(self):
         """Clean up sensor resources"""
+        self.stop_sampling()
+        self.stop_imu_stream()
+        
+        if self.load_cell is not None:
+            self.load_cell.stop()
+        
+        if self.ultrasonic is not None:
+            self.ultrasonic.close()
+        
+        if self.gps_reader is not None:
+            self.gps_reader.stop()
+        
         if self.gps_available:
             try:
                 self.gps_serial.close()
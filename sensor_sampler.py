@@ -0,0 +1,247 @@
+"""
+Sensor Sampler Module for AMLAC Robot
+Per-sensor background sampling. Each sensor is read by its own thread at its
+own rate (SENSOR_SAMPLE_INTERVALS) into a shared SnapshotStore, so a slow
+device only delays its own fields and the control loop reads the latest
+values instantly.
+
+Every field carries the time it was sampled; a field older than
+SENSOR_STALE_FACTOR sample intervals is reported as stale. Read latencies go
+into a histogram per sensor to show which device costs the most.
+"""
+
+import threading
+import time
+import config
+from latency_stats import LatencyHistogram
+
+
+class SnapshotStore:
+    """
+    Latest sensor values with per-field timestamps
+    Writers replace the snapshot dict instead of mutating it, so readers get
+    a consistent view without copying
+    """
+    
+    def __init__(self, initial=None):
+        """
+        Initialize store
+        
+        Args:
+            initial (dict): Field values to start with (timestamps unset)
+        """
+        self._lock = threading.Lock()
+        self._values = dict(initial or {})
+        self._times = {}
+        self._sources = {}  # field -> sensor name
+    
+    def update(self, sensor, fields, timestamp=None):
+        """
+        Publish new values for some fields
+        
+        Args:
+            sensor (str): Name of the sensor that produced them
+            fields (dict): Field values
+            timestamp (float): time.monotonic() of the reading (default now)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        with self._lock:
+            values = dict(self._values)
+            values.update(fields)
+            times = dict(self._times)
+            for name in fields:
+                times[name] = timestamp
+                self._sources[name] = sensor
+            self._values = values
+            self._times = times
+    
+    def snapshot(self):
+        """
+        Get the latest values (the returned dict must not be modified)
+        
+        Returns:
+            dict: Field values
+        """
+        return self._values
+    
+    def ages(self):
+        """
+        Get how old each field is
+        
+        Returns:
+            dict: field -> seconds since it was sampled (None if never)
+        """
+        now = time.monotonic()
+        values, times = self._values, self._times
+        return {name: (now - times[name]) if name in times else None for name in values}
+    
+    def source(self, field):
+        """Name of the sensor that last wrote a field"""
+        return self._sources.get(field)
+
+
+class SensorSampler:
+    """
+    Background thread reading one sensor at a fixed interval
+    """
+    
+    def __init__(self, name, read_fn, interval, store):
+        """
+        Initialize sampler
+        
+        Args:
+            name (str): Sensor name (thread name and report label)
+            read_fn (callable): Returns a dict of snapshot fields
+            interval (float): Seconds between samples
+            store (SnapshotStore): Where the fields are published
+        """
+        self.name = name
+        self.read_fn = read_fn
+        self.interval = interval
+        self.store = store
+        self.latency = LatencyHistogram(name)
+        self.overruns = 0  # Samples skipped because a read took too long
+        
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the sampling thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop,
+                                        name=f'sensor-{self.name}', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop the sampling thread
+        
+        Args:
+            timeout (float): Seconds to wait for the thread (default ULTRASONIC_TIMEOUT + 1)
+        """
+        if timeout is None:
+            timeout = config.ULTRASONIC_TIMEOUT + 1
+        
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def sample(self):
+        """Read the sensor once and publish the result"""
+        start = time.perf_counter()
+        try:
+            fields = self.read_fn()
+        except Exception as e:
+            self.latency.record_error()
+            print(f"⚠ Sensor {self.name} error: {e}")
+            return
+        
+        self.latency.record(time.perf_counter() - start)
+        self.store.update(self.name, fields, time.monotonic())
+    
+    def _sample_loop(self):
+        """Sample on a fixed schedule until stopped"""
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            
+            next_time += self.interval
+            now = time.monotonic()
+            if next_time < now:
+                # Read took longer than the interval: skip, don't catch up
+                missed = int((now - next_time) / self.interval) + 1
+                self.overruns += missed
+                next_time += missed * self.interval
+            self._stop_event.wait(next_time - now)
+    
+    def is_stale(self, age):
+        """True if a field age is beyond SENSOR_STALE_FACTOR intervals"""
+        return age is None or age > self.interval * config.SENSOR_STALE_FACTOR
+
+
+class SensorSamplers:
+    """
+    Set of per-sensor samplers sharing one snapshot store
+    """
+    
+    def __init__(self, store=None):
+        """
+        Initialize
+        
+        Args:
+            store (SnapshotStore): Shared store (default: a new one)
+        """
+        self.store = store or SnapshotStore()
+        self.samplers = {}
+    
+    def add(self, name, read_fn, interval):
+        """
+        Add a sensor
+        
+        Args:
+            name (str): Sensor name
+            read_fn (callable): Returns a dict of snapshot fields
+            interval (float): Seconds between samples
+        
+        Returns:
+            SensorSampler: The new sampler
+        """
+        sampler = SensorSampler(name, read_fn, interval, self.store)
+        self.samplers[name] = sampler
+        return sampler
+    
+    def start(self):
+        """Take one sample of every sensor, then start all threads"""
+        for sampler in self.samplers.values():
+            sampler.sample()
+        for sampler in self.samplers.values():
+            sampler.start()
+    
+    def stop(self):
+        """Stop all sampling threads"""
+        for sampler in self.samplers.values():
+            sampler._stop_event.set()
+        for sampler in self.samplers.values():
+            sampler.stop()
+    
+    def stale_sensors(self):
+        """
+        Get sensors whose latest sample is too old
+        
+        Returns:
+            list: Sensor names
+        """
+        ages = self.store.ages()
+        stale = set()
+        for field, age in ages.items():
+            sampler = self.samplers.get(self.store.source(field))
+            if sampler is not None and sampler.is_stale(age):
+                stale.add(sampler.name)
+        return sorted(stale)
+    
+    def print_report(self, histograms=False):
+        """
+        Print per-sensor read latency
+        
+        Args:
+            histograms (bool): Also print the latency histograms
+        """
+        print("\n" + "-" * 50)
+        print("Sensor sampling")
+        print("-" * 50)
+        for sampler in self.samplers.values():
+            p95 = sampler.latency.percentile(0.95)
+            print(f"{sampler.latency.format_line()}  p95<={p95:g} ms  "
+                  f"every {sampler.interval:g} s, overruns={sampler.overruns}")
+            if histograms and sampler.latency.count:
+                print(sampler.latency.format_histogram())
+        stale = self.stale_sensors()
+        if stale:
+            print(f"⚠ Stale: {', '.join(stale)}")
+        print("-" * 50 + "\n")
@@ -0,0 +1,1007 @@
+"""
+Hardware Simulation Module for AMLAC Robot
+Drop-in fakes for the Raspberry Pi libraries used by the robot, so main.py
+can run (and be load-tested/profiled) on a normal Linux machine.
+
+- Camera: frames from an image directory, a video file or synthetic water
+- GPS: replayed NMEA log or synthetic sentences, paced like a NEO-6M
+- Ultrasonic, IMU, load cell, color sensor, float switch: scripted CSV trace
+- Motors (GPIO/PWM) and LCD: recording sinks
+- Every device call sleeps for a latency model of the real part
+  (scaled by SIM_TIME_SCALE, 0 disables the delays)
+
+The fakes are selected by hardware.py. Run the robot in simulation with:
+    python simulation.py --iterations 2000 --time-scale 0 --loop-delay 0
+"""
+
+import bisect
+import collections
+import csv
+import math
+import os
+import random
+import threading
+import time
+import types
+import numpy as np
+import config
+
+# Device latency models: name -> (mean seconds, standard deviation)
+LATENCY_MODELS = {
+    'camera_capture': (0.035, 0.004),        # 640x480 still from the ISP
+    'i2c_transaction': (0.00012, 0.00002),   # Start/address/register at 400 kHz
+    'i2c_byte': (0.0000225, 0.0),            # 9 bits at 400 kHz
+    'tcs34725_integration': (0.0024, 0.0),   # Default 2.4 ms integration time
+    'hx711_sample': (0.1, 0.002),            # 10 samples per second
+    'lcd_clear': (0.002, 0.0001),            # HD44780 clear display
+    'ultrasonic_echo_delay': (0.0006, 0.0001),  # Trigger to echo start
+}
+
+# Trace values used when the trace file has no such column
+DEFAULT_TRACE_VALUES = {
+    'distance': 120.0,       # cm, None = no echo
+    'weight': 0.5,           # kg in the bin
+    'float_switch': 0,       # 1 = bin full
+    'pitch': 0.0,            # degrees
+    'roll': 0.0,             # degrees
+    'gyro_x': 0.0,           # degrees/s
+    'gyro_y': 0.0,
+    'gyro_z': 0.0,
+    'red': 40,               # TCS34725 RGB bytes
+    'green': 90,
+    'blue': 110,
+    'lat': 14.5995,          # Synthetic GPS position
+    'lon': 120.9842,
+    'speed_knots': 0.5,
+    'heading': 90.0,
+}
+
+SPEED_OF_SOUND_HALF = 17150.0  # cm/s, round trip (same constant as sensor_manager)
+
+
+def _env(name, default):
+    """Read a simulation setting from the environment, else config"""
+    value = os.environ.get(name)
+    return default if value in (None, '') else value
+
+
+class SensorTrace:
+    """
+    Scripted sensor values over time, loaded from CSV
+    First column 'time' (seconds since start), then any of the
+    DEFAULT_TRACE_VALUES columns. Values are held until the next row;
+    an empty cell means "no reading" (e.g. no ultrasonic echo).
+    """
+    
+    def __init__(self, path=None):
+        """
+        Initialize trace
+        
+        Args:
+            path (str): CSV trace file (None = defaults only)
+        """
+        self.path = path
+        self.times = []
+        self.rows = []
+        
+        if path:
+            with open(path, 'r', newline='') as f:
+                for row in csv.DictReader(f):
+                    self.times.append(float(row.pop('time')))
+                    self.rows.append({k: self._parse(v) for k, v in row.items()})
+            order = sorted(range(len(self.times)), key=self.times.__getitem__)
+            self.times = [self.times[i] for i in order]
+            self.rows = [self.rows[i] for i in order]
+    
+    @staticmethod
+    def _parse(value):
+        """Convert a CSV cell to float (None for empty cells)"""
+        value = value.strip()
+        return float(value) if value else None
+    
+    def value(self, name, elapsed):
+        """
+        Get a sensor value at a point in time
+        
+        Args:
+            name (str): Column name
+            elapsed (float): Seconds since the simulation started
+        
+        Returns:
+            float: Value (or None for no reading)
+        """
+        index = bisect.bisect_right(self.times, elapsed) - 1
+        if index >= 0 and name in self.rows[index]:
+            return self.rows[index][name]
+        return DEFAULT_TRACE_VALUES.get(name)
+
+
+class FrameSource:
+    """
+    Replays camera frames from an image directory or video file, or
+    generates a drifting synthetic water surface
+    """
+    
+    def __init__(self, path=None, size=(640, 480), seed=0):
+        """
+        Initialize frame source
+        
+        Args:
+            path (str): Image directory or video file (None = synthetic)
+            size (tuple): (width, height) of returned frames
+            seed (int): Seed for synthetic frames
+        """
+        self.path = path
+        self.size = size
+        self.index = 0
+        self._frames = []
+        self._video = None
+        self._rng = np.random.default_rng(seed)
+        
+        if path and os.path.isdir(path):
+            from PIL import Image
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
+                    image = Image.open(os.path.join(path, name)).convert('RGB')
+                    self._frames.append(np.array(image.resize(size)))
+            if not self._frames:
+                raise ValueError(f"No images found in {path}")
+        elif path:
+            try:
+                import cv2
+            except ImportError:
+                raise ValueError("Video replay needs OpenCV (pip install opencv-python-headless)")
+            self._cv2 = cv2
+            self._video = cv2.VideoCapture(path)
+            if not self._video.isOpened():
+                raise ValueError(f"Cannot open video {path}")
+        else:
+            # Smooth water-like texture with a few precomputed noise
+            # variants, drifted a little every frame (cheap per capture)
+            width, height = size
+            yy, xx = np.mgrid[0:height, 0:width]
+            ripple = 12 * np.sin(xx / 23.0) * np.cos(yy / 17.0)
+            base = np.stack([
+                40 + 20 * yy / height + ripple,
+                90 + 30 * xx / width + ripple,
+                110 + 20 * (xx + yy) / (width + height) + ripple,
+            ], axis=-1)
+            self._synthetic = [
+                np.clip(base + self._rng.normal(0, 3, base.shape), 0, 255).astype(np.uint8)
+                for _ in range(4)
+            ]
+    
+    def next_frame(self):
+        """
+        Get the next frame (loops at the end)
+        
+        Returns:
+            numpy.ndarray: uint8 RGB frame (height, width, 3)
+        """
+        self.index += 1
+        
+        if self._frames:
+            return self._frames[(self.index - 1) % len(self._frames)].copy()
+        
+        if self._video is not None:
+            ok, frame = self._video.read()
+            if not ok:
+                self._video.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self._video.read()
+            frame = self._cv2.resize(frame, self.size)
+            return self._cv2.cvtColor(frame, self._cv2.COLOR_BGR2RGB)
+        
+        variant = self._synthetic[self.index % len(self._synthetic)]
+        return np.roll(variant, self.index % self.size[0], axis=1)
+
+
+class SimulatedWorld:
+    """
+    Shared state of the simulation: clock, trace, latency models and
+    the recording sinks that the fake devices write into
+    """
+    
+    def __init__(self, frames_path=None, nmea_file=None, trace_file=None,
+                 time_scale=1.0, seed=0):
+        """
+        Initialize simulated world
+        
+        Args:
+            frames_path (str): Image directory or video file
+            nmea_file (str): NMEA log to replay
+            trace_file (str): CSV sensor trace
+            time_scale (float): Multiplier for device latencies
+            seed (int): Seed for jitter and noise
+        """
+        self.frames_path = frames_path
+        self.nmea_file = nmea_file
+        self.trace = SensorTrace(trace_file)
+        self.time_scale = time_scale
+        self.start_time = time.time()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.seed = seed
+        
+        # Recording sinks
+        self.gpio_events = collections.deque(maxlen=config.SIM_RECORD_LIMIT)
+        self.lcd_events = collections.deque(maxlen=config.SIM_RECORD_LIMIT)
+        self.device_calls = collections.Counter()
+        self.device_time = collections.Counter()
+    
+    @classmethod
+    def from_config(cls):
+        """Create the world from config, overridden by AMLAC_SIM_* environment variables"""
+        return cls(
+            frames_path=_env('AMLAC_SIM_FRAMES', config.SIM_FRAMES_PATH),
+            nmea_file=_env('AMLAC_SIM_NMEA', config.SIM_NMEA_FILE),
+            trace_file=_env('AMLAC_SIM_TRACE', config.SIM_TRACE_FILE),
+            time_scale=float(_env('AMLAC_SIM_TIME_SCALE', config.SIM_TIME_SCALE)),
+            seed=int(_env('AMLAC_SIM_SEED', config.SIM_SEED))
+        )
+    
+    def restart_clock(self):
+        """Restart trace time at zero (e.g. after slow device initialization)"""
+        self.start_time = time.time()
+    
+    @property
+    def elapsed(self):
+        """Seconds since the simulation started"""
+        return time.time() - self.start_time
+    
+    def value(self, name):
+        """Current trace value for a sensor"""
+        return self.trace.value(name, self.elapsed)
+    
+    def noise(self, sigma):
+        """Gaussian noise sample (thread-safe)"""
+        with self._rng_lock:
+            return self._rng.gauss(0.0, sigma)
+    
+    def delay(self, model, count=1):
+        """
+        Sleep for a device latency model
+        
+        Args:
+            model (str): Key of LATENCY_MODELS
+            count (int): Repetitions (e.g. bytes or samples)
+        """
+        mean, std = LATENCY_MODELS[model]
+        seconds = max(0.0, mean + self.noise(std)) * count * self.time_scale
+        self.device_calls[model] += 1
+        self.device_time[model] += seconds
+        if seconds > 0:
+            time.sleep(seconds)
+    
+    def print_summary(self):
+        """Print simulated device usage and recorded outputs"""
+        print("\nSimulation Summary")
+        print(f"  Elapsed: {self.elapsed:.1f} s, time scale {self.time_scale}")
+        for model in sorted(self.device_calls):
+            print(f"  {model:<24} {self.device_calls[model]:7d} calls "
+                  f"{self.device_time[model]:8.3f} s simulated latency")
+        print(f"  GPIO events recorded: {len(self.gpio_events)}")
+        print(f"  Stepper pulses: {GPIO.pulse_count(config.STEPPER_PUL)}")
+        print(f"  Paddle duty (L/R): {GPIO.duty_cycle(config.MOTOR1_ENA)}% / "
+              f"{GPIO.duty_cycle(config.MOTOR2_ENB)}%")
+        if self.lcd_events:
+            print(f"  LCD updates: {len(self.lcd_events)}, last: {self.lcd_events[-1][1]!r}")
+
+
+_world = None
+_world_lock = threading.Lock()
+
+
+def get_world():
+    """Get (or create from config) the shared simulated world"""
+    global _world
+    with _world_lock:
+        if _world is None:
+            _world = SimulatedWorld.from_config()
+        return _world
+
+
+def reset_world(**kwargs):
+    """
+    Replace the shared simulated world (tests and the runner)
+    
+    Args:
+        **kwargs: SimulatedWorld arguments (none = from config)
+    
+    Returns:
+        SimulatedWorld: New world
+    """
+    global _world
+    with _world_lock:
+        _world = SimulatedWorld(**kwargs) if kwargs else SimulatedWorld.from_config()
+        return _world
+
+
+# ===========================
+# RPi.GPIO
+# ===========================
+
+class _SimulatedPWM:
+    """Fake RPi.GPIO.PWM that records duty cycle changes"""
+    
+    def __init__(self, gpio, pin, frequency):
+        self._gpio = gpio
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = 0.0
+        self.running = False
+    
+    def start(self, duty_cycle):
+        self.running = True
+        self.ChangeDutyCycle(duty_cycle)
+    
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycle = float(duty_cycle)
+        self._gpio._record(self.pin, ('duty', self.duty_cycle))
+    
+    def ChangeFrequency(self, frequency):
+        self.frequency = frequency
+    
+    def stop(self):
+        self.running = False
+        self._gpio._record(self.pin, ('duty', 0.0))
+
+
+class _SimulatedGPIO:
+    """
+    Fake RPi.GPIO module
+    Outputs are recorded; inputs come from the trace (float switch) or the
+    ultrasonic echo model, which answers a trigger pulse with an echo whose
+    length matches the trace distance, in real time.
+    """
+    
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mode = None
+        self._levels = {}
+        self._pwms = {}
+        self._pulses = collections.Counter()
+        self._echo_window = None  # (start, end) of the current echo pulse
+        self._edge_callbacks = {}  # pin -> callbacks registered with add_event_detect
+    
+    def _record(self, pin, value):
+        get_world().gpio_events.append((time.time(), pin, value))
+    
+    def setmode(self, mode):
+        self._mode = mode
+    
+    def getmode(self):
+        return self._mode
+    
+    def setwarnings(self, flag):
+        pass
+    
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        pins = pin if isinstance(pin, (list, tuple)) else [pin]
+        for p in pins:
+            self._levels[p] = self.LOW if initial is None else initial
+    
+    def output(self, pin, value):
+        pins = pin if isinstance(pin, (list, tuple)) else [pin]
+        for p in pins:
+            with self._lock:
+                previous = self._levels.get(p, self.LOW)
+                self._levels[p] = int(bool(value))
+                if previous == self.LOW and value:
+                    self._pulses[p] += 1
+            self._record(p, int(bool(value)))
+            
+            # Falling edge of the trigger pulse fires an echo
+            if p == config.ULTRASONIC_TRIG and previous == self.HIGH and not value:
+                self._start_echo()
+    
+    def _start_echo(self):
+        """Schedule the echo pulse for the current trace distance"""
+        world = get_world()
+        distance = world.value('distance')
+        if distance is None:
+            self._echo_window = None  # No echo: sensor times out
+            return
+        
+        # Acoustic timing is physical (and the pulse length is the
+        # measurement itself), so neither is scaled by the time scale
+        mean, std = LATENCY_MODELS['ultrasonic_echo_delay']
+        start = time.time() + max(0.0002, mean + world.noise(std))
+        duration = max(0.0, distance + world.noise(0.3)) / SPEED_OF_SOUND_HALF
+        self._echo_window = (start, start + duration)
+        world.device_calls['ultrasonic_ping'] += 1
+        
+        if config.ULTRASONIC_ECHO in self._edge_callbacks:
+            threading.Thread(target=self._echo_edges, args=(self._echo_window,),
+                             name='sim-echo', daemon=True).start()
+    
+    def _echo_edges(self, window):
+        """Fire the echo pin's edge callbacks at the start and end of a pulse"""
+        for edge_time in window:
+            delay = edge_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            for callback in list(self._edge_callbacks.get(config.ULTRASONIC_ECHO, [])):
+                callback(config.ULTRASONIC_ECHO)
+    
+    def input(self, pin):
+        if pin == config.ULTRASONIC_ECHO:
+            window = self._echo_window
+            if window is None:
+                return self.LOW
+            now = time.time()
+            return self.HIGH if window[0] <= now < window[1] else self.LOW
+        
+        if pin == config.FLOAT_SWITCH:
+            return self.HIGH if get_world().value('float_switch') else self.LOW
+        
+        return self._levels.get(pin, self.LOW)
+    
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if pin in self._edge_callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self._edge_callbacks[pin] = [callback] if callback else []
+    
+    def add_event_callback(self, pin, callback):
+        self._edge_callbacks.setdefault(pin, []).append(callback)
+    
+    def remove_event_detect(self, pin):
+        self._edge_callbacks.pop(pin, None)
+    
+    def PWM(self, pin, frequency):
+        pwm = _SimulatedPWM(self, pin, frequency)
+        self._pwms[pin] = pwm
+        return pwm
+    
+    def cleanup(self, pin=None):
+        with self._lock:
+            self._levels.clear()
+            self._edge_callbacks.clear()
+    
+    # Inspection helpers for tests and summaries (not part of RPi.GPIO)
+    def pulse_count(self, pin):
+        """Number of rising edges written to an output pin"""
+        return self._pulses[pin]
+    
+    def duty_cycle(self, pin):
+        """Current PWM duty cycle of a pin"""
+        pwm = self._pwms.get(pin)
+        return pwm.duty_cycle if pwm else 0.0
+    
+    def level(self, pin):
+        """Last level written to a pin"""
+        return self._levels.get(pin, self.LOW)
+
+
+GPIO = _SimulatedGPIO()
+
+
+# ===========================
+# picamera2
+# ===========================
+
+class Picamera2:
+    """Fake picamera2.Picamera2 returning replayed or synthetic frames"""
+    
+    def __init__(self, camera_num=0):
+        self.size = (640, 480)
+        self.started = False
+        self._source = None
+    
+    def create_still_configuration(self, main=None, buffer_count=1, **kwargs):
+        return {'main': dict(main or {'size': self.size}), 'buffer_count': buffer_count}
+    
+    create_preview_configuration = create_still_configuration
+    create_video_configuration = create_still_configuration
+    
+    def configure(self, camera_config):
+        self.size = tuple(camera_config['main'].get('size', self.size))
+    
+    def start(self):
+        world = get_world()
+        self._source = FrameSource(world.frames_path, self.size, world.seed)
+        self.started = True
+    
+    def stop(self):
+        self.started = False
+    
+    def close(self):
+        self.stop()
+    
+    def capture_array(self, name='main'):
+        if not self.started:
+            raise RuntimeError("Camera not started")
+        get_world().delay('camera_capture')
+        return self._source.next_frame()
+
+
+# ===========================
+# smbus2 (MPU6050 registers)
+# ===========================
+
+class SMBus:
+    """
+    Fake smbus2.SMBus
+    Serves the MPU6050 data registers (0x3B-0x48) from the trace's pitch,
+    roll and gyro columns, and fills its FIFO (accel + gyro frames) at the
+    configured sample rate; other devices read back what was written.
+    """
+    
+    FIFO_SIZE = 1024
+    
+    def __init__(self, bus=1):
+        self.bus = bus
+        self._registers = collections.defaultdict(dict)
+        self._fifo = collections.deque()
+        self._fifo_enabled = False
+        self._fifo_time = 0.0
+    
+    def _mpu_block(self):
+        """MPU6050 registers 0x3B..0x48 (accel, temperature, gyro) as bytes"""
+        world = get_world()
+        pitch = math.radians(world.value('pitch'))
+        roll = math.radians(world.value('roll'))
+        
+        # Gravity vector that gives back this pitch/roll in sensor_manager
+        accel = (-math.cos(pitch) * math.sin(roll),
+                 math.sin(pitch),
+                 math.cos(pitch) * math.cos(roll))
+        raw = [a * 16384.0 + world.noise(40.0) for a in accel]
+        raw.append((25.0 - 36.53) * 340.0)  # 25 °C
+        raw += [world.value(axis) * 131.0 + world.noise(20.0)
+                for axis in ('gyro_x', 'gyro_y', 'gyro_z')]
+        
+        block = []
+        for value in raw:
+            value = int(max(-32768, min(32767, round(value)))) & 0xFFFF
+            block += [value >> 8, value & 0xFF]
+        return block
+    
+    def _fill_fifo(self):
+        """Add the frames sampled since the last FIFO access"""
+        if not self._fifo_enabled:
+            return
+        registers = self._registers[config.MPU6050_I2C_ADDRESS]
+        rate = 1000.0 / (1 + registers.get(0x19, 0))  # SMPLRT_DIV, DLPF on
+        now = time.monotonic()
+        frames = int((now - self._fifo_time) * rate)
+        self._fifo_time += frames / rate
+        
+        # When full, the oldest bytes are overwritten (frames lose alignment)
+        for _ in range(min(frames, self.FIFO_SIZE // 12 + 1)):
+            block = self._mpu_block()
+            self._fifo.extend(block[0:6] + block[8:14])
+        while len(self._fifo) > self.FIFO_SIZE:
+            self._fifo.popleft()
+    
+    def read_i2c_block_data(self, address, register, length):
+        world = get_world()
+        world.delay('i2c_transaction')
+        world.delay('i2c_byte', length)
+        
+        if address == config.MPU6050_I2C_ADDRESS and 0x3B <= register <= 0x48:
+            offset = register - 0x3B
+            return self._mpu_block()[offset:offset + length]
+        
+        if address == config.MPU6050_I2C_ADDRESS and register == 0x72:
+            self._fill_fifo()
+            count = len(self._fifo)
+            return [count >> 8, count & 0xFF][:length]
+        
+        if address == config.MPU6050_I2C_ADDRESS and register == 0x74:
+            return [self._fifo.popleft() if self._fifo else 0 for _ in range(length)]
+        
+        registers = self._registers[address]
+        return [registers.get(register + i, 0) for i in range(length)]
+    
+    def read_byte_data(self, address, register):
+        if address == config.MPU6050_I2C_ADDRESS and register == 0x75:
+            get_world().delay('i2c_transaction')
+            return 0x68  # WHO_AM_I
+        return self.read_i2c_block_data(address, register, 1)[0]
+    
+    def write_byte_data(self, address, register, value):
+        get_world().delay('i2c_transaction')
+        self._registers[address][register] = value & 0xFF
+        
+        if address == config.MPU6050_I2C_ADDRESS and register == 0x6A:  # USER_CTRL
+            if value & 0x04:  # FIFO_RESET
+                self._fifo.clear()
+            enabled = bool(value & 0x40)
+            if enabled and not self._fifo_enabled:
+                self._fifo_time = time.monotonic()
+            self._fifo_enabled = enabled
+    
+    def write_byte(self, address, value):
+        world = get_world()
+        world.delay('i2c_transaction')
+        world.delay('i2c_byte')
+    
+    def close(self):
+        pass
+
+
+# ===========================
+# board / busio / adafruit_tcs34725
+# ===========================
+
+board = types.SimpleNamespace(SCL='SCL', SDA='SDA')
+
+
+class _SimulatedI2C:
+    """Fake busio.I2C"""
+    
+    def __init__(self, scl, sda, frequency=100000):
+        self.scl = scl
+        self.sda = sda
+        self.frequency = frequency
+        self._locked = False
+    
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+    
+    def unlock(self):
+        self._locked = False
+    
+    def deinit(self):
+        pass
+
+
+busio = types.SimpleNamespace(I2C=_SimulatedI2C)
+
+
+class _SimulatedTCS34725:
+    """Fake adafruit_tcs34725.TCS34725 reading RGB from the trace"""
+    
+    def __init__(self, i2c, address=0x29):
+        self.i2c = i2c
+        self.address = address
+        self.integration_time = 2.4
+        self.gain = 4
+    
+    @property
+    def color_rgb_bytes(self):
+        world = get_world()
+        world.delay('tcs34725_integration')
+        
+        # Clear, red, green and blue are separate 16-bit register reads,
+        # each locked by adafruit_bus_device
+        for _ in range(4):
+            while not self.i2c.try_lock():
+                time.sleep(0)
+            try:
+                world.delay('i2c_transaction')
+                world.delay('i2c_byte', 2)
+            finally:
+                self.i2c.unlock()
+        return tuple(int(max(0, min(255, world.value(c) + world.noise(1.5))))
+                     for c in ('red', 'green', 'blue'))
+    
+    @property
+    def lux(self):
+        r, g, b = self.color_rgb_bytes
+        return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+adafruit_tcs34725 = types.SimpleNamespace(TCS34725=_SimulatedTCS34725)
+
+
+# ===========================
+# hx711
+# ===========================
+
+class HX711:
+    """Fake hx711.HX711 load cell reading the bin weight from the trace"""
+    
+    def __init__(self, dout_pin, pd_sck_pin, gain=128, channel='A'):
+        self.dout_pin = dout_pin
+        self.pd_sck_pin = pd_sck_pin
+        self.scale_ratio = 1.0
+        self.offset_grams = 0.0
+    
+    def set_scale_ratio(self, scale_ratio):
+        self.scale_ratio = scale_ratio
+    
+    def _grams(self):
+        return get_world().value('weight') * 1000.0 + get_world().noise(2.0)
+    
+    def get_raw_data_mean(self, readings=30):
+        get_world().delay('hx711_sample', readings)
+        return sum(self._grams() for _ in range(readings)) / readings * self.scale_ratio
+    
+    def get_weight_mean(self, readings=30):
+        get_world().delay('hx711_sample', readings)
+        grams = sum(self._grams() for _ in range(readings)) / readings
+        return grams - self.offset_grams
+    
+    def zero(self, readings=30):
+        get_world().delay('hx711_sample', readings)
+        self.offset_grams = sum(self._grams() for _ in range(readings)) / readings
+        return False  # hx711 returns False on success
+
+
+# ===========================
+# RPLCD
+# ===========================
+
+class CharLCD:
+    """
+    Fake RPLCD.i2c.CharLCD that records what is shown
+    Every HD44780 byte goes to the PCF8574 as four I2C writes (two nibbles,
+    each strobed high then low) on its own SMBus handle, like RPLCD.
+    """
+    
+    def __init__(self, i2c_expander='PCF8574', address=0x27, port=1,
+                 cols=16, rows=2, **kwargs):
+        self.address = address
+        self.cols = cols
+        self.rows = rows
+        self.backlight_enabled = True
+        self._port = port
+        self._lines = [''] * rows
+        self._row = 0
+        
+        # Same order as RPLCD: open the bus, then the HD44780 init sequence
+        self._init_connection()
+        for command in (0x33, 0x32, 0x28, 0x0C):  # 4-bit mode, 2 lines, display on
+            self._send(command)
+        self.clear()
+        self._send(0x06)  # Entry mode: cursor moves right
+    
+    def _init_connection(self):
+        self.bus = SMBus(self._port)
+    
+    def _send(self, value):
+        """One HD44780 byte in 4-bit mode"""
+        for nibble in (value & 0xF0, (value << 4) & 0xF0):
+            self.bus.write_byte(self.address, nibble | 0x0C)  # Enable high
+            self.bus.write_byte(self.address, nibble | 0x08)  # Enable low
+    
+    def clear(self):
+        self._send(0x01)
+        get_world().delay('lcd_clear')
+        self._lines = [''] * self.rows
+        self._row = 0
+    
+    def crlf(self):
+        self._send(0xC0)  # Cursor to the second line
+        self._row = min(self._row + 1, self.rows - 1)
+    
+    @property
+    def cursor_pos(self):
+        return (self._row, len(self._lines[self._row]))
+    
+    @cursor_pos.setter
+    def cursor_pos(self, pos):
+        self._row = pos[0]
+    
+    def write_string(self, text):
+        world = get_world()
+        for char in text:
+            self._send(ord(char) & 0xFF)
+        self._lines[self._row] = (self._lines[self._row] + text)[:self.cols]
+        world.lcd_events.append((time.time(), ' | '.join(self._lines)))
+    
+    def close(self, clear=False):
+        if clear:
+            self.clear()
+
+
+# ===========================
+# pyserial (NEO-6M GPS)
+# ===========================
+
+def _nmea_checksum(body):
+    """XOR checksum of an NMEA sentence body (between $ and *)"""
+    checksum = 0
+    for char in body:
+        checksum ^= ord(char)
+    return f"{checksum:02X}"
+
+
+def _nmea_coordinate(value, positive, negative, degree_digits):
+    """Format decimal degrees as NMEA ddmm.mmmm plus hemisphere"""
+    hemisphere = positive if value >= 0 else negative
+    value = abs(value)
+    degrees = int(value)
+    minutes = (value - degrees) * 60.0
+    return f"{degrees:0{degree_digits}d}{minutes:07.4f}", hemisphere
+
+
+def synthetic_nmea_burst(world):
+    """
+    Build one second of NEO-6M output (RMC, VTG, GGA) from the trace position
+    
+    Args:
+        world (SimulatedWorld): Simulation state
+    
+    Returns:
+        list: NMEA sentences without line endings
+    """
+    now = time.gmtime()
+    stamp = time.strftime('%H%M%S', now) + '.00'
+    date = time.strftime('%d%m%y', now)
+    lat, lat_h = _nmea_coordinate(world.value('lat'), 'N', 'S', 2)
+    lon, lon_h = _nmea_coordinate(world.value('lon'), 'E', 'W', 3)
+    knots = world.value('speed_knots')
+    heading = world.value('heading')
+    
+    bodies = [
+        f"GPRMC,{stamp},A,{lat},{lat_h},{lon},{lon_h},{knots:.3f},{heading:.2f},{date},,,A",
+        f"GPVTG,{heading:.2f},T,,M,{knots:.3f},N,{knots * 1.852:.3f},K,A",
+        f"GPGGA,{stamp},{lat},{lat_h},{lon},{lon_h},1,08,0.9,5.0,M,46.9,M,,",
+    ]
+    return [f"${body}*{_nmea_checksum(body)}" for body in bodies]
+
+
+class _SimulatedSerial:
+    """
+    Fake serial.Serial for the GPS UART
+    Replays an NMEA log (or synthetic sentences) in bursts every
+    SIM_GPS_PERIOD seconds, with per-character time at the configured baud.
+    """
+    
+    def __init__(self, port=None, baudrate=9600, timeout=None, **kwargs):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.is_open = True
+        self._world = get_world()
+        self._pending = collections.deque()
+        self._next_burst = time.time()
+        self._log_lines = None
+        self._log_index = 0
+        
+        if self._world.nmea_file:
+            with open(self._world.nmea_file, 'r', errors='ignore') as f:
+                self._log_lines = [line.strip() for line in f if line.strip()]
+            if not self._log_lines:
+                raise ValueError(f"No NMEA sentences in {self._world.nmea_file}")
+            self._burst_start = self._log_lines[0].split(',')[0]
+    
+    def _next_burst_lines(self):
+        """One burst of sentences from the log (up to the next cycle start) or synthetic"""
+        if self._log_lines is None:
+            return synthetic_nmea_burst(self._world)
+        
+        lines = []
+        while True:
+            line = self._log_lines[self._log_index]
+            if lines and line.split(',')[0] == self._burst_start:
+                break
+            lines.append(line)
+            self._log_index = (self._log_index + 1) % len(self._log_lines)
+            if self._log_index == 0:
+                break
+        return lines
+    
+    def readline(self):
+        if not self.is_open:
+            raise RuntimeError("Port not open")
+        
+        if not self._pending:
+            # Idle line until the next burst (returns empty on timeout)
+            wait = self._next_burst - time.time()
+            if wait > 0:
+                if self.timeout is not None and wait > self.timeout:
+                    time.sleep(self.timeout)
+                    return b''
+                time.sleep(wait)
+            self._pending.extend(self._next_burst_lines())
+            self._next_burst = max(self._next_burst, time.time()) + config.SIM_GPS_PERIOD
+        
+        line = (self._pending.popleft() + '\r\n').encode('ascii')
+        char_time = 10.0 / self.baudrate * len(line) * self._world.time_scale
+        if char_time > 0:
+            time.sleep(char_time)
+        return line
+    
+    @property
+    def in_waiting(self):
+        return sum(len(line) + 2 for line in self._pending)
+    
+    def reset_input_buffer(self):
+        self._pending.clear()
+    
+    def write(self, data):
+        return len(data)
+    
+    def close(self):
+        self.is_open = False
+
+
+serial = types.SimpleNamespace(Serial=_SimulatedSerial, SerialException=IOError)
+
+
+# ===========================
+# Runner
+# ===========================
+
+def run_simulation(iterations, profile_path=None):
+    """
+    Run the full robot control loop on simulated hardware
+    
+    Args:
+        iterations (int): Main loop iterations before shutdown
+        profile_path (str): Write cProfile stats here (None = no profiling)
+    
+    Returns:
+        AMLACRobot: The robot after shutdown (for inspection)
+    """
+    from main import AMLACRobot
+    
+    world = get_world()
+    robot = AMLACRobot()
+    
+    # Trace time starts with the control loop, not with initialization
+    world.restart_clock()
+    start = time.time()
+    if profile_path:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.runcall(robot.run, max_iterations=iterations)
+        profiler.dump_stats(profile_path)
+        pstats.Stats(profile_path).sort_stats('cumulative').print_stats(25)
+    else:
+        robot.run(max_iterations=iterations)
+    duration = time.time() - start
+    
+    world.print_summary()
+    print(f"  Loop: {iterations} iterations in {duration:.1f} s "
+          f"({iterations / duration if duration else 0.0:.1f} it/s)")
+    
+    return robot
+
+
+if __name__ == "__main__":
+    """Run main.py's control loop against simulated hardware"""
+    import argparse
+    import tempfile
+    
+    parser = argparse.ArgumentParser(description="AMLAC robot hardware simulation")
+    parser.add_argument('--iterations', type=int, default=100, help="Main loop iterations")
+    parser.add_argument('--frames', help="Image directory or video file")
+    parser.add_argument('--nmea', help="NMEA log to replay")
+    parser.add_argument('--trace', help="CSV sensor trace")
+    parser.add_argument('--time-scale', type=float, help="Device latency multiplier (0 = none)")
+    parser.add_argument('--loop-delay', type=float, help="Override MAIN_LOOP_DELAY (seconds)")
+    parser.add_argument('--model', help="Override MODEL_PATH")
+    parser.add_argument('--log', help="Override LOG_FILE_PATH (default: temporary file)")
+    parser.add_argument('--profile', help="Write cProfile stats to this file")
+    args = parser.parse_args()
+    
+    os.environ['AMLAC_SIMULATION'] = '1'
+    for name, value in (('AMLAC_SIM_FRAMES', args.frames), ('AMLAC_SIM_NMEA', args.nmea),
+                        ('AMLAC_SIM_TRACE', args.trace), ('AMLAC_SIM_TIME_SCALE', args.time_scale)):
+        if value is not None:
+            os.environ[name] = str(value)
+    
+    if args.loop_delay is not None:
+        config.MAIN_LOOP_DELAY = args.loop_delay
+    if args.model:
+        config.MODEL_PATH = args.model
+    config.LOG_FILE_PATH = args.log or os.path.join(
+        tempfile.mkdtemp(prefix='amlac_sim_'), 'collection_log.csv'
+    )
+    
+    print("=== AMLAC Hardware Simulation ===\n")
+    
+    # Run through the importable module so hardware.py shares its world
+    import simulation
+    simulation.run_simulation(args.iterations, args.profile)
@@ -0,0 +1,316 @@
+"""
+Spatial Index Module for AMLAC Robot
+Grid index over logged detections for "where is the algae" queries:
+bounding box, radius and heat-map bins, plus the nearest dense cell to
+steer toward.
+
+Positions are projected onto a local flat grid (equirectangular around a
+reference latitude), which is accurate to well under a metre over the few
+kilometres a collection run covers. Each cell keeps scan/detection counters
+and the detection points inside it, so a query only looks at the cells its
+area touches.
+
+Usage:
+    index = logger.get_spatial_index()   # built once, then updated as rows are logged
+    index.radius(14.5995, 120.9842, 25)
+    index.nearest_dense(lat, lon, min_detections=5)
+"""
+
+import math
+import threading
+import config
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two GPS positions
+    
+    Args:
+        lat1, lon1 (float): First position in degrees
+        lat2, lon2 (float): Second position in degrees
+    
+    Returns:
+        float: Distance in metres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def _number(value):
+    """Parse a logged coordinate, None for N/A"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+class SpatialIndex:
+    """
+    Uniform grid over logged scans and detections
+    """
+    
+    def __init__(self, cell_size_m=None, reference_lat=None):
+        """
+        Initialize an empty index
+        
+        Args:
+            cell_size_m (float): Grid cell size in metres (default from config)
+            reference_lat (float): Latitude for the longitude scale (default:
+                                   first logged position)
+        """
+        self.cell_size_m = config.SPATIAL_CELL_SIZE_M if cell_size_m is None else cell_size_m
+        self.reference_lat = reference_lat
+        self._lock = threading.Lock()
+        
+        # (row, col) -> {'scans', 'detections', 'confidence_sum', 'points'}
+        self.cells = {}
+        self.total_points = 0
+        
+        if reference_lat is not None:
+            self._set_reference(reference_lat)
+    
+    def _set_reference(self, lat):
+        """Fix the grid scale (degrees per cell) at a latitude"""
+        self.reference_lat = lat
+        self._lat_step = self.cell_size_m / METERS_PER_DEGREE
+        self._lon_step = self._lat_step / max(0.01, math.cos(math.radians(lat)))
+    
+    def _cell(self, lat, lon):
+        """Grid cell of a position"""
+        return (math.floor(lat / self._lat_step), math.floor(lon / self._lon_step))
+    
+    def add(self, lat, lon, detected, confidence=0.0):
+        """
+        Add one scan position
+        
+        Args:
+            lat, lon (float): GPS position in degrees
+            detected (bool): Algae detected at this position
+            confidence (float): Detection confidence
+        """
+        with self._lock:
+            if self.reference_lat is None:
+                self._set_reference(lat)
+            key = self._cell(lat, lon)
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = {'scans': 0, 'detections': 0, 'confidence_sum': 0.0, 'points': []}
+                self.cells[key] = cell
+            
+            cell['scans'] += 1
+            if detected:
+                cell['detections'] += 1
+                cell['confidence_sum'] += confidence
+                cell['points'].append((lat, lon, confidence))
+                self.total_points += 1
+    
+    def add_rows(self, rows):
+        """
+        Add log rows (LOG_HEADERS order); events and rows without a GPS fix
+        are skipped. Used as a DataLogger write callback.
+        
+        Args:
+            rows (list): CSV-style log rows
+        """
+        for row in rows:
+            if len(row) < 5 or row[1] not in ('Yes', 'No'):
+                continue
+            lat, lon = _number(row[3]), _number(row[4])
+            if lat is None or lon is None:
+                continue
+            self.add(lat, lon, row[1] == 'Yes', _number(row[2]) or 0.0)
+    
+    def _cells_in_box(self, min_lat, min_lon, max_lat, max_lon):
+        """Occupied cells overlapping a box (lock held)"""
+        row_lo, col_lo = self._cell(min_lat, min_lon)
+        row_hi, col_hi = self._cell(max_lat, max_lon)
+        
+        # Sparse grids: walking the occupied cells beats walking the box
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(self.cells):
+            return [(key, cell) for key, cell in self.cells.items()
+                    if row_lo <= key[0] <= row_hi and col_lo <= key[1] <= col_hi]
+        
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                cell = self.cells.get((row, col))
+                if cell is not None:
+                    found.append(((row, col), cell))
+        return found
+    
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Detections inside a bounding box
+        
+        Args:
+            min_lat, min_lon (float): South-west corner
+            max_lat, max_lon (float): North-east corner
+        
+        Returns:
+            list: (lat, lon, confidence) tuples
+        """
+        with self._lock:
+            if self.reference_lat is None:
+                return []
+            return [
+                point
+                for _, cell in self._cells_in_box(min_lat, min_lon, max_lat, max_lon)
+                for point in cell['points']
+                if min_lat <= point[0] <= max_lat and min_lon <= point[1] <= max_lon
+            ]
+    
+    def radius(self, lat, lon, radius_m):
+        """
+        Detections within a distance of a position, nearest first
+        
+        Args:
+            lat, lon (float): Centre position
+            radius_m (float): Search radius in metres
+        
+        Returns:
+            list: (distance_m, lat, lon, confidence) tuples
+        """
+        with self._lock:
+            if self.reference_lat is None:
+                return []
+            dlat = radius_m / METERS_PER_DEGREE
+            dlon = dlat / max(0.01, math.cos(math.radians(lat)))
+            cells = self._cells_in_box(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+            
+            found = []
+            for _, cell in cells:
+                for p_lat, p_lon, confidence in cell['points']:
+                    d = distance_m(lat, lon, p_lat, p_lon)
+                    if d <= radius_m:
+                        found.append((d, p_lat, p_lon, confidence))
+        
+        found.sort()
+        return found
+    
+    def heatmap(self, bin_size_m=None, bounds=None):
+        """
+        Scan and detection counts per bin, densest first
+        
+        Args:
+            bin_size_m (float): Bin size in metres, a multiple of the cell
+                                size (default: one cell)
+            bounds (tuple): Optional (min_lat, min_lon, max_lat, max_lon)
+        
+        Returns:
+            list: dicts with lat, lon (bin centre), scans, detections,
+                  detection_rate and average_confidence
+        """
+        factor = max(1, round((bin_size_m or self.cell_size_m) / self.cell_size_m))
+        
+        with self._lock:
+            if self.reference_lat is None:
+                return []
+            cells = self._cells_in_box(*bounds) if bounds else list(self.cells.items())
+            
+            bins = {}
+            for (row, col), cell in cells:
+                key = (row // factor, col // factor)
+                b = bins.setdefault(key, {'scans': 0, 'detections': 0, 'confidence_sum': 0.0})
+                b['scans'] += cell['scans']
+                b['detections'] += cell['detections']
+                b['confidence_sum'] += cell['confidence_sum']
+            
+            result = []
+            for (row, col), b in bins.items():
+                center_lat = (row + 0.5) * factor * self._lat_step
+                center_lon = (col + 0.5) * factor * self._lon_step
+                result.append({
+                    'lat': center_lat,
+                    'lon': center_lon,
+                    'scans': b['scans'],
+                    'detections': b['detections'],
+                    'detection_rate': b['detections'] / b['scans'] if b['scans'] else 0.0,
+                    'average_confidence': (b['confidence_sum'] / b['detections']
+                                           if b['detections'] else 0.0)
+                })
+        
+        result.sort(key=lambda b: (b['detections'], b['average_confidence']), reverse=True)
+        return result
+    
+    def densest(self, count=5, bin_size_m=None):
+        """
+        Bins with the most detections
+        
+        Args:
+            count (int): Number of bins
+            bin_size_m (float): Bin size in metres (default: one cell)
+        
+        Returns:
+            list: Heat-map bins, see heatmap()
+        """
+        return self.heatmap(bin_size_m)[:count]
+    
+    def nearest_dense(self, lat, lon, min_detections=None, max_distance_m=None):
+        """
+        Closest cell with at least min_detections, a target to steer toward
+        
+        Args:
+            lat, lon (float): Current position
+            min_detections (int): Minimum detections in a cell (default from config)
+            max_distance_m (float): Ignore cells further than this (None = any)
+        
+        Returns:
+            dict: Heat-map bin plus 'distance_m', or None
+        """
+        if min_detections is None:
+            min_detections = config.SPATIAL_DENSE_MIN_DETECTIONS
+        
+        best = None
+        for b in self.heatmap():
+            if b['detections'] < min_detections:
+                break  # Sorted by detections
+            d = distance_m(lat, lon, b['lat'], b['lon'])
+            if (max_distance_m is None or d <= max_distance_m) and (best is None or d < best['distance_m']):
+                best = dict(b, distance_m=d)
+        return best
+    
+    def print_summary(self, count=5):
+        """Print index size and the densest cells"""
+        with self._lock:
+            scans = sum(c['scans'] for c in self.cells.values())
+        print(f"Spatial index: {len(self.cells)} cells of {self.cell_size_m:g} m, "
+              f"{scans} scans, {self.total_points} detections")
+        for b in self.densest(count):
+            print(f"  {b['lat']:.6f}, {b['lon']:.6f}: {b['detections']} detections "
+                  f"({b['detection_rate']:.0%} of scans, avg {b['average_confidence']:.0%})")
+
+
+if __name__ == "__main__":
+    """Build the index from the robot's log and print the densest areas"""
+    import argparse
+    import time
+    from data_logger import DataLogger
+    
+    parser = argparse.ArgumentParser(description='AMLAC detection map')
+    parser.add_argument('--log', default=None, help='Log file (default: config.LOG_FILE_PATH)')
+    parser.add_argument('--top', type=int, default=10, help='Densest cells to print')
+    parser.add_argument('--near', nargs=2, type=float, metavar=('LAT', 'LON'),
+                        help='Also print the nearest dense cell to this position')
+    args = parser.parse_args()
+    
+    logger = DataLogger(log_file_path=args.log)
+    start = time.perf_counter()
+    index = logger.get_spatial_index()
+    print(f"Index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    index.print_summary(args.top)
+    
+    if args.near:
+        target = index.nearest_dense(*args.near)
+        if target:
+            print(f"Nearest dense cell: {target['lat']:.6f}, {target['lon']:.6f} "
+                  f"({target['distance_m']:.0f} m, {target['detections']} detections)")
+        else:
+            print("No dense cell found")
+    logger.close()
@@ -0,0 +1,217 @@
+"""
+Stepper Driver Module for AMLAC Robot
+Generates the TB6600 step pulse train on a dedicated thread, so a conveyor
+cycle runs while the main loop keeps scanning.
+
+Every step is scheduled against an absolute deadline measured from the start
+of the move (time.perf_counter). A late wake-up shortens the next gap instead
+of pushing all following steps back, so jitter does not accumulate and a move
+takes its planned time. Moves follow a trapezoidal profile: STEPPER_START_SPEED
+up to the target speed at STEPPER_ACCELERATION, and back down before the end.
+
+Usage:
+    driver = StepperDriver()
+    driver.start(2000, 'forward', speed=1000)
+    driver.progress            # 0.0 - 1.0, while the main loop keeps running
+    driver.wait(timeout=5)     # or driver.cancel()
+"""
+
+import threading
+import time
+import numpy as np
+import config
+from hardware import GPIO
+from latency_stats import LatencyStats
+
+_START_DELAY = 0.001  # Seconds between setting DIR and the first step (TB6600 needs > 5 µs)
+
+
+def step_schedule(steps, speed, start_speed=None, acceleration=None):
+    """
+    Step times of a trapezoidal move
+    
+    Args:
+        steps (int): Number of steps
+        speed (float): Cruise speed in steps/s
+        start_speed (float): Speed of the first/last step (default from config)
+        acceleration (float): Steps/s² (default from config, 0 = no ramp)
+    
+    Returns:
+        numpy.ndarray: Offset of each step from the start of the move, in seconds
+    """
+    if start_speed is None:
+        start_speed = config.STEPPER_START_SPEED
+    if acceleration is None:
+        acceleration = config.STEPPER_ACCELERATION
+    if steps <= 0:
+        return np.zeros(0)
+    
+    index = np.arange(steps, dtype=np.float64)
+    if acceleration and start_speed < speed:
+        # v² = v0² + 2·a·s, from both ends of the move
+        up = np.sqrt(start_speed ** 2 + 2 * acceleration * index)
+        down = np.sqrt(start_speed ** 2 + 2 * acceleration * (steps - 1 - index))
+        speeds = np.minimum(speed, np.minimum(up, down))
+    else:
+        speeds = np.full(steps, float(speed))
+    
+    offsets = np.empty(steps)
+    offsets[0] = 0.0
+    np.cumsum(1.0 / speeds[:-1], out=offsets[1:])
+    return offsets
+
+
+class StepperDriver:
+    """
+    Background pulse generator for the TB6600 stepper driver
+    """
+    
+    def __init__(self, pul_pin=None, dir_pin=None, pulse_width=None):
+        """
+        Initialize driver (pins must already be set up as outputs)
+        
+        Args:
+            pul_pin (int): Step pulse pin (default from config)
+            dir_pin (int): Direction pin (default from config)
+            pulse_width (float): Seconds PUL is held HIGH (default from config)
+        """
+        self.pul_pin = config.STEPPER_PUL if pul_pin is None else pul_pin
+        self.dir_pin = config.STEPPER_DIR if dir_pin is None else dir_pin
+        self.pulse_width = config.STEPPER_PULSE_WIDTH if pulse_width is None else pulse_width
+        
+        self._thread = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._done.set()
+        
+        self.total_steps = 0
+        self.steps_done = 0
+        self.completed = True  # False if the last move was cancelled
+        self.lateness = LatencyStats('step lateness')
+    
+    @property
+    def busy(self):
+        """True while a move (or its hold time) is running"""
+        return not self._done.is_set()
+    
+    @property
+    def progress(self):
+        """Fraction of the current/last move's steps sent (0.0 - 1.0)"""
+        if not self.total_steps:
+            return 1.0
+        return self.steps_done / self.total_steps
+    
+    def start(self, steps, direction='forward', speed=None, start_speed=None,
+              acceleration=None, hold=0.0, on_done=None):
+        """
+        Start a move and return immediately; a running move is cancelled first
+        
+        Args:
+            steps (int): Number of steps
+            direction (str): 'forward' or 'backward'
+            speed (float): Cruise speed in steps/s (default from config)
+            start_speed (float): Ramp start/end speed (default from config)
+            acceleration (float): Steps/s² (default from config, 0 = no ramp)
+            hold (float): Seconds to stay busy after the last step
+            on_done (callable): Called from the driver thread as on_done(completed)
+        """
+        if speed is None:
+            speed = config.STEPPER_SPEED
+        
+        self.cancel()
+        
+        offsets = step_schedule(steps, speed, start_speed, acceleration)
+        GPIO.output(self.dir_pin, GPIO.HIGH if direction == 'forward' else GPIO.LOW)
+        
+        self.total_steps = len(offsets)
+        self.steps_done = 0
+        self.completed = False
+        self.lateness.reset()
+        self._cancel.clear()
+        self._done.clear()
+        
+        self._thread = threading.Thread(target=self._run, args=(offsets, hold, on_done),
+                                        name='stepper', daemon=True)
+        self._thread.start()
+    
+    def _run(self, offsets, hold, on_done):
+        """
+        Send the pulse train (driver thread)
+        
+        Args:
+            offsets (numpy.ndarray): Step times from step_schedule()
+            hold (float): Seconds to stay busy after the last step
+            on_done (callable): Completion callback
+        """
+        pul_pin = self.pul_pin
+        pulse_width = self.pulse_width
+        clock = time.perf_counter
+        
+        try:
+            t0 = clock() + _START_DELAY
+            for offset in offsets.tolist():
+                if self._cancel.is_set():
+                    break
+                
+                deadline = t0 + offset
+                remaining = deadline - clock()
+                if remaining > 0:
+                    time.sleep(remaining)
+                
+                now = clock()
+                GPIO.output(pul_pin, GPIO.HIGH)
+                while clock() - now < pulse_width:
+                    pass
+                GPIO.output(pul_pin, GPIO.LOW)
+                
+                self.lateness.record(now - deadline)
+                self.steps_done += 1
+            
+            if hold and not self._cancel.is_set():
+                self._cancel.wait(hold)
+            
+            self.completed = not self._cancel.is_set()
+        
+        except Exception as e:
+            print(f"⚠ Stepper error: {e}")
+        
+        finally:
+            if on_done:
+                try:
+                    on_done(self.completed)
+                except Exception as e:
+                    print(f"⚠ Stepper callback error: {e}")
+            self._done.set()
+    
+    def wait(self, timeout=None):
+        """
+        Wait for the current move to finish
+        
+        Args:
+            timeout (float): Max seconds to wait (None = forever)
+        
+        Returns:
+            bool: True if no move is running any more
+        """
+        return self._done.wait(timeout)
+    
+    def cancel(self):
+        """
+        Stop the current move after the step in progress
+        
+        Returns:
+            int: Steps sent before the move stopped
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._cancel.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        return self.steps_done
+    
+    def print_stats(self):
+        """Print progress and step timing of the current/last move"""
+        state = 'running' if self.busy else ('complete' if self.completed else 'cancelled')
+        print(f"Stepper: {self.steps_done}/{self.total_steps} steps ({state})")
+        if self.lateness.count:
+            print(self.lateness.format_line())
@@ -14,10 +14,12 @@ import sys
 import numpy as np
 from PIL import Image
 import tensorflow as tf
+from model_metadata import load_model_metadata, positive_class_score_fn
 
 # Model path
 MODEL_PATH = 'models/model.tflite'
 CONFIDENCE_THRESHOLD = 0.5  # Lower threshold for one-class model (synthetic negatives)
+METADATA = load_model_metadata(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
 
 def load_tflite_model(model_path):
     """Load TensorFlow Lite model"""
@@ -83,6 +85,10 @@ def predict_image(interpreter, input_details, output_details, image_array):
     # Get prediction (binary classification: 0=algae, 1=no_algae)
     prediction = float(output_data[0][0])
     
+    # Class order and activation from the metadata sidecar (train_model.py)
+    if METADATA:
+        return positive_class_score_fn(METADATA)(output_data[0]), prediction
+    
     # Model output interpretation:
     # - Output is sigmoid: 0.0 to 1.0
     # - Class 0 (algae): output close to 0.0
@@ -10,12 +10,18 @@ Usage:
 1. Put algae images in: Algae/
 2. Run: python train_model.py
 3. Output: models/model.tflite
+
+Options:
+    --int8          Also export a full-integer (uint8 in/out) model
+    --export-int8   Only export the INT8 model from the saved Keras model
 """
 
 import os
 import sys
 import random
 import shutil
+import hashlib
+from datetime import datetime
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -25,6 +31,7 @@ from tensorflow.keras.applications import MobileNetV3Large
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
 import matplotlib.pyplot as plt
+from model_metadata import save_model_metadata
 
 # Configuration
 IMAGE_SIZE = 224  # MobileNetV3 input size
@@ -42,6 +49,14 @@ TEST_DIR = os.path.join(DATASET_DIR, 'test')
 # Output paths
 MODEL_SAVE_PATH = 'models/algae_classifier.h5'
 TFLITE_SAVE_PATH = 'models/model.tflite'
+TFLITE_INT8_SAVE_PATH = 'models/model_int8.tflite'
+
+# Number of training images used to calibrate INT8 quantization
+REPRESENTATIVE_SAMPLES = 200
+
+# Written to the model metadata sidecar
+POSITIVE_CLASS = 'algae'
+CONFIDENCE_THRESHOLD = 0.7
 
 # Valid image extensions
 VALID_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
@@ -429,10 +444,243 @@ def convert_to_tflite_direct(model, tflite_path):
     print(f"    Model size: {size_mb:.2f} MB")
 
 
+def load_image_for_model(image_path):
+    """
+    Load an image the way the training generators see it
+    (RGB, IMAGE_SIZE x IMAGE_SIZE, scaled to [0, 1])
+    """
+    from PIL import Image
+    
+    img = Image.open(image_path).convert('RGB')
+    img = img.resize((IMAGE_SIZE, IMAGE_SIZE))
+    return np.array(img, dtype=np.float32) / 255.0
+
+
+def get_class_names(data_dir):
+    """
+    Get class folder names in the order flow_from_directory assigns labels
+    """
+    return sorted(
+        d for d in os.listdir(data_dir)
+        if os.path.isdir(os.path.join(data_dir, d))
+    )
+
+
+def representative_dataset():
+    """
+    Yield training images for INT8 calibration
+    Samples are drawn from every class in dataset/train
+    """
+    files = []
+    for class_name in get_class_names(TRAIN_DIR):
+        files.extend(get_image_files(os.path.join(TRAIN_DIR, class_name)))
+    
+    random.shuffle(files)
+    
+    for image_path in files[:REPRESENTATIVE_SAMPLES]:
+        yield [np.expand_dims(load_image_for_model(image_path), axis=0)]
+
+
+def convert_to_tflite_int8(model, tflite_path):
+    """
+    Convert Keras model to a full-integer quantized TensorFlow Lite model
+    Weights and activations are INT8; input and output tensors are uint8 so
+    the robot can feed camera pixels without the float /255 path
+    """
+    print("\n" + "="*60)
+    print("Converting to TensorFlow Lite (full INT8)")
+    print("="*60)
+    
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    
+    tflite_model = converter.convert()
+    
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+    
+    size_mb = os.path.getsize(tflite_path) / (1024 * 1024)
+    print(f"[OK] INT8 model converted to TFLite")
+    print(f"    Saved to: {tflite_path}")
+    print(f"    Model size: {size_mb:.2f} MB")
+
+
+def evaluate_tflite_model(tflite_path, data_dir=TEST_DIR):
+    """
+    Measure accuracy of a TFLite model on a dataset folder
+    Handles both float and quantized input/output tensors
+    
+    Returns:
+        float: Accuracy (0.0 to 1.0)
+    """
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    interpreter.allocate_tensors()
+    
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    input_dtype = input_details['dtype']
+    output_dtype = output_details['dtype']
+    
+    correct = 0
+    total = 0
+    
+    for label, class_name in enumerate(get_class_names(data_dir)):
+        for image_path in get_image_files(os.path.join(data_dir, class_name)):
+            x = np.expand_dims(load_image_for_model(image_path), axis=0)
+            
+            if np.issubdtype(input_dtype, np.integer):
+                scale, zero_point = input_details['quantization']
+                info = np.iinfo(input_dtype)
+                x = np.clip(np.round(x / scale + zero_point), info.min, info.max)
+            
+            interpreter.set_tensor(input_details['index'], x.astype(input_dtype))
+            interpreter.invoke()
+            y = float(interpreter.get_tensor(output_details['index'])[0][0])
+            
+            if np.issubdtype(output_dtype, np.integer):
+                scale, zero_point = output_details['quantization']
+                y = (y - zero_point) * scale
+            
+            # Sigmoid output is the probability of class index 1
+            predicted = 1 if y > 0.5 else 0
+            correct += int(predicted == label)
+            total += 1
+    
+    return correct / total if total > 0 else 0.0
+
+
+def compare_tflite_models(float_path, int8_path, data_dir=TEST_DIR):
+    """
+    Report model size and test accuracy of the INT8 model vs the float model
+    """
+    print("\n" + "="*60)
+    print("INT8 vs Float Model")
+    print("="*60)
+    
+    float_size = os.path.getsize(float_path) / (1024 * 1024)
+    int8_size = os.path.getsize(int8_path) / (1024 * 1024)
+    float_acc = evaluate_tflite_model(float_path, data_dir)
+    int8_acc = evaluate_tflite_model(int8_path, data_dir)
+    
+    print(f"    Float model: {float_size:.2f} MB, accuracy {float_acc*100:.2f}%")
+    print(f"    INT8 model:  {int8_size:.2f} MB, accuracy {int8_acc*100:.2f}%")
+    print(f"    Size: {int8_size / float_size * 100:.1f}% of float model")
+    print(f"    Accuracy delta: {(int8_acc - float_acc)*100:+.2f} points")
+    
+    return {
+        'float_size_mb': float_size,
+        'int8_size_mb': int8_size,
+        'float_accuracy': float_acc,
+        'int8_accuracy': int8_acc
+    }
+
+
+def compute_training_hash():
+    """
+    Fingerprint of the training data and hyperparameters
+    Changes whenever an image is added, removed or replaced, or a
+    training setting changes
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{IMAGE_SIZE}|{BATCH_SIZE}|{EPOCHS}|{LEARNING_RATE}".encode())
+    
+    for class_name in get_class_names(TRAIN_DIR):
+        for image_path in sorted(get_image_files(os.path.join(TRAIN_DIR, class_name))):
+            relative = os.path.relpath(image_path, TRAIN_DIR).replace(os.sep, '/')
+            digest.update(f"{relative}|{os.path.getsize(image_path)}".encode())
+    
+    return digest.hexdigest()
+
+
+def write_model_metadata(tflite_path, class_indices, test_accuracy=None):
+    """
+    Write the metadata sidecar (models/model.meta.json) for a TFLite model
+    The robot reads it instead of guessing the output layout at runtime
+    
+    Args:
+        tflite_path (str): Exported .tflite model
+        class_indices (dict): Class name -> label index (from the generator)
+        test_accuracy (float): Keras test accuracy, if known
+    """
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    
+    def quantization(details):
+        scale, zero_point = details['quantization']
+        if not scale:
+            return None
+        return {'scale': float(scale), 'zero_point': int(zero_point)}
+    
+    input_dtype = np.dtype(input_details['dtype']).name
+    class_names = [name for name, _ in sorted(class_indices.items(), key=lambda item: item[1])]
+    
+    metadata = {
+        'class_names': class_names,
+        'positive_class': POSITIVE_CLASS,
+        'output_activation': 'sigmoid',
+        'output_units': int(output_details['shape'][-1]),
+        # Training used ImageDataGenerator(rescale=1./255)
+        'normalization': {'scale': 1.0 / 255.0, 'offset': 0.0, 'range': [0.0, 1.0]},
+        'input_size': [IMAGE_SIZE, IMAGE_SIZE],
+        'input_dtype': input_dtype,
+        'output_dtype': np.dtype(output_details['dtype']).name,
+        'input_quantization': quantization(input_details),
+        'output_quantization': quantization(output_details),
+        'confidence_threshold': CONFIDENCE_THRESHOLD,
+        # flow_from_directory resizes with nearest-neighbour interpolation,
+        # which is also the robot's fastest preprocessing path
+        'resize_interpolation': 'nearest',
+        'recommended_preprocess': 'nearest',
+        'training_hash': compute_training_hash(),
+        'test_accuracy': float(test_accuracy) if test_accuracy is not None else None,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'tensorflow_version': tf.__version__
+    }
+    
+    path = save_model_metadata(tflite_path, metadata)
+    print(f"[OK] Model metadata saved to: {path}")
+    print(f"    Classes: {class_names} (positive: {POSITIVE_CLASS})")
+
+
+def export_int8_from_saved_model():
+    """
+    Export the INT8 model from the previously trained Keras model
+    (no retraining)
+    """
+    keras_path = MODEL_SAVE_PATH.replace('.h5', '.keras')
+    if not os.path.exists(keras_path):
+        print(f"\n! Error: {keras_path} not found - train the model first")
+        return
+    
+    if not os.path.exists(TRAIN_DIR):
+        print(f"\n! Error: {TRAIN_DIR}/ not found - needed for INT8 calibration")
+        return
+    
+    model = keras.models.load_model(keras_path)
+    convert_to_tflite_int8(model, TFLITE_INT8_SAVE_PATH)
+    
+    class_indices = {name: i for i, name in enumerate(get_class_names(TRAIN_DIR))}
+    write_model_metadata(TFLITE_INT8_SAVE_PATH, class_indices)
+    
+    if os.path.exists(TFLITE_SAVE_PATH) and os.path.exists(TEST_DIR):
+        compare_tflite_models(TFLITE_SAVE_PATH, TFLITE_INT8_SAVE_PATH)
+
+
 def main():
     """
     Main training pipeline
     """
+    if '--export-int8' in sys.argv:
+        export_int8_from_saved_model()
+        return
+    
+    export_int8 = '--int8' in sys.argv
+    
     print("="*60)
     print("AMLAC Robot - One-Class ML Training")
     print("Model: MobileNetV3-Large")
@@ -477,12 +725,22 @@ def main():
     
     # Convert to TFLite directly from current model (avoid loading issues)
     convert_to_tflite_direct(model, TFLITE_SAVE_PATH)
+    write_model_metadata(TFLITE_SAVE_PATH, train_gen.class_indices, test_results[1])
+    
+    # Optional full-integer model for faster inference on the robot
+    if export_int8:
+        convert_to_tflite_int8(model, TFLITE_INT8_SAVE_PATH)
+        int8_report = compare_tflite_models(TFLITE_SAVE_PATH, TFLITE_INT8_SAVE_PATH)
+        write_model_metadata(TFLITE_INT8_SAVE_PATH, train_gen.class_indices,
+                             int8_report['int8_accuracy'])
     
     print("\n" + "="*60)
     print("TRAINING COMPLETE!")
     print("="*60)
     print(f"[OK] Keras model: {MODEL_SAVE_PATH.replace('.h5', '.keras')}")
     print(f"[OK] TFLite model: {TFLITE_SAVE_PATH}")
+    if export_int8:
+        print(f"[OK] INT8 TFLite model: {TFLITE_INT8_SAVE_PATH}")
     print(f"[OK] Test accuracy: {test_results[1]*100:.2f}%")
     print("\n" + "-"*60)
     print("IMPORTANT: One-Class Classification Notes")
@@ -493,7 +751,7 @@ def main():
     print("  - If accuracy is low, collect real clean water images")
     print("-"*60)
     print("\nNext steps:")
-    print("  1. Copy models/model.tflite to Raspberry Pi")
+    print("  1. Copy models/model.tflite and models/model.meta.json to Raspberry Pi")
     print("  2. Place in: /home/pi/amlac_robot/models/")
     print("  3. Run: python main.py")
     print("\nGood luck with your thesis!")
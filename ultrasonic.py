@@ -0,0 +1,158 @@
+"""
+Ultrasonic Module for AMLAC Robot
+Interrupt-driven JSN-SR04T distance measurement. Instead of spinning on the
+echo pin, both echo edges are timestamped in a GPIO edge callback
+(time.perf_counter_ns) and the caller sleeps on an Event until the falling
+edge arrives, leaving the CPU free for inference.
+
+A reading is the median of ULTRASONIC_SAMPLES pings. Pings with no echo
+are dropped, and so are pings far from the median (splashes, multipath).
+"""
+
+import statistics
+import threading
+import time
+import config
+from hardware import GPIO
+
+SPEED_OF_SOUND_HALF = 17150  # cm/s, there and back
+
+
+def filter_distances(readings, pings):
+    """
+    Median of the valid pings after outlier rejection
+    
+    Args:
+        readings (list): Distances in cm from pings that got an echo
+        pings (int): Number of pings sent
+    
+    Returns:
+        tuple: (distance in cm or None, number of outliers rejected)
+    """
+    # Mostly no echo: nothing in range
+    if not readings or len(readings) * 2 < pings:
+        return None, 0
+    
+    median = statistics.median(readings)
+    limit = max(config.ULTRASONIC_OUTLIER_CM, 0.1 * median)
+    kept = [r for r in readings if abs(r - median) <= limit]
+    return round(statistics.median(kept), 2), len(readings) - len(kept)
+
+
+class EdgeUltrasonic:
+    """
+    JSN-SR04T measured with GPIO edge callbacks
+    """
+    
+    def __init__(self, trig_pin=None, echo_pin=None):
+        """
+        Register the echo edge callback (pins must already be set up)
+        
+        Args:
+            trig_pin (int): Trigger output pin (default from config)
+            echo_pin (int): Echo input pin (default from config)
+        """
+        self.trig_pin = config.ULTRASONIC_TRIG if trig_pin is None else trig_pin
+        self.echo_pin = config.ULTRASONIC_ECHO if echo_pin is None else echo_pin
+        
+        self._lock = threading.Lock()
+        self._echo = threading.Event()
+        self._armed = False
+        self._rise_ns = None
+        self._pulse_ns = None
+        
+        # Statistics
+        self.pings = 0
+        self.misses = 0
+        self.outliers = 0
+        
+        GPIO.add_event_detect(self.echo_pin, GPIO.BOTH, callback=self._on_edge)
+    
+    def _on_edge(self, channel):
+        """
+        Timestamp an echo edge (GPIO callback thread)
+        The first edge after ping() is the rise and the second the fall. The
+        pin is not read back, since by the time a delayed callback runs a short
+        echo may already be over
+        """
+        now = time.perf_counter_ns()
+        with self._lock:
+            if not self._armed:
+                return
+            if self._rise_ns is None:
+                self._rise_ns = now
+            else:
+                self._pulse_ns = now - self._rise_ns
+                self._armed = False
+                self._echo.set()
+    
+    def ping(self, timeout=None):
+        """
+        Send one trigger pulse and wait for its echo
+        
+        Args:
+            timeout (float): Seconds to wait for the echo (default ULTRASONIC_ECHO_TIMEOUT)
+        
+        Returns:
+            float: Distance in cm, or None (no echo or out of range)
+        """
+        if timeout is None:
+            timeout = config.ULTRASONIC_ECHO_TIMEOUT
+        
+        with self._lock:
+            self._rise_ns = None
+            self._pulse_ns = None
+            self._armed = True
+            self._echo.clear()
+        
+        GPIO.output(self.trig_pin, GPIO.HIGH)
+        time.sleep(0.00001)  # 10 microseconds
+        GPIO.output(self.trig_pin, GPIO.LOW)
+        
+        got_echo = self._echo.wait(timeout)
+        with self._lock:
+            self._armed = False
+            pulse_ns = self._pulse_ns
+        
+        self.pings += 1
+        if not got_echo or pulse_ns is None:
+            self.misses += 1
+            return None
+        
+        distance = pulse_ns / 1e9 * SPEED_OF_SOUND_HALF
+        if 2 <= distance <= config.ULTRASONIC_MAX_DISTANCE:
+            return distance
+        self.misses += 1
+        return None
+    
+    def read(self, samples=None):
+        """
+        Filtered distance from several pings
+        
+        Args:
+            samples (int): Pings per reading (default ULTRASONIC_SAMPLES)
+        
+        Returns:
+            float: Distance in cm or None if no reliable echo
+        """
+        if samples is None:
+            samples = config.ULTRASONIC_SAMPLES
+        
+        readings = []
+        for i in range(samples):
+            if i:
+                time.sleep(config.ULTRASONIC_PING_INTERVAL)
+            distance = self.ping()
+            if distance is not None:
+                readings.append(distance)
+        
+        distance, outliers = filter_distances(readings, samples)
+        self.outliers += outliers
+        return distance
+    
+    def close(self):
+        """Remove the edge callback"""
+        try:
+            GPIO.remove_event_detect(self.echo_pin)
+        except Exception:
+            pass